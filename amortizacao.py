@@ -0,0 +1,144 @@
+# amortizacao.py
+#
+# Motor de amortização usado nas simulações.
+# Suporta os dois sistemas usados no Brasil:
+#   - PRICE (tabela Price): parcelas fixas, amortização crescente.
+#   - SAC: amortização constante, parcelas decrescentes.
+#
+# O cronograma mês a mês é calculado com arrays NumPy (fórmulas fechadas),
+# sem laço Python por parcela, então 360 meses custam o mesmo que 12.
+
+from typing import Literal
+
+import numpy as np
+
+SistemaAmortizacao = Literal["price", "sac"]
+SISTEMAS = ("price", "sac")
+
+
+def _parcela_price(valor: float, taxa: float, prazo: int) -> float:
+    if taxa == 0:
+        return valor / prazo
+    return valor * taxa / (1 - (1 + taxa) ** -prazo)
+
+
+def cronograma_price(valor: float, taxa: float, prazo: int) -> dict:
+    """Cronograma completo da tabela Price, como arrays NumPy (sem arredondamento)."""
+    meses = np.arange(1, prazo + 1)
+    parcela = _parcela_price(valor, taxa, prazo)
+    if taxa == 0:
+        saldo = valor - parcela * meses
+    else:
+        fator = (1 + taxa) ** meses
+        # Saldo devedor após o pagamento da parcela k
+        saldo = valor * fator - parcela * (fator - 1) / taxa
+    saldo_anterior = np.concatenate(([valor], saldo[:-1]))
+    juros = saldo_anterior * taxa
+    return {
+        "mes": meses,
+        "parcela": np.full(prazo, parcela),
+        "juros": juros,
+        "amortizacao": parcela - juros,
+        "saldo_devedor": np.maximum(saldo, 0.0),
+    }
+
+
+def cronograma_sac(valor: float, taxa: float, prazo: int) -> dict:
+    """Cronograma completo do SAC, como arrays NumPy (sem arredondamento)."""
+    meses = np.arange(1, prazo + 1)
+    amortizacao = valor / prazo
+    saldo_anterior = valor - amortizacao * (meses - 1)
+    juros = saldo_anterior * taxa
+    return {
+        "mes": meses,
+        "parcela": amortizacao + juros,
+        "juros": juros,
+        "amortizacao": np.full(prazo, amortizacao),
+        "saldo_devedor": np.maximum(saldo_anterior - amortizacao, 0.0),
+    }
+
+
+def calcular_amortizacao(
+    valor: float,
+    taxa_juros_mensal: float,
+    prazo_meses: int,
+    sistema: SistemaAmortizacao = "price",
+    incluir_cronograma: bool = False,
+) -> dict:
+    """
+    Calcula parcela, total pago e juros totais de um empréstimo.
+
+    No SAC as parcelas diminuem; `valor_parcela` é a primeira (a maior) e
+    `valor_ultima_parcela` a última. Na Price as duas são iguais.
+    Com incluir_cronograma=True devolve também a tabela mês a mês.
+    """
+    if prazo_meses <= 0:
+        raise ValueError("O prazo deve ser de pelo menos 1 mês.")
+    if sistema not in SISTEMAS:
+        raise ValueError(f"Sistema de amortização inválido: {sistema}")
+
+    if sistema == "price":
+        parcela = _parcela_price(valor, taxa_juros_mensal, prazo_meses)
+        primeira = ultima = parcela
+        # Com a parcela arredondada: o total bate com o cronograma que o cliente vê
+        valor_total = round(parcela, 2) * prazo_meses
+    else:
+        amortizacao = valor / prazo_meses
+        primeira = amortizacao + valor * taxa_juros_mensal
+        ultima = amortizacao * (1 + taxa_juros_mensal)
+        # Soma dos juros do SAC: i * P * (n + 1) / 2
+        valor_total = valor + taxa_juros_mensal * valor * (prazo_meses + 1) / 2
+
+    resultado = {
+        "valor_parcela": round(primeira, 2),
+        "valor_ultima_parcela": round(ultima, 2),
+        "valor_total": round(valor_total, 2),
+        "juros_total": round(valor_total - valor, 2),
+    }
+
+    if incluir_cronograma:
+        gerar = cronograma_price if sistema == "price" else cronograma_sac
+        tabela = gerar(valor, taxa_juros_mensal, prazo_meses)
+        chaves = tuple(tabela.keys())
+        colunas = [tabela["mes"].tolist()] + [np.round(tabela[k], 2).tolist() for k in chaves[1:]]
+        resultado["cronograma"] = [dict(zip(chaves, linha)) for linha in zip(*colunas)]
+
+    return resultado
+
+
+def calcular_lote(valores, taxas, prazos, sistema: SistemaAmortizacao = "price") -> dict:
+    """
+    Versão vetorizada de calcular_amortizacao (sem cronograma) para muitas
+    cotações de uma vez. Recebe sequências do mesmo tamanho e devolve arrays
+    NumPy arredondados em 2 casas.
+    """
+    if sistema not in SISTEMAS:
+        raise ValueError(f"Sistema de amortização inválido: {sistema}")
+    valores = np.asarray(valores, dtype=float)
+    taxas = np.asarray(taxas, dtype=float)
+    prazos = np.asarray(prazos, dtype=float)
+    if np.any(prazos <= 0):
+        raise ValueError("O prazo deve ser de pelo menos 1 mês.")
+
+    if sistema == "price":
+        sem_juros = taxas == 0
+        taxas_seguras = np.where(sem_juros, 1.0, taxas)  # evita divisão por zero
+        parcela = np.where(
+            sem_juros,
+            valores / prazos,
+            valores * taxas_seguras / (1 - (1 + taxas_seguras) ** -prazos),
+        )
+        primeira = ultima = parcela
+        valor_total = np.round(parcela, 2) * prazos
+    else:
+        amortizacao = valores / prazos
+        primeira = amortizacao + valores * taxas
+        ultima = amortizacao * (1 + taxas)
+        valor_total = valores + taxas * valores * (prazos + 1) / 2
+
+    return {
+        "valor_parcela": np.round(primeira, 2),
+        "valor_ultima_parcela": np.round(ultima, 2),
+        "valor_total": np.round(valor_total, 2),
+        "juros_total": np.round(valor_total - valores, 2),
+    }
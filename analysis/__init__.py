@@ -0,0 +1,5 @@
+# analysis/
+#
+# Análise de crédito: consulta aos bureaus (data_sources), cálculo do score
+# (scoring) e decisão final (decision), encadeados em pipeline. Usado por
+# routes/analysis.py, direto ou pela fila de jobs (jobs).
@@ -0,0 +1,182 @@
+# analysis/bureaus.py
+#
+# Interface dos clientes de bureau e as duas implementações:
+#   - ClienteHttp: GET {url}/{cpf} na API do bureau (JSON do modelo);
+#   - SimuladorBureau: gera respostas localmente, de forma determinística
+#     (mesma semente + mesmo CPF = mesma resposta), com latência e taxa de
+#     erro configuráveis, para testes de desempenho reproduzíveis.
+#
+# Qualquer objeto com `nome`, `modelo` e `async consultar(cpf, perfil)` serve
+# de fonte; veja analysis/data_sources.registrar_fonte. Subclasses de
+# ClienteBureau sem `consultar` falham já ao criar o cliente (TypeError).
+#
+# Latência do simulador (em ms), por fonte ou para todas:
+#   BUREAU_SIMULADOR_LATENCIA / BUREAU_<FONTE>_LATENCIA
+#     "fixa:100"           sempre 100 ms
+#     "normal:200:50"      média 200, desvio 50
+#     "lognormal:150:0.5"  mediana 150, sigma 0.5 (cauda longa, como API real)
+#     "exponencial:100"    média 100
+#   BUREAU_SIMULADOR_TAXA_ERRO / BUREAU_<FONTE>_TAXA_ERRO   fração de 0 a 1
+#   BUREAU_SIMULADOR_SEMENTE                                 padrão 42
+
+import asyncio
+import math
+import os
+import random
+from abc import ABC, abstractmethod
+from typing import Callable, Optional, Type
+
+import httpx
+from pydantic import BaseModel
+
+from models.models import PerfilUsuario
+
+BUREAU_SIMULADOR_SEMENTE = int(os.getenv("BUREAU_SIMULADOR_SEMENTE", 42))
+BUREAU_SIMULADOR_LATENCIA = os.getenv("BUREAU_SIMULADOR_LATENCIA", "fixa:0")
+BUREAU_SIMULADOR_TAXA_ERRO = float(os.getenv("BUREAU_SIMULADOR_TAXA_ERRO", 0))
+
+
+class ErroBureau(Exception):
+    pass
+
+
+class ClienteBureau(ABC):
+    """Interface de uma fonte de dados de crédito."""
+
+    nome: str
+    modelo: Type[BaseModel]
+
+    @abstractmethod
+    async def consultar(self, cpf: str, perfil: PerfilUsuario) -> BaseModel:
+        ...
+
+
+# --- HTTP ---
+
+_http: Optional[httpx.AsyncClient] = None
+
+
+def _cliente_http() -> httpx.AsyncClient:
+    # Um cliente só para reaproveitar as conexões (keep-alive) entre análises
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(limits=httpx.Limits(max_connections=100, max_keepalive_connections=20))
+    return _http
+
+
+async def fechar_clientes():
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+
+
+class ClienteHttp(ClienteBureau):
+    def __init__(self, nome: str, modelo: Type[BaseModel], url: str):
+        self.nome, self.modelo, self.url = nome, modelo, url.rstrip("/")
+
+    async def consultar(self, cpf: str, perfil: PerfilUsuario) -> BaseModel:
+        # Sem timeout próprio: quem limita o tempo é o consultar_fontes
+        r = await _cliente_http().get(f"{self.url}/{cpf}", timeout=None)
+        r.raise_for_status()
+        return self.modelo(**r.json())
+
+
+# --- Simulador ---
+
+class Latencia:
+    """Distribuição de latência (ms) a partir de um texto como 'lognormal:150:0.5'."""
+
+    def __init__(self, spec: str):
+        tipo, *params = spec.split(":")
+        self.spec = spec
+        self.tipo = tipo
+        self.params = [float(p) for p in params]
+        if tipo not in ("fixa", "normal", "lognormal", "exponencial"):
+            raise ValueError(f"Distribuição de latência desconhecida: {spec}")
+
+    def amostrar(self, rng: random.Random) -> float:
+        """Sorteia uma latência, em segundos."""
+        p = self.params
+        if self.tipo == "fixa":
+            ms = p[0] if p else 0.0
+        elif self.tipo == "normal":
+            ms = rng.gauss(p[0], p[1])
+        elif self.tipo == "lognormal":
+            ms = rng.lognormvariate(math.log(p[0]), p[1])
+        else:
+            ms = rng.expovariate(1 / p[0]) if p[0] > 0 else 0.0
+        return max(0.0, ms) / 1000
+
+
+def _config_fonte(nome: str, variavel: str, padrao: str) -> str:
+    return os.getenv(f"BUREAU_{nome.upper()}_{variavel}", padrao)
+
+
+class SimuladorBureau(ClienteBureau):
+    def __init__(
+        self,
+        nome: str,
+        modelo: Type[BaseModel],
+        gerar: Callable[[random.Random, str, PerfilUsuario], dict],
+        semente: int = BUREAU_SIMULADOR_SEMENTE,
+        latencia: Optional[str] = None,
+        taxa_erro: Optional[float] = None,
+    ):
+        self.nome, self.modelo, self._gerar, self.semente = nome, modelo, gerar, semente
+        self.latencia = Latencia(latencia or _config_fonte(nome, "LATENCIA", BUREAU_SIMULADOR_LATENCIA))
+        self.taxa_erro = float(_config_fonte(nome, "TAXA_ERRO", BUREAU_SIMULADOR_TAXA_ERRO)) if taxa_erro is None else taxa_erro
+        # Latência e erros seguem uma sequência própria, também semeada
+        self._rng = random.Random(f"{semente}:{nome}:sequencia")
+
+    async def consultar(self, cpf: str, perfil: PerfilUsuario) -> BaseModel:
+        espera = self.latencia.amostrar(self._rng)
+        falhar = self._rng.random() < self.taxa_erro
+        if espera:
+            await asyncio.sleep(espera)
+        if falhar:
+            raise ErroBureau(f"{self.nome}: erro simulado")
+        # Dados dependem só da semente e do CPF: reproduzíveis entre execuções
+        return self.modelo(**self._gerar(random.Random(f"{self.semente}:{self.nome}:{cpf}"), cpf, perfil))
+
+
+def _renda(perfil: PerfilUsuario) -> float:
+    return float(perfil.renda_mensal or 0)
+
+
+def _restricao(perfil: PerfilUsuario) -> bool:
+    # possui_restricao não é coluna do perfil (ainda); sem o dado, assume que não tem
+    return bool(getattr(perfil, "possui_restricao", False))
+
+
+def gerar_serasa(rng: random.Random, cpf: str, perfil: PerfilUsuario) -> dict:
+    restricao = _restricao(perfil)
+    base_score = 600
+    if restricao:
+        base_score = 300
+    elif _renda(perfil) > 10000:
+        base_score = 800
+    elif perfil.possui_imovel:
+        base_score = 700
+    return {
+        "cpf": cpf,
+        "score": rng.randint(base_score - 100, base_score + 100),
+        "has_negative_records": restricao,
+        "protests": 1 if restricao else 0,
+        "debts_value": float(rng.randint(5000, 15000)) if restricao else float(rng.randint(0, 5000)),
+    }
+
+
+def gerar_bacen_scr(rng: random.Random, cpf: str, perfil: PerfilUsuario) -> dict:
+    restricao = _restricao(perfil)
+    total_loan = 0
+    if perfil.possui_imovel:
+        total_loan += 150000
+    if perfil.possui_veiculo:
+        total_loan += 30000
+    return {
+        "cpf": cpf,
+        "total_loan_value": float(rng.uniform(0.8, 1.2) * total_loan),
+        "total_overdue_value": float(rng.randint(5000, 10000)) if restricao else 0.0,
+        "risk_level": rng.randint(3, 5) if restricao else rng.randint(1, 2),
+    }
@@ -0,0 +1,149 @@
+# analysis/cache_bureaus.py
+#
+# Cache das respostas dos bureaus por (fonte, CPF).
+#
+# Cada consulta ao Serasa/SCR é lenta e cobrada, e o cliente costuma refazer
+# a análise várias vezes mudando só valor e parcelas. Então:
+#   - cache local em memória (cache.TTLCache), com TTL por fonte e limite
+#     de tamanho;
+#   - opcionalmente um Redis compartilhado (BUREAU_CACHE_REDIS_URL), para que
+#     todos os workers do uvicorn aproveitem a mesma consulta;
+#   - single-flight: se várias requisições do mesmo CPF chegam juntas e não
+#     há nada em cache, só a primeira chama o bureau e as outras esperam
+#     o mesmo resultado.
+#
+# Só respostas de sucesso são guardadas; erro/timeout não vão para o cache.
+
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+from cache import TTLCache
+
+BUREAU_CACHE_TTL_SECONDS = float(os.getenv("BUREAU_CACHE_TTL_SECONDS", 900))
+BUREAU_CACHE_MAX_SIZE = int(os.getenv("BUREAU_CACHE_MAX_SIZE", 10000))
+BUREAU_CACHE_REDIS_URL = os.getenv("BUREAU_CACHE_REDIS_URL")
+
+
+def ttl_da_fonte(nome: str) -> float:
+    """TTL da fonte: BUREAU_CACHE_TTL_<NOME>_SECONDS, ou o padrão."""
+    return float(os.getenv(f"BUREAU_CACHE_TTL_{nome.upper()}_SECONDS", BUREAU_CACHE_TTL_SECONDS))
+
+
+def _conectar_redis(url: Optional[str]):
+    if not url:
+        return None
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        print("CACHE BUREAUS: BUREAU_CACHE_REDIS_URL definida mas o pacote 'redis' não está instalado; usando só memória.")
+        return None
+    return redis.from_url(url)
+
+
+class CacheBureaus:
+    def __init__(self, max_size: int = BUREAU_CACHE_MAX_SIZE, redis_url: Optional[str] = BUREAU_CACHE_REDIS_URL):
+        self.local = TTLCache(max_size=max_size, ttl_seconds=BUREAU_CACHE_TTL_SECONDS)
+        self._redis = _conectar_redis(redis_url)
+        self._em_voo: Dict[tuple, asyncio.Task] = {}
+        # Contadores por fonte (os do TTLCache são do cache local como um todo)
+        self._contadores: Dict[str, Dict[str, int]] = {}
+
+    def _contar(self, fonte: str, evento: str):
+        contadores = self._contadores.setdefault(
+            fonte, {"hits": 0, "hits_redis": 0, "misses": 0, "compartilhadas": 0, "erros_redis": 0}
+        )
+        contadores[evento] += 1
+
+    async def _ler_redis(self, fonte: str, chave: str, modelo: Type[BaseModel]):
+        if self._redis is None:
+            return None
+        try:
+            bruto = await self._redis.get(chave)
+        except Exception as e:
+            # Redis fora do ar não pode derrubar a análise
+            print(f"CACHE BUREAUS: erro ao ler do Redis: {e!r}")
+            self._contar(fonte, "erros_redis")
+            return None
+        return modelo.model_validate_json(bruto) if bruto else None
+
+    async def _gravar_redis(self, fonte: str, chave: str, valor: BaseModel, ttl: float):
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(chave, valor.model_dump_json(), ex=max(1, int(ttl)))
+        except Exception as e:
+            print(f"CACHE BUREAUS: erro ao gravar no Redis: {e!r}")
+            self._contar(fonte, "erros_redis")
+
+    async def _buscar(self, fonte: str, cpf: str, modelo: Type[BaseModel], consultar: Callable[[], Awaitable]):
+        chave = f"bureau:{fonte}:{cpf}"
+        ttl = ttl_da_fonte(fonte)
+        valor = await self._ler_redis(fonte, chave, modelo)
+        if valor is not None:
+            self._contar(fonte, "hits_redis")
+        else:
+            self._contar(fonte, "misses")
+            valor = await consultar()
+            await self._gravar_redis(fonte, chave, valor, ttl)
+        self.local.set((fonte, cpf), valor, ttl_seconds=ttl)
+        return valor
+
+    async def obter(self, fonte: str, cpf: str, modelo: Type[BaseModel], consultar: Callable[[], Awaitable]):
+        """
+        Devolve a resposta da fonte para o CPF: do cache local, do Redis ou,
+        em último caso, chamando `consultar()` (uma vez só por CPF, mesmo com
+        várias requisições simultâneas).
+        """
+        valor = self.local.get((fonte, cpf))
+        if valor is not None:
+            self._contar(fonte, "hits")
+            return valor
+
+        chave = (fonte, cpf)
+        tarefa = self._em_voo.get(chave)
+        if tarefa is None:
+            tarefa = asyncio.ensure_future(self._buscar(fonte, cpf, modelo, consultar))
+            self._em_voo[chave] = tarefa
+            tarefa.add_done_callback(lambda t: self._finalizar(chave, t))
+        else:
+            self._contar(fonte, "compartilhadas")
+        # shield: se quem espera desistir (timeout da análise), a consulta
+        # continua para os outros e o resultado ainda vai para o cache
+        return await asyncio.shield(tarefa)
+
+    async def em_cache(self, fonte: str, cpf: str, modelo: Type[BaseModel]):
+        """A resposta guardada (local ou Redis), sem chamar o bureau; None se não houver."""
+        valor = self.local.get((fonte, cpf))
+        if valor is not None:
+            self._contar(fonte, "hits")
+            return valor
+        valor = await self._ler_redis(fonte, f"bureau:{fonte}:{cpf}", modelo)
+        if valor is not None:
+            self._contar(fonte, "hits_redis")
+            self.local.set((fonte, cpf), valor, ttl_seconds=ttl_da_fonte(fonte))
+        return valor
+
+    def _finalizar(self, chave: tuple, tarefa: asyncio.Task):
+        self._em_voo.pop(chave, None)
+        # Marca a exceção como lida, caso todos que esperavam já tenham desistido
+        if not tarefa.cancelled():
+            tarefa.exception()
+
+    def stats(self) -> dict:
+        fontes = {}
+        for fonte, c in self._contadores.items():
+            total = c["hits"] + c["hits_redis"] + c["misses"] + c["compartilhadas"]
+            # Tudo que não precisou chamar o bureau conta como acerto
+            fontes[fonte] = {**c, "hit_rate": round((total - c["misses"]) / total, 4) if total else 0.0}
+        return {
+            "local": self.local.stats(),
+            "redis": self._redis is not None,
+            "em_voo": len(self._em_voo),
+            "fontes": fontes,
+        }
+
+
+cache_bureaus = CacheBureaus()
@@ -0,0 +1,119 @@
+# analysis/data_sources.py
+#
+# Fontes de dados de crédito (Serasa e SCR do Bacen) e a consulta em paralelo.
+#
+# Todas as fontes são consultadas ao mesmo tempo por consultar_fontes: cada
+# fonte tem seu timeout e a consulta inteira tem um prazo total. Fonte que
+# não respondeu a tempo (ou deu erro) entra em `falhas` em vez de derrubar a
+# análise; quem decide o que fazer com resultado parcial é o
+# analysis/decision.py.
+#
+# Com SERASA_API_URL / BACEN_SCR_API_URL configuradas, a fonte é um
+# ClienteHttp; sem URL, o simulador determinístico (analysis/bureaus.py).
+#
+# As respostas passam pelo cache por CPF (analysis/cache_bureaus.py) e cada
+# fonte tem circuit breaker e hedge opcional (analysis/resiliencia.py).
+
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from analysis.bureaus import (
+    ClienteBureau,
+    ClienteHttp,
+    SimuladorBureau,
+    gerar_bacen_scr,
+    gerar_serasa,
+)
+from analysis.cache_bureaus import cache_bureaus
+from analysis.resiliencia import CircuitoAberto, ClienteResiliente
+from models.models import PerfilUsuario
+from schemas.schemas import BacenSCRData, SerasaData
+
+SERASA_API_URL = os.getenv("SERASA_API_URL")
+BACEN_SCR_API_URL = os.getenv("BACEN_SCR_API_URL")
+
+# Timeout de cada fonte e prazo da consulta inteira (todas em paralelo)
+ANALISE_TIMEOUT_FONTE_SECONDS = float(os.getenv("ANALISE_TIMEOUT_FONTE_SECONDS", 2.0))
+ANALISE_PRAZO_TOTAL_SECONDS = float(os.getenv("ANALISE_PRAZO_TOTAL_SECONDS", 3.0))
+
+
+def _cliente_padrao(nome: str, modelo, url: Optional[str], gerar) -> ClienteBureau:
+    return ClienteHttp(nome, modelo, url) if url else SimuladorBureau(nome, modelo, gerar)
+
+
+FONTES: Dict[str, ClienteResiliente] = {}
+
+
+def registrar_fonte(cliente: ClienteBureau):
+    """Adiciona (ou troca) uma fonte consultada em toda análise."""
+    FONTES[cliente.nome] = ClienteResiliente(cliente, timeout=ANALISE_TIMEOUT_FONTE_SECONDS)
+
+
+registrar_fonte(_cliente_padrao("serasa", SerasaData, SERASA_API_URL, gerar_serasa))
+registrar_fonte(_cliente_padrao("bacen_scr", BacenSCRData, BACEN_SCR_API_URL, gerar_bacen_scr))
+
+
+def estado_fontes() -> dict:
+    """Circuit breaker, latências e hedge de cada fonte."""
+    return {nome: cliente.stats() for nome, cliente in FONTES.items()}
+
+
+@dataclass
+class ResultadoFontes:
+    dados: Dict[str, object] = field(default_factory=dict)   # nome da fonte -> SerasaData/BacenSCRData
+    falhas: Dict[str, str] = field(default_factory=dict)     # nome da fonte -> motivo
+
+    @property
+    def completo(self) -> bool:
+        return not self.falhas
+
+
+async def fontes_em_cache(cpf: str) -> Dict[str, object]:
+    """As respostas de cada fonte que já estão no cache, sem consultar nenhum bureau."""
+    dados = {}
+    for nome, cliente in FONTES.items():
+        valor = await cache_bureaus.em_cache(nome, cpf, cliente.modelo)
+        if valor is not None:
+            dados[nome] = valor
+    return dados
+
+
+async def consultar_fontes(
+    cpf: str,
+    perfil: PerfilUsuario,
+    timeout_fonte: float = ANALISE_TIMEOUT_FONTE_SECONDS,
+    prazo_total: float = ANALISE_PRAZO_TOTAL_SECONDS,
+) -> ResultadoFontes:
+    """
+    Consulta todas as FONTES em paralelo. O tempo total fica limitado a
+    min(timeout_fonte, prazo_total), e não à soma das latências.
+    """
+    def consulta(cliente: ClienteBureau):
+        em_cache = cache_bureaus.obter(cliente.nome, cpf, cliente.modelo, lambda: cliente.consultar(cpf, perfil))
+        return asyncio.wait_for(em_cache, timeout_fonte)
+
+    tarefas = {asyncio.create_task(consulta(cliente)): nome for nome, cliente in FONTES.items()}
+    feitas, pendentes = await asyncio.wait(tarefas, timeout=prazo_total)
+
+    resultado = ResultadoFontes()
+    for tarefa in pendentes:
+        tarefa.cancel()
+        resultado.falhas[tarefas[tarefa]] = "prazo total esgotado"
+    if pendentes:
+        await asyncio.gather(*pendentes, return_exceptions=True)
+
+    for tarefa in feitas:
+        nome = tarefas[tarefa]
+        erro = tarefa.exception()
+        if erro is None:
+            resultado.dados[nome] = tarefa.result()
+        elif isinstance(erro, asyncio.TimeoutError):
+            resultado.falhas[nome] = "timeout"
+        elif isinstance(erro, CircuitoAberto):
+            resultado.falhas[nome] = "circuito aberto"
+        else:
+            print(f"ANÁLISE: erro ao consultar {nome}: {erro!r}")
+            resultado.falhas[nome] = "erro"
+    return resultado
@@ -0,0 +1,81 @@
+# analysis/decision.py
+#
+# Decisão final da análise de crédito. As regras (faixas de score,
+# comprometimento da renda, restrições, limites do produto) ficam na
+# política declarada em dados e compilada por analysis/politica.py; aqui só
+# calculamos os fatos da análise (a partir das features pré-calculadas do
+# perfil, analysis/features.py) e montamos a resposta.
+#
+# Análise com bureau faltando nunca é aprovada nem negada automaticamente:
+# a política vai para "Análise Manual".
+
+from typing import Iterable, Optional
+
+from amortizacao import calcular_amortizacao
+from analysis.politica import Fatos, Politica, dry_run, politica_candidata, politica_vigente
+from catalogo import obter_produto
+from models.models import FeaturesPerfil
+from schemas.schemas import BacenSCRData, CreditAnalysisRequest, CreditAnalysisResponse, SerasaData
+
+
+def tem_restricao(serasa: Optional[SerasaData], bacen: Optional[BacenSCRData]) -> bool:
+    return bool(serasa and serasa.has_negative_records) or bool(bacen and bacen.total_overdue_value > 0)
+
+
+def montar_fatos(
+    politica: Politica,
+    score: int,
+    payload: CreditAnalysisRequest,
+    perfil: FeaturesPerfil,
+    fontes_indisponiveis: Iterable[str] = (),
+    serasa: Optional[SerasaData] = None,
+    bacen: Optional[BacenSCRData] = None,
+) -> Fatos:
+    renda = float(perfil.renda_mensal or 0)
+    produto = obter_produto(politica.produto)
+    parcela = calcular_amortizacao(payload.requested_amount, produto.taxa_juros_mensal, payload.installments)["valor_parcela"]
+    return Fatos(
+        score=score,
+        fontes_indisponiveis=bool(fontes_indisponiveis),
+        restricao=tem_restricao(serasa, bacen),
+        renda=renda,
+        comprometimento=parcela / renda if renda > 0 else float("inf"),
+        valor=payload.requested_amount,
+        parcelas=payload.installments,
+        fora_limites_produto=produto.validar_limites(payload.requested_amount, payload.installments) is not None,
+        faixa_renda=perfil.faixa_renda,
+        meses_emprego=perfil.meses_emprego,
+        idade=perfil.idade,
+    )
+
+
+def make_decision(
+    score: int,
+    payload: CreditAnalysisRequest,
+    perfil: FeaturesPerfil,
+    fontes_indisponiveis: Iterable[str] = (),
+    serasa: Optional[SerasaData] = None,
+    bacen: Optional[BacenSCRData] = None,
+) -> CreditAnalysisResponse:
+    fontes_indisponiveis = sorted(fontes_indisponiveis)
+    politica = politica_vigente()
+    fatos = montar_fatos(politica, score, payload, perfil, fontes_indisponiveis, serasa, bacen)
+    resultado = politica.avaliar(fatos)
+
+    candidata = politica_candidata()
+    if candidata is not None:
+        if candidata.produto != politica.produto:
+            fatos = montar_fatos(candidata, score, payload, perfil, fontes_indisponiveis, serasa, bacen)
+        dry_run.registrar(resultado, candidata.avaliar(fatos))
+
+    extra = {}
+    if resultado.decisao == "Aprovado":
+        extra = {"approved_amount": payload.requested_amount, "approved_installments": payload.installments}
+    return CreditAnalysisResponse(
+        cpf=payload.cpf,
+        decision=resultado.decisao,
+        score=score,
+        message=resultado.mensagem.format(fontes=", ".join(fontes_indisponiveis)),
+        fontes_indisponiveis=fontes_indisponiveis,
+        **extra,
+    )
@@ -0,0 +1,154 @@
+# analysis/features.py
+#
+# Variáveis do perfil usadas na análise de crédito (faixa de renda, tempo
+# de emprego, idade, bens), pré-calculadas em features_perfil.
+#
+# O PUT /api/perfil/me recalcula a linha no mesmo commit do perfil, e só
+# quando chega algum dos CAMPOS_ORIGEM; o upsert nem escreve se nada mudou.
+# A análise (analysis/pipeline.py) lê só essa linha, junto com a
+# pré-aprovação, numa consulta.
+#
+# Versionamento: cada linha guarda a FEATURES_VERSAO com que foi calculada e
+# a data de referência de idade/meses_emprego. É considerada velha (e
+# recalculada na hora, a partir dos próprios campos de origem guardados
+# nela) se a versão mudou ou se a referência tem mais de
+# FEATURES_VALIDADE_DIAS. Ao mudar o cálculo, suba FEATURES_VERSAO.
+#
+# Para recalcular tudo (ex.: depois de subir a versão ou de alterar perfis
+# fora da API):
+#
+#   python -m analysis.features --lote 10000
+
+import argparse
+import os
+import time
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import or_, select
+
+from analysis.pre_aprovacao import assinatura_perfil
+from db import SessionLocal, engine, upsert_stmt
+from models.models import FeaturesPerfil, PerfilUsuario
+
+FEATURES_VERSAO = 1
+FEATURES_VALIDADE_DIAS = int(os.getenv("FEATURES_VALIDADE_DIAS", 30))
+FEATURES_LOTE = int(os.getenv("FEATURES_LOTE", 10000))
+
+CAMPOS_ORIGEM = ("renda_mensal", "possui_imovel", "possui_veiculo", "data_admissao", "data_nascimento")
+# Limites das faixas de renda: faixa 0 = até 2 mil, ..., 4 = acima de 20 mil
+LIMITES_FAIXA_RENDA = (2000, 5000, 10000, 20000)
+
+
+def _meses_entre(inicio: date, fim: date) -> int:
+    meses = (fim.year - inicio.year) * 12 + fim.month - inicio.month - (fim.day < inicio.day)
+    return max(0, meses)
+
+
+def calcular_features(
+    renda_mensal, possui_imovel, possui_veiculo, data_admissao, data_nascimento, hoje: Optional[date] = None
+) -> dict:
+    """As colunas de features_perfil (sem user_id) a partir dos campos de origem."""
+    hoje = hoje or date.today()
+    renda = float(renda_mensal) if renda_mensal is not None else None
+    return {
+        "versao": FEATURES_VERSAO,
+        "data_referencia": hoje,
+        "assinatura": assinatura_perfil(renda_mensal, possui_imovel, possui_veiculo, data_admissao, data_nascimento),
+        "renda_mensal": renda,
+        "possui_imovel": bool(possui_imovel),
+        "possui_veiculo": bool(possui_veiculo),
+        "data_admissao": data_admissao,
+        "data_nascimento": data_nascimento,
+        "faixa_renda": sum(renda > limite for limite in LIMITES_FAIXA_RENDA) if renda else 0,
+        "meses_emprego": min(_meses_entre(data_admissao, hoje), 32767) if data_admissao else 0,
+        "idade": _meses_entre(data_nascimento, hoje) // 12 if data_nascimento else 0,
+    }
+
+
+def features_atuais(features: FeaturesPerfil, hoje: Optional[date] = None) -> bool:
+    hoje = hoje or date.today()
+    return (
+        features.versao == FEATURES_VERSAO
+        and hoje - features.data_referencia <= timedelta(days=FEATURES_VALIDADE_DIAS)
+    )
+
+
+def upsert_features_stmt(dialeto: str):
+    """
+    Upsert em features_perfil (uma linha ou várias, via executemany). Se a
+    linha existente já tem a mesma assinatura, versão e data de referência,
+    o UPDATE não acontece.
+    """
+    colunas = [c.name for c in FeaturesPerfil.__table__.columns if c.name != "user_id"]
+    return upsert_stmt(
+        dialeto, FeaturesPerfil, ["user_id"], colunas,
+        where=lambda excluded: or_(
+            FeaturesPerfil.assinatura != excluded.assinatura,
+            FeaturesPerfil.versao != excluded.versao,
+            FeaturesPerfil.data_referencia != excluded.data_referencia,
+        ),
+    )
+
+
+def precisa_recalcular(campos_enviados: Iterable[str]) -> bool:
+    """Se a atualização do perfil mexeu em algum campo de origem."""
+    return not set(CAMPOS_ORIGEM).isdisjoint(campos_enviados)
+
+
+async def atualizar_features(db, user_id: int, atual: Optional[FeaturesPerfil] = None) -> Optional[FeaturesPerfil]:
+    """
+    Recalcula e grava as features do usuário. Com `atual` (linha velha),
+    usa os campos de origem guardados nela; sem, lê do perfil. Devolve None
+    se o usuário não tem perfil.
+    """
+    if atual is not None:
+        origem = {campo: getattr(atual, campo) for campo in CAMPOS_ORIGEM}
+    else:
+        result = await db.execute(
+            select(*(getattr(PerfilUsuario, campo) for campo in CAMPOS_ORIGEM)).where(PerfilUsuario.user_id == user_id)
+        )
+        linha = result.mappings().first()
+        if linha is None:
+            return None
+        origem = dict(linha)
+    dados = {"user_id": user_id, **calcular_features(**origem)}
+    await db.execute(upsert_features_stmt(db.bind.dialect.name), [dados])
+    await db.commit()
+    return FeaturesPerfil(**dados)
+
+
+def recalcular_todas(tamanho_lote: int = FEATURES_LOTE) -> int:
+    """Recalcula as features de todos os perfis, em lotes por keyset. Retorna quantos."""
+    upsert = upsert_features_stmt(engine.dialect.name)
+    colunas = (PerfilUsuario.user_id, *(getattr(PerfilUsuario, campo) for campo in CAMPOS_ORIGEM))
+    hoje = date.today()
+    ultimo_id, total = 0, 0
+    db = SessionLocal()
+    try:
+        while True:
+            linhas = db.execute(
+                select(*colunas).where(PerfilUsuario.user_id > ultimo_id).order_by(PerfilUsuario.user_id).limit(tamanho_lote)
+            ).all()
+            if not linhas:
+                break
+            db.execute(upsert, [{"user_id": linha[0], **calcular_features(*linha[1:], hoje=hoje)} for linha in linhas])
+            db.commit()
+            total += len(linhas)
+            ultimo_id = linhas[-1][0]
+    finally:
+        db.close()
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalcula as features de crédito de todos os perfis.")
+    parser.add_argument("--lote", type=int, default=FEATURES_LOTE, help="perfis por lote")
+    args = parser.parse_args()
+
+    from models.models import Base
+    Base.metadata.create_all(bind=engine)
+    inicio = time.perf_counter()
+    total = recalcular_todas(args.lote)
+    duracao = time.perf_counter() - inicio
+    print(f"FEATURES: {total} perfis em {duracao:.1f} s ({total / duracao if duracao else 0:,.0f} perfis/s), versão {FEATURES_VERSAO}.")
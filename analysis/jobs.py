@@ -0,0 +1,293 @@
+# analysis/jobs.py
+#
+# Modo assíncrono da análise de crédito: POST /api/analise-credito/jobs só
+# enfileira e devolve o id; um pool de ANALISE_WORKERS workers (tarefas
+# asyncio do próprio processo, iniciadas no lifespan) executa a análise e o
+# cliente acompanha por GET .../jobs/{id} ou pelo stream SSE .../eventos.
+#
+# A fila é local (asyncio.Queue com limite ANALISE_FILA_MAX), sem serviço
+# externo. Fila cheia = JobsFilaCheia (a rota responde 503). Jobs concluídos
+# ficam disponíveis por ANALISE_JOB_TTL_SECONDS.
+#
+# O job roda no processo que recebeu o POST, mas o estado (status, datas,
+# resultado) também vai para a tabela analise_jobs: com mais de um worker do
+# uvicorn, o GET e o SSE que caem em outro processo leem do banco (o SSE
+# consulta a cada ANALISE_JOB_POLL_SECONDS). No processo dono, o estado vem
+# da memória e o SSE acorda na hora. Se o processo dono cair ou for encerrado
+# com jobs na fila, esses jobs ficam parados no último status até expirarem.
+#
+# Como a análise é I/O (bureaus e banco) e já é async, os workers são
+# tarefas no event loop: o limite de concorrência vem do tamanho do pool,
+# sem precisar de threads nem processos.
+
+import asyncio
+import os
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+
+from analysis.pipeline import PerfilNaoEncontrado, executar_analise
+from cache import TTLCache
+from db import AsyncSessionLocal
+from metricas import percentil
+from models.models import AnaliseJob
+from schemas.schemas import CreditAnalysisRequest, CreditAnalysisResponse
+
+ANALISE_WORKERS = int(os.getenv("ANALISE_WORKERS", 8))
+ANALISE_FILA_MAX = int(os.getenv("ANALISE_FILA_MAX", 1000))
+ANALISE_JOB_TTL_SECONDS = float(os.getenv("ANALISE_JOB_TTL_SECONDS", 3600))
+ANALISE_JOBS_MAX = int(os.getenv("ANALISE_JOBS_MAX", 50000))
+# Intervalo de consulta ao banco do SSE de um job que roda em outro worker
+ANALISE_JOB_POLL_SECONDS = float(os.getenv("ANALISE_JOB_POLL_SECONDS", 1))
+
+NA_FILA, PROCESSANDO, CONCLUIDA, ERRO = "na_fila", "processando", "concluida", "erro"
+
+
+class JobsFilaCheia(Exception):
+    """A fila de análises atingiu ANALISE_FILA_MAX."""
+
+
+@dataclass
+class JobAnalise:
+    id: str
+    user_id: int
+    cpf: Optional[str] = None                         # só nos jobs deste processo
+    payload: Optional[CreditAnalysisRequest] = None
+    status: str = NA_FILA
+    criado_em: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
+    resultado: Optional[CreditAnalysisResponse] = None
+    erro: Optional[str] = None
+    # False = lido do banco (o job roda em outro worker)
+    local: bool = field(default=True, repr=False)
+    # Trocado a cada mudança de status: quem espera (SSE) acorda no set()
+    _mudanca: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def terminado(self) -> bool:
+        return self.status in (CONCLUIDA, ERRO)
+
+    def _mudar(self, status: str):
+        self.status = status
+        anterior, self._mudanca = self._mudanca, asyncio.Event()
+        anterior.set()
+
+    async def esperar_mudanca(self, timeout: float) -> bool:
+        """Espera a próxima mudança de status. False se passou o timeout."""
+        try:
+            await asyncio.wait_for(self._mudanca.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+def _utc(valor: Optional[datetime]) -> Optional[datetime]:
+    # O SQLite devolve sem fuso (gravado em UTC)
+    return valor.replace(tzinfo=timezone.utc) if valor is not None and valor.tzinfo is None else valor
+
+
+def _job_do_banco(linha: AnaliseJob) -> JobAnalise:
+    return JobAnalise(
+        id=linha.id,
+        user_id=linha.user_id,
+        status=linha.status,
+        criado_em=_utc(linha.criado_em),
+        iniciado_em=_utc(linha.iniciado_em),
+        concluido_em=_utc(linha.concluido_em),
+        resultado=CreditAnalysisResponse.model_validate(linha.resultado) if linha.resultado is not None else None,
+        erro=linha.erro,
+        local=False,
+    )
+
+
+class FilaAnalises:
+    def __init__(self, workers: int = ANALISE_WORKERS, max_fila: int = ANALISE_FILA_MAX):
+        self.workers = workers
+        self.max_fila = max_fila
+        self._fila: asyncio.Queue = asyncio.Queue(maxsize=max_fila)
+        self._tarefas: list = []
+        self._jobs = TTLCache(max_size=ANALISE_JOBS_MAX, ttl_seconds=ANALISE_JOB_TTL_SECONDS)
+        self.processando = 0
+        self.concluidas = 0
+        self.erros = 0
+        self.rejeitadas = 0
+        self.falhas_gravacao = 0
+        self._espera_fila_ms: deque = deque(maxlen=500)
+        self._duracao_ms: deque = deque(maxlen=500)
+
+    # --- API usada pelas rotas ---
+
+    async def enfileirar(self, user_id: int, cpf: str, payload: CreditAnalysisRequest) -> JobAnalise:
+        if self._fila.full():
+            self.rejeitadas += 1
+            raise JobsFilaCheia()
+        job = JobAnalise(id=uuid.uuid4().hex, user_id=user_id, cpf=cpf, payload=payload)
+        # Grava antes de enfileirar: o worker só atualiza a linha que já existe
+        async with AsyncSessionLocal() as db:
+            db.add(AnaliseJob(id=job.id, user_id=user_id, status=job.status, criado_em=job.criado_em))
+            await db.commit()
+        try:
+            self._fila.put_nowait((time.monotonic(), job))
+        except asyncio.QueueFull:
+            # A fila encheu enquanto a linha era gravada
+            self.rejeitadas += 1
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(AnaliseJob).where(AnaliseJob.id == job.id))
+                await db.commit()
+            raise JobsFilaCheia()
+        self._jobs.set(job.id, job)
+        return job
+
+    async def obter(self, job_id: str, user_id: int) -> Optional[JobAnalise]:
+        """O job, se existe e é do usuário (job de outro usuário = não encontrado)."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job if job.user_id == user_id else None
+        return await self._carregar(job_id, user_id)
+
+    async def esperar_mudanca(self, job: JobAnalise, timeout: float) -> Optional[JobAnalise]:
+        """O job depois da próxima mudança de status. None se passou o timeout."""
+        if job.local:
+            return job if await job.esperar_mudanca(timeout) else None
+        fim = time.monotonic() + timeout
+        while (restante := fim - time.monotonic()) > 0:
+            await asyncio.sleep(min(ANALISE_JOB_POLL_SECONDS, restante))
+            atual = await self._carregar(job.id, job.user_id)
+            if atual is None:
+                # Expirou enquanto o cliente acompanhava
+                atual = JobAnalise(
+                    id=job.id, user_id=job.user_id, status=ERRO, criado_em=job.criado_em,
+                    erro="Análise não encontrada ou expirada.", local=False,
+                )
+            if atual.status != job.status:
+                return atual
+        return None
+
+    # --- Estado no banco ---
+
+    async def _carregar(self, job_id: str, user_id: int) -> Optional[JobAnalise]:
+        expira = datetime.now(timezone.utc) - timedelta(seconds=ANALISE_JOB_TTL_SECONDS)
+        async with AsyncSessionLocal() as db:
+            linha = (await db.execute(
+                select(AnaliseJob).where(
+                    AnaliseJob.id == job_id, AnaliseJob.user_id == user_id, AnaliseJob.criado_em >= expira
+                )
+            )).scalar_one_or_none()
+        return _job_do_banco(linha) if linha is not None else None
+
+    async def _gravar(self, job: JobAnalise):
+        """Copia o estado do job para o banco (GET e SSE dos outros workers)."""
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(AnaliseJob).where(AnaliseJob.id == job.id).values(
+                        status=job.status,
+                        iniciado_em=job.iniciado_em,
+                        concluido_em=job.concluido_em,
+                        resultado=job.resultado.model_dump(mode="json") if job.resultado is not None else None,
+                        erro=job.erro,
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            # O processo dono continua respondendo pela memória
+            self.falhas_gravacao += 1
+            print(f"ANÁLISE JOBS: não foi possível gravar o job {job.id}: {e!r}")
+
+    async def _limpar(self):
+        """Apaga do banco os jobs com mais de ANALISE_JOB_TTL_SECONDS."""
+        while True:
+            await asyncio.sleep(min(ANALISE_JOB_TTL_SECONDS, 600))
+            expira = datetime.now(timezone.utc) - timedelta(seconds=ANALISE_JOB_TTL_SECONDS)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(delete(AnaliseJob).where(AnaliseJob.criado_em < expira))
+                    await db.commit()
+            except Exception as e:
+                print(f"ANÁLISE JOBS: falha ao limpar jobs expirados: {e!r}")
+
+    # --- Ciclo de vida ---
+
+    async def start(self):
+        if not self._tarefas:
+            self._tarefas = [
+                asyncio.create_task(self._run(), name=f"analise-worker-{i}") for i in range(self.workers)
+            ]
+            self._tarefas.append(asyncio.create_task(self._limpar(), name="analise-limpeza"))
+
+    async def stop(self, drain_timeout: float = 10.0):
+        """Espera os jobs da fila terminarem (até drain_timeout) e encerra os workers."""
+        if not self._tarefas:
+            return
+        try:
+            await asyncio.wait_for(self._fila.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"ANÁLISE JOBS: encerrando com {self._fila.qsize()} jobs na fila.")
+        for tarefa in self._tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*self._tarefas, return_exceptions=True)
+        self._tarefas = []
+
+    # --- Workers ---
+
+    async def _run(self):
+        while True:
+            enfileirado_em, job = await self._fila.get()
+            try:
+                self._espera_fila_ms.append((time.monotonic() - enfileirado_em) * 1000)
+                await self._executar(job)
+            finally:
+                self._fila.task_done()
+
+    async def _executar(self, job: JobAnalise):
+        job.iniciado_em = datetime.now(timezone.utc)
+        job._mudar(PROCESSANDO)
+        await self._gravar(job)
+        self.processando += 1
+        inicio = time.monotonic()
+        try:
+            async with AsyncSessionLocal() as db:
+                job.resultado = await executar_analise(db, job.user_id, job.cpf, job.payload)
+            status = CONCLUIDA
+            self.concluidas += 1
+        except PerfilNaoEncontrado:
+            job.erro = "Perfil de usuário não encontrado. Crie um perfil antes de solicitar a análise."
+            status = ERRO
+            self.erros += 1
+        except Exception as e:
+            print(f"ANÁLISE JOBS: erro inesperado no job {job.id}: {e!r}")
+            job.erro = "Ocorreu um erro interno ao processar a análise."
+            status = ERRO
+            self.erros += 1
+        finally:
+            self.processando -= 1
+        self._duracao_ms.append((time.monotonic() - inicio) * 1000)
+        job.concluido_em = datetime.now(timezone.utc)
+        job._mudar(status)
+        await self._gravar(job)
+
+    # --- Métricas ---
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_depth": self._fila.qsize(),
+            "max_queue": self.max_fila,
+            "processando": self.processando,
+            "concluidas": self.concluidas,
+            "erros": self.erros,
+            "rejeitadas": self.rejeitadas,
+            "falhas_gravacao": self.falhas_gravacao,
+            "queue_wait_ms_p95": percentil(self._espera_fila_ms, 95),
+            "duracao_ms_p50": percentil(self._duracao_ms, 50),
+            "duracao_ms_p95": percentil(self._duracao_ms, 95),
+        }
+
+
+fila_analises = FilaAnalises()
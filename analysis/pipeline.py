@@ -0,0 +1,111 @@
+# analysis/pipeline.py
+#
+# A análise de crédito de ponta a ponta: features do perfil -> pré-aprovação
+# (só com bureaus em cache e se a política aprova) -> bureaus -> score -> decisão.
+# Usada tanto pelo POST síncrono quanto pelos jobs (analysis/jobs.py), para
+# os dois modos decidirem exatamente igual.
+#
+# Cada análise é gravada em analises_credito com as entradas e a decisão,
+# para medir mudanças de política depois (analysis/replay.py).
+
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from analysis.data_sources import consultar_fontes, fontes_em_cache
+from analysis.decision import make_decision
+from analysis.features import atualizar_features, features_atuais
+from analysis.politica import politica_vigente
+from analysis.pre_aprovacao import decisao_pre_aprovada
+from analysis.scoring import calculate_credit_score
+from models.models import AnaliseCredito, FeaturesPerfil, PreAprovacao
+from schemas.schemas import CreditAnalysisRequest, CreditAnalysisResponse
+
+
+class PerfilNaoEncontrado(Exception):
+    pass
+
+
+def dados_perfil(perfil: FeaturesPerfil) -> dict:
+    """Os campos do perfil que entram na análise, como ficam guardados no histórico."""
+    return {
+        "renda_mensal": float(perfil.renda_mensal) if perfil.renda_mensal is not None else None,
+        "possui_imovel": bool(perfil.possui_imovel),
+        "possui_veiculo": bool(perfil.possui_veiculo),
+        "data_admissao": perfil.data_admissao.isoformat() if perfil.data_admissao else None,
+        "data_nascimento": perfil.data_nascimento.isoformat() if perfil.data_nascimento else None,
+    }
+
+
+async def _registrar(
+    db: AsyncSession,
+    user_id: int,
+    perfil: FeaturesPerfil,
+    payload: CreditAnalysisRequest,
+    decisao: CreditAnalysisResponse,
+    serasa: Optional[BaseModel] = None,
+    bacen: Optional[BaseModel] = None,
+    versao_politica: Optional[str] = None,
+    pre_aprovada: bool = False,
+):
+    db.add(AnaliseCredito(
+        user_id=user_id,
+        valor_solicitado=payload.requested_amount,
+        parcelas=payload.installments,
+        perfil=dados_perfil(perfil),
+        serasa=serasa.model_dump() if serasa else None,
+        bacen_scr=bacen.model_dump() if bacen else None,
+        fontes_indisponiveis=decisao.fontes_indisponiveis,
+        score=decisao.score,
+        decisao=decisao.decision,
+        versao_politica=versao_politica,
+        pre_aprovada=pre_aprovada,
+    ))
+    try:
+        await db.commit()
+    except Exception as e:
+        # O histórico não pode derrubar a análise: o cliente recebe a decisão mesmo assim
+        await db.rollback()
+        print(f"ANÁLISE: erro ao gravar o histórico: {e!r}")
+
+
+async def executar_analise(
+    db: AsyncSession, user_id: int, cpf: str, payload: CreditAnalysisRequest
+) -> CreditAnalysisResponse:
+    # Uma consulta: features pré-calculadas do perfil + pré-aprovação
+    result = await db.execute(
+        select(FeaturesPerfil, PreAprovacao)
+        .outerjoin(PreAprovacao, PreAprovacao.user_id == FeaturesPerfil.user_id)
+        .where(FeaturesPerfil.user_id == user_id)
+    )
+    linha = result.first()
+    perfil, pre = linha if linha else (None, None)
+    if perfil is None or not features_atuais(perfil):
+        # Sem linha (perfil anterior às features) ou velha: recalcula e grava
+        perfil = await atualizar_features(db, user_id, perfil)
+        if perfil is None:
+            raise PerfilNaoEncontrado()
+        if linha is None:
+            pre = await db.get(PreAprovacao, user_id)
+
+    if pre is not None and pre.limite_aprovado > 0:
+        # Atalho só com Serasa e SCR recentes no cache (sem chamar os bureaus)
+        em_cache = await fontes_em_cache(cpf)
+        serasa, bacen = em_cache.get("serasa"), em_cache.get("bacen_scr")
+        versao_politica = politica_vigente().versao
+        pre_aprovado = decisao_pre_aprovada(pre, perfil, payload, serasa, bacen)
+        if pre_aprovado:
+            print(f"DECISÃO FINAL (pré-aprovação): {pre_aprovado.decision}")
+            await _registrar(db, user_id, perfil, payload, pre_aprovado, serasa, bacen, versao_politica, pre_aprovada=True)
+            return pre_aprovado
+
+    fontes = await consultar_fontes(cpf, perfil)
+    serasa, bacen = fontes.dados.get("serasa"), fontes.dados.get("bacen_scr")
+    score = calculate_credit_score(serasa, bacen, perfil, payload)
+    versao_politica = politica_vigente().versao
+    decision = make_decision(score, payload, perfil, fontes.falhas, serasa=serasa, bacen=bacen)
+    print(f"DECISÃO FINAL: {decision.decision} - {decision.message}")
+    await _registrar(db, user_id, perfil, payload, decision, serasa, bacen, versao_politica)
+    return decision
@@ -0,0 +1,274 @@
+# analysis/politica.py
+#
+# Motor de regras da decisão de crédito.
+#
+# A política fica em dados (data/politica_credito.json, ou
+# POLITICA_CREDITO_PATH): parâmetros, uma lista ordenada de regras e uma
+# decisão padrão. Cada regra é um "E" de condições [fato, operador, valor];
+# a primeira regra que casa decide. Valores "$nome" apontam para os
+# parâmetros.
+#
+# Ao carregar, a política é validada e compilada UMA vez numa função Python
+# plana (um `if` por regra, comparando variáveis locais com constantes), então
+# avaliar uma análise não interpreta JSON nem percorre estruturas. Como no
+# catálogo, o arquivo é relido quando muda e a troca é atômica.
+#
+# Dry-run: com POLITICA_CANDIDATA_PATH, cada análise também é avaliada pela
+# política candidata, sem afetar a resposta; as divergências são contadas
+# (GET /api/admin/politica e /metrics).
+#
+#   python -m analysis.politica data/politica_credito.json   # valida e mostra o plano
+
+import json
+import math
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+POLITICA_CREDITO_PATH = os.getenv(
+    "POLITICA_CREDITO_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "politica_credito.json"),
+)
+POLITICA_CANDIDATA_PATH = os.getenv("POLITICA_CANDIDATA_PATH")
+POLITICA_CHECK_INTERVAL_SECONDS = float(os.getenv("POLITICA_CHECK_INTERVAL_SECONDS", 5))
+
+DECISOES = ("Aprovado", "Negado", "Análise Manual")
+OPERADORES = ("<", "<=", ">", ">=", "==", "!=")
+# Parâmetros que o resto do sistema usa (pré-aprovação)
+PARAMETROS_OBRIGATORIOS = ("score_aprovacao", "comprometimento_maximo")
+
+
+class Fatos(NamedTuple):
+    """Tudo que as regras podem consultar, calculado uma vez por análise."""
+    score: int
+    fontes_indisponiveis: bool
+    restricao: bool               # negativação no Serasa ou atraso no SCR
+    renda: float
+    comprometimento: float        # parcela / renda (inf sem renda)
+    valor: float
+    parcelas: int
+    fora_limites_produto: bool
+    faixa_renda: int              # 0 (até 2 mil) a 4 (acima de 20 mil), ver analysis/features.py
+    meses_emprego: int            # 0 = sem data de admissão
+    idade: int                    # 0 = sem data de nascimento
+
+
+FATOS = Fatos._fields
+
+
+class PoliticaInvalida(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Resultado:
+    regra: str
+    decisao: str
+    mensagem: str
+
+
+@dataclass(frozen=True)
+class Politica:
+    versao: str
+    produto: str
+    parametros: Mapping[str, float]
+    resultados: Tuple[Resultado, ...]   # um por regra, mais o padrão no fim
+    codigo: str                         # fonte do plano compilado (para inspeção)
+    _plano: Callable[..., int]
+
+    def avaliar(self, fatos: Fatos) -> Resultado:
+        return self.resultados[self._plano(*fatos)]
+
+
+def _literal(valor, parametros: Mapping[str, float], onde: str) -> str:
+    if isinstance(valor, str) and valor.startswith("$"):
+        if valor[1:] not in parametros:
+            raise PoliticaInvalida(f"{onde}: parâmetro desconhecido '{valor}'.")
+        valor = parametros[valor[1:]]
+    if isinstance(valor, bool):
+        return repr(valor)
+    if isinstance(valor, (int, float)) and math.isfinite(valor):
+        return repr(valor)
+    raise PoliticaInvalida(f"{onde}: valor inválido {valor!r} (use número, true/false ou '$parametro').")
+
+
+def _exigir(valor, tipo: type, onde: str, descricao: str):
+    # Estrutura errada (ex.: lista onde vai objeto) vira PoliticaInvalida, não
+    # AttributeError/TypeError no meio da compilação
+    if not isinstance(valor, tipo):
+        raise PoliticaInvalida(f"{onde}: deve ser {descricao}.")
+    return valor
+
+
+def _resultado(dados: dict, onde: str) -> Resultado:
+    _exigir(dados, dict, onde, "um objeto com nome, decisao e mensagem")
+    try:
+        nome, decisao, mensagem = str(dados["nome"]), dados["decisao"], str(dados["mensagem"])
+    except KeyError as e:
+        raise PoliticaInvalida(f"{onde}: falta o campo {e}.")
+    if decisao not in DECISOES:
+        raise PoliticaInvalida(f"{onde}: decisão '{decisao}' inválida (use {', '.join(DECISOES)}).")
+    try:
+        mensagem.format(fontes="")
+    except (KeyError, IndexError, ValueError):
+        raise PoliticaInvalida(f"{onde}: a mensagem só pode usar o marcador {{fontes}}.")
+    return Resultado(regra=nome, decisao=decisao, mensagem=mensagem)
+
+
+def compilar_politica(data: dict, versao: Optional[str] = None) -> Politica:
+    """Valida a política e gera o plano de avaliação."""
+    _exigir(data, dict, "política", "um objeto")
+    parametros = _exigir(data.get("parametros", {}), dict, "parametros", "um objeto")
+    for nome, valor in parametros.items():
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            raise PoliticaInvalida(f"Parâmetro '{nome}' precisa ser numérico.")
+    faltando = [p for p in PARAMETROS_OBRIGATORIOS if p not in parametros]
+    if faltando:
+        raise PoliticaInvalida(f"Faltam os parâmetros: {', '.join(faltando)}.")
+
+    linhas = [f"def _plano({', '.join(FATOS)}):"]
+    resultados = []
+    for i, regra in enumerate(_exigir(data.get("regras", []), list, "regras", "uma lista")):
+        _exigir(regra, dict, f"regra {i}", "um objeto")
+        onde = f"regra {i} ({regra.get('nome', '?')})"
+        resultados.append(_resultado(regra, onde))
+        condicoes = []
+        for condicao in _exigir(regra.get("quando", []), list, f"{onde}, quando", "uma lista de condições"):
+            if not isinstance(condicao, list) or len(condicao) != 3:
+                raise PoliticaInvalida(f"{onde}: condição deve ser [fato, operador, valor].")
+            fato, operador, valor = condicao
+            if fato not in FATOS:
+                raise PoliticaInvalida(f"{onde}: fato desconhecido '{fato}' (use {', '.join(FATOS)}).")
+            if operador not in OPERADORES:
+                raise PoliticaInvalida(f"{onde}: operador '{operador}' inválido.")
+            condicoes.append(f"{fato} {operador} {_literal(valor, parametros, onde)}")
+        if not condicoes:
+            raise PoliticaInvalida(f"{onde}: regra sem condições (use 'padrao').")
+        linhas.append(f"    if {' and '.join(condicoes)}:")
+        linhas.append(f"        return {i}")
+    if "padrao" not in data:
+        raise PoliticaInvalida("Falta a decisão 'padrao'.")
+    resultados.append(_resultado(data["padrao"], "padrao"))
+    linhas.append(f"    return {len(resultados) - 1}")
+
+    # Só nomes de FATOS, operadores da lista e literais numéricos/booleanos
+    # entram no código: nada vindo do arquivo é executado como texto livre.
+    codigo = "\n".join(linhas)
+    escopo: Dict[str, object] = {}
+    exec(compile(codigo, f"<politica {data.get('versao', '?')}>", "exec"), {"__builtins__": {}}, escopo)
+
+    return Politica(
+        versao=str(versao or data.get("versao", "?")),
+        produto=str(data.get("produto", "default")),
+        parametros=MappingProxyType(dict(parametros)),
+        resultados=tuple(resultados),
+        codigo=codigo,
+        _plano=escopo["_plano"],
+    )
+
+
+def carregar_politica(path: str) -> Politica:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return compilar_politica(data, versao=data.get("versao") or str(os.stat(path).st_mtime_ns))
+
+
+class ArquivoPolitica:
+    """Política lida de um arquivo, recarregada quando ele muda (mesmo esquema do catalogo.py)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._politica = carregar_politica(path)
+        self._mtime_ns = os.stat(path).st_mtime_ns
+        self._proxima_checagem = time.monotonic() + POLITICA_CHECK_INTERVAL_SECONDS
+
+    def recarregar(self) -> Politica:
+        with self._lock:
+            try:
+                mtime_ns = os.stat(self.path).st_mtime_ns
+                nova = carregar_politica(self.path)
+            except Exception as e:
+                # Qualquer erro (não só PoliticaInvalida) mantém o último plano bom:
+                # um arquivo quebrado não pode derrubar as análises
+                print(f"POLÍTICA: erro ao recarregar {self.path}, mantendo versão {self._politica.versao}: {e!r}")
+                return self._politica
+            self._politica, self._mtime_ns = nova, mtime_ns
+            print(f"POLÍTICA: versão {nova.versao} carregada de {self.path} ({len(nova.resultados)} regras).")
+            return nova
+
+    def obter(self) -> Politica:
+        agora = time.monotonic()
+        if agora >= self._proxima_checagem:
+            self._proxima_checagem = agora + POLITICA_CHECK_INTERVAL_SECONDS
+            try:
+                mudou = os.stat(self.path).st_mtime_ns != self._mtime_ns
+            except OSError:
+                mudou = False
+            if mudou:
+                return self.recarregar()
+        return self._politica
+
+
+_vigente = ArquivoPolitica(POLITICA_CREDITO_PATH)
+_candidata: Optional[ArquivoPolitica] = ArquivoPolitica(POLITICA_CANDIDATA_PATH) if POLITICA_CANDIDATA_PATH else None
+
+
+def politica_vigente() -> Politica:
+    return _vigente.obter()
+
+
+def politica_candidata() -> Optional[Politica]:
+    return _candidata.obter() if _candidata else None
+
+
+class DryRun:
+    """Conta quantas análises a candidata decidiria diferente da vigente."""
+
+    def __init__(self):
+        self.avaliadas = 0
+        self.divergentes = 0
+        self.transicoes: Dict[str, int] = {}
+
+    def registrar(self, vigente: Resultado, candidata: Resultado):
+        self.avaliadas += 1
+        if vigente.decisao != candidata.decisao:
+            self.divergentes += 1
+            chave = f"{vigente.decisao} -> {candidata.decisao}"
+            self.transicoes[chave] = self.transicoes.get(chave, 0) + 1
+
+    def stats(self) -> dict:
+        return {
+            "avaliadas": self.avaliadas,
+            "divergentes": self.divergentes,
+            "taxa_divergencia": round(self.divergentes / self.avaliadas, 4) if self.avaliadas else 0.0,
+            "transicoes": dict(self.transicoes),
+        }
+
+
+dry_run = DryRun()
+
+
+def estado_politica() -> dict:
+    vigente, candidata = politica_vigente(), politica_candidata()
+    return {
+        "vigente": {"versao": vigente.versao, "regras": [r.regra for r in vigente.resultados]},
+        "candidata": {"versao": candidata.versao, "regras": [r.regra for r in candidata.resultados]} if candidata else None,
+        "dry_run": dry_run.stats(),
+    }
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else POLITICA_CREDITO_PATH
+    try:
+        politica = carregar_politica(path)
+    except (OSError, ValueError) as e:
+        sys.exit(f"POLÍTICA INVÁLIDA: {e}")
+    print(f"Política {politica.versao} (produto {politica.produto}), parâmetros {dict(politica.parametros)}")
+    print(politica.codigo)
+    for i, r in enumerate(politica.resultados):
+        print(f"  {i}: {r.regra:<28} -> {r.decisao}")
@@ -0,0 +1,208 @@
+# analysis/pre_aprovacao.py
+#
+# Job noturno de pré-aprovação: percorre todos os perfis (com o usuário),
+# calcula score e limite pré-aprovado de forma vetorizada (NumPy, um lote
+# inteiro por vez) e grava em pre_aprovacoes com upsert em massa.
+#
+# Os perfis são lidos em lotes por keyset (user_id > último), então a memória
+# fica limitada ao tamanho do lote e nenhum cursor fica aberto enquanto
+# gravamos (o SQLite não deixa escrever com leitura em andamento).
+#
+# A pré-aprovação usa só os dados do perfil (sem bureaus, que são cobrados
+# por consulta). Na análise online (analysis/pipeline.py), se o perfil não
+# mudou desde o cálculo e o pedido cabe no limite, a resposta é imediata,
+# mas só com Serasa e SCR recentes no cache (analysis/cache_bureaus.py): o
+# score é recalculado com eles e a política vigente precisa aprovar. A
+# pré-aprovação só garante o limite; sem isso a análise segue o fluxo
+# completo com os bureaus.
+#
+#   python -m analysis.pre_aprovacao --lote 10000
+
+import argparse
+import hashlib
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from amortizacao import calcular_amortizacao
+from analysis.decision import montar_fatos
+from analysis.politica import politica_vigente
+from analysis.scoring import calculate_credit_score
+from catalogo import obter_produto
+from db import SessionLocal, engine, upsert_stmt
+from models.models import PerfilUsuario, PreAprovacao, User
+from schemas.schemas import BacenSCRData, CreditAnalysisRequest, CreditAnalysisResponse, SerasaData
+
+PRE_APROVACAO_LOTE = int(os.getenv("PRE_APROVACAO_LOTE", 10000))
+# Depois disso o resultado é considerado velho e a análise segue o fluxo completo
+PRE_APROVACAO_VALIDADE_HORAS = float(os.getenv("PRE_APROVACAO_VALIDADE_HORAS", 48))
+
+# Score mínimo para ter algum limite (entre ele e o score_aprovacao da política o limite é reduzido)
+SCORE_LIMITE_PARCIAL = 600
+PRODUTO_PRE_APROVACAO = "default"  # empréstimo pessoal
+
+COLUNAS_PERFIL = (
+    PerfilUsuario.user_id,
+    PerfilUsuario.renda_mensal,
+    PerfilUsuario.possui_imovel,
+    PerfilUsuario.possui_veiculo,
+    PerfilUsuario.data_admissao,
+    PerfilUsuario.data_nascimento,
+)
+
+
+def assinatura_perfil(renda_mensal, possui_imovel, possui_veiculo, data_admissao, data_nascimento) -> str:
+    """Hash dos campos do perfil usados no cálculo."""
+    renda = f"{float(renda_mensal):.2f}" if renda_mensal is not None else ""
+    bruto = f"{renda}|{bool(possui_imovel)}|{bool(possui_veiculo)}|{data_admissao or ''}|{data_nascimento or ''}"
+    return hashlib.blake2b(bruto.encode(), digest_size=16).hexdigest()
+
+
+def _meses_desde(datas, hoje: np.datetime64) -> np.ndarray:
+    # None vira NaT -> NaN -> 0 meses
+    dias = (hoje - np.array(datas, dtype="datetime64[D]")).astype("timedelta64[D]").astype(float)
+    return np.nan_to_num(dias / 30.44, nan=0.0)
+
+
+def pontuar_lote(renda, possui_imovel, possui_veiculo, data_admissao, data_nascimento, hoje: Optional[date] = None) -> dict:
+    """
+    Score (0 a 1000) e limite pré-aprovado para um lote inteiro de perfis.
+    Recebe sequências do mesmo tamanho e devolve arrays NumPy.
+    """
+    hoje = np.datetime64(hoje or date.today(), "D")
+    renda = np.nan_to_num(np.array(renda, dtype=float), nan=0.0)
+    imovel = np.array(possui_imovel, dtype=bool)
+    veiculo = np.array(possui_veiculo, dtype=bool)
+    meses_emprego = _meses_desde(data_admissao, hoje)
+    idade = _meses_desde(data_nascimento, hoje) / 12
+
+    score = (
+        500.0
+        + np.clip(renda / 100, 0, 200)            # até +200 (renda de 20 mil)
+        + np.clip(meses_emprego, 0, 120) * 0.5    # até +60 (10 anos no emprego)
+        + 30 * imovel
+        + 15 * veiculo
+        - 50 * ((idade > 0) & (idade < 21))
+    )
+    score = np.clip(np.rint(score), 0, 1000).astype(int)
+
+    # Limite: maior valor cuja parcela (no prazo máximo) cabe no comprometimento da renda
+    parametros = politica_vigente().parametros
+    produto = obter_produto(PRODUTO_PRE_APROVACAO)
+    i, n = produto.taxa_juros_mensal, produto.prazo_max
+    fator_valor_presente = n if i == 0 else (1 - (1 + i) ** -n) / i
+    limite = parametros["comprometimento_maximo"] * renda * fator_valor_presente
+    limite *= np.where(score >= parametros["score_aprovacao"], 1.0, np.where(score >= SCORE_LIMITE_PARCIAL, 0.5, 0.0))
+    limite = np.minimum(limite, produto.valor_max)
+    limite = np.where(limite >= produto.valor_min, np.floor(limite / 100) * 100, 0.0)  # arredonda para baixo, em centenas
+    return {"score": score, "limite_aprovado": limite}
+
+
+def executar_pre_aprovacao(tamanho_lote: int = PRE_APROVACAO_LOTE) -> int:
+    """Calcula e grava a pré-aprovação de todos os perfis. Retorna quantos processou."""
+    calculado_em = datetime.now(timezone.utc)
+    upsert = upsert_stmt(
+        engine.dialect.name, PreAprovacao, ["user_id"], ["score", "limite_aprovado", "assinatura_perfil", "calculado_em"]
+    )
+    ultimo_id, total = 0, 0
+    db = SessionLocal()
+    try:
+        while True:
+            linhas = db.execute(
+                select(*COLUNAS_PERFIL)
+                .join(User, User.id == PerfilUsuario.user_id)
+                .where(PerfilUsuario.user_id > ultimo_id)
+                .order_by(PerfilUsuario.user_id)
+                .limit(tamanho_lote)
+            ).all()
+            if not linhas:
+                break
+
+            user_ids, renda, imovel, veiculo, admissao, nascimento = zip(*linhas)
+            renda_float = [float(r) if r is not None else np.nan for r in renda]
+            resultado = pontuar_lote(renda_float, imovel, veiculo, admissao, nascimento)
+
+            scores = resultado["score"].tolist()
+            limites = resultado["limite_aprovado"].tolist()
+            db.execute(upsert, [
+                {
+                    "user_id": user_ids[k],
+                    "score": scores[k],
+                    "limite_aprovado": limites[k],
+                    "assinatura_perfil": assinatura_perfil(*linhas[k][1:]),
+                    "calculado_em": calculado_em,
+                }
+                for k in range(len(linhas))
+            ])
+            db.commit()
+
+            total += len(linhas)
+            ultimo_id = user_ids[-1]
+    finally:
+        db.close()
+    return total
+
+
+def decisao_pre_aprovada(
+    pre: Optional[PreAprovacao],
+    features,
+    payload: CreditAnalysisRequest,
+    serasa: Optional[SerasaData] = None,
+    bacen: Optional[BacenSCRData] = None,
+) -> Optional[CreditAnalysisResponse]:
+    """
+    Resposta imediata da análise online a partir da pré-aprovação, ou None
+    se ela não se aplica (não existe, está velha, o perfil mudou, o valor
+    passa do limite, a parcela não cabe na renda, falta a resposta em cache
+    de algum bureau ou a política vigente não aprova com os bureaus).
+    """
+    if pre is None or pre.limite_aprovado <= 0:
+        return None
+    # O score da pré-aprovação vem só do perfil declarado: a decisão usa os
+    # bureaus em cache, com o mesmo score e a mesma política do fluxo completo
+    if serasa is None or bacen is None:
+        return None
+    calculado_em = pre.calculado_em if pre.calculado_em.tzinfo else pre.calculado_em.replace(tzinfo=timezone.utc)
+    if datetime.now(timezone.utc) - calculado_em > timedelta(hours=PRE_APROVACAO_VALIDADE_HORAS):
+        return None
+    # features (FeaturesPerfil) já traz a assinatura dos campos do perfil
+    if features.assinatura != pre.assinatura_perfil or payload.requested_amount > float(pre.limite_aprovado):
+        return None
+
+    produto = obter_produto(PRODUTO_PRE_APROVACAO)
+    if not produto.prazo_min <= payload.installments <= produto.prazo_max:
+        return None
+    parcela = calcular_amortizacao(payload.requested_amount, produto.taxa_juros_mensal, payload.installments)["valor_parcela"]
+    politica = politica_vigente()
+    if parcela > politica.parametros["comprometimento_maximo"] * float(features.renda_mensal or 0):
+        return None
+
+    score = calculate_credit_score(serasa, bacen, features, payload)
+    if politica.avaliar(montar_fatos(politica, score, payload, features, (), serasa, bacen)).decisao != "Aprovado":
+        return None
+
+    return CreditAnalysisResponse(
+        cpf=payload.cpf,
+        decision="Aprovado",
+        score=score,
+        message="Crédito pré-aprovado!",
+        approved_amount=payload.requested_amount,
+        approved_installments=payload.installments,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calcula a pré-aprovação de crédito de todos os perfis.")
+    parser.add_argument("--lote", type=int, default=PRE_APROVACAO_LOTE, help="perfis por lote")
+    args = parser.parse_args()
+
+    from models.models import Base
+    Base.metadata.create_all(bind=engine)
+    inicio = time.perf_counter()
+    total = executar_pre_aprovacao(args.lote)
+    duracao = time.perf_counter() - inicio
+    print(f"PRÉ-APROVAÇÃO: {total} perfis em {duracao:.1f} s ({total / duracao if duracao else 0:,.0f} perfis/s).")
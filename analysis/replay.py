@@ -0,0 +1,233 @@
+# analysis/replay.py
+#
+# Backtest de política: refaz as análises gravadas em analises_credito com
+# uma política (e, se quiser, uma função de score) nova e compara com o que
+# foi decidido na época: taxa de aprovação, distribuição de decisões e de
+# score, e quantas análises mudariam de decisão.
+#
+# O histórico é dividido em faixas de id e cada faixa vai para um processo
+# (ProcessPoolExecutor, um por núcleo por padrão). Cada processo lê só a sua
+# faixa, avalia e devolve um resumo pequeno (contadores + histograma), que
+# o processo principal soma. A memória não cresce com o tamanho do histórico.
+#
+# Análises por pré-aprovação ficam de fora: não passaram pelos bureaus nem
+# pela política.
+#
+#   python -m analysis.replay --politica candidata.json
+#   python -m analysis.replay --politica candidata.json --score meu_modulo.novo_score --processos 8
+
+import argparse
+import importlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+
+from analysis.decision import montar_fatos
+from analysis.features import calcular_features
+from analysis.politica import POLITICA_CREDITO_PATH, carregar_politica
+from db import engine
+from models.models import AnaliseCredito
+
+REPLAY_LOTE = int(os.getenv("REPLAY_LOTE", 50000))
+SCORE_PADRAO = "analysis.scoring.calculate_credit_score"
+
+# Histograma de score em faixas de 10 pontos (0..1000)
+LARGURA_FAIXA_SCORE = 10
+FAIXAS_SCORE = 1000 // LARGURA_FAIXA_SCORE + 1
+
+COLUNAS = (
+    AnaliseCredito.criado_em,
+    AnaliseCredito.valor_solicitado,
+    AnaliseCredito.parcelas,
+    AnaliseCredito.perfil,
+    AnaliseCredito.serasa,
+    AnaliseCredito.bacen_scr,
+    AnaliseCredito.fontes_indisponiveis,
+    AnaliseCredito.score,
+    AnaliseCredito.decisao,
+)
+
+
+class ResumoReplay:
+    """Contadores de uma faixa (ou de tudo, depois de somar)."""
+
+    def __init__(self):
+        self.total = 0
+        self.antes: Dict[str, int] = {}
+        self.depois: Dict[str, int] = {}
+        self.transicoes: Dict[str, int] = {}
+        self.score_antes = np.zeros(FAIXAS_SCORE, dtype=np.int64)
+        self.score_depois = np.zeros(FAIXAS_SCORE, dtype=np.int64)
+        self.soma_score_antes = 0
+        self.soma_score_depois = 0
+
+    def registrar(self, score_antes: int, decisao_antes: str, score_depois: int, decisao_depois: str):
+        self.total += 1
+        self.antes[decisao_antes] = self.antes.get(decisao_antes, 0) + 1
+        self.depois[decisao_depois] = self.depois.get(decisao_depois, 0) + 1
+        if decisao_antes != decisao_depois:
+            chave = f"{decisao_antes} -> {decisao_depois}"
+            self.transicoes[chave] = self.transicoes.get(chave, 0) + 1
+        self.score_antes[score_antes // LARGURA_FAIXA_SCORE] += 1
+        self.score_depois[score_depois // LARGURA_FAIXA_SCORE] += 1
+        self.soma_score_antes += score_antes
+        self.soma_score_depois += score_depois
+
+    def somar(self, outro: "ResumoReplay"):
+        self.total += outro.total
+        for meu, dele in ((self.antes, outro.antes), (self.depois, outro.depois), (self.transicoes, outro.transicoes)):
+            for chave, n in dele.items():
+                meu[chave] = meu.get(chave, 0) + n
+        self.score_antes += outro.score_antes
+        self.score_depois += outro.score_depois
+        self.soma_score_antes += outro.soma_score_antes
+        self.soma_score_depois += outro.soma_score_depois
+
+    def taxa(self, contagem: Dict[str, int], decisao: str) -> float:
+        return contagem.get(decisao, 0) / self.total if self.total else 0.0
+
+    @staticmethod
+    def _percentil(histograma: np.ndarray, p: float) -> int:
+        # Início da faixa onde cai o percentil (precisão de LARGURA_FAIXA_SCORE pontos)
+        acumulado = np.cumsum(histograma)
+        if not acumulado[-1]:
+            return 0
+        return int(np.searchsorted(acumulado, p / 100 * acumulado[-1])) * LARGURA_FAIXA_SCORE
+
+    def relatorio(self) -> str:
+        if not self.total:
+            return "Nenhuma análise no período."
+        linhas = [f"{self.total:,} análises refeitas"]
+        linhas.append(f"  {'decisão':<16} {'antes':>8} {'depois':>8} {'delta':>9}")
+        for decisao in sorted(set(self.antes) | set(self.depois)):
+            antes, depois = self.taxa(self.antes, decisao), self.taxa(self.depois, decisao)
+            linhas.append(f"  {decisao:<16} {antes:>8.2%} {depois:>8.2%} {(depois - antes) * 100:>+8.2f}pp")
+
+        linhas.append(f"  {'score':<16} {'antes':>8} {'depois':>8} {'delta':>9}")
+        media_antes, media_depois = self.soma_score_antes / self.total, self.soma_score_depois / self.total
+        linhas.append(f"  {'média':<16} {media_antes:>8.1f} {media_depois:>8.1f} {media_depois - media_antes:>+9.1f}")
+        for p in (10, 50, 90):
+            antes, depois = self._percentil(self.score_antes, p), self._percentil(self.score_depois, p)
+            linhas.append(f"  {f'p{p}':<16} {antes:>8} {depois:>8} {depois - antes:>+9}")
+
+        linhas.append("  distribuição de score (faixas de 100)")
+        por_cem = 100 // LARGURA_FAIXA_SCORE
+        for inicio in range(0, FAIXAS_SCORE, por_cem):
+            antes = int(self.score_antes[inicio:inicio + por_cem].sum()) / self.total
+            depois = int(self.score_depois[inicio:inicio + por_cem].sum()) / self.total
+            if antes or depois:
+                faixa = f"{inicio * LARGURA_FAIXA_SCORE}-{min(1000, (inicio + por_cem) * LARGURA_FAIXA_SCORE - 1)}"
+                linhas.append(f"    {faixa:<14} {antes:>8.2%} {depois:>8.2%} {(depois - antes) * 100:>+8.2f}pp")
+
+        mudaram = sum(self.transicoes.values())
+        linhas.append(f"  decisões que mudam: {mudaram:,} ({mudaram / self.total:.2%})")
+        for transicao, n in sorted(self.transicoes.items(), key=lambda t: -t[1]):
+            linhas.append(f"    {transicao:<32} {n:>10,}")
+        return "\n".join(linhas)
+
+
+# --- Processos ---
+
+_politica = None
+_calcular_score = None
+
+
+def _importar(caminho: str):
+    modulo, nome = caminho.rsplit(".", 1)
+    return getattr(importlib.import_module(modulo), nome)
+
+
+def _iniciar_processo(caminho_politica: str, score: str):
+    global _politica, _calcular_score
+    # As conexões herdadas do processo pai (fork) não podem ser reaproveitadas aqui
+    engine.dispose(close=False)
+    _politica = carregar_politica(caminho_politica)
+    _calcular_score = _importar(score)
+
+
+def _filtro_periodo(stmt, desde: Optional[datetime], ate: Optional[datetime]):
+    stmt = stmt.where(AnaliseCredito.pre_aprovada.is_(False))
+    if desde:
+        stmt = stmt.where(AnaliseCredito.criado_em >= desde)
+    if ate:
+        stmt = stmt.where(AnaliseCredito.criado_em < ate)
+    return stmt
+
+
+def _replay_faixa(inicio: int, fim: int, desde: Optional[datetime], ate: Optional[datetime]) -> ResumoReplay:
+    """Refaz as análises com inicio <= id < fim."""
+    stmt = _filtro_periodo(select(*COLUNAS), desde, ate).where(AnaliseCredito.id >= inicio, AnaliseCredito.id < fim)
+    with engine.connect() as conn:
+        linhas = conn.execute(stmt).all()
+
+    resumo = ResumoReplay()
+    for criado_em, valor, parcelas, perfil, serasa, bacen, fontes_indisponiveis, score_antes, decisao_antes in linhas:
+        # Features como seriam no dia da análise; objetos leves com os mesmos
+        # atributos de FeaturesPerfil, SerasaData, etc.
+        for campo in ("data_admissao", "data_nascimento"):
+            if perfil[campo]:
+                perfil[campo] = date.fromisoformat(perfil[campo])
+        perfil = SimpleNamespace(**calcular_features(**perfil, hoje=criado_em.date()))
+        pedido = SimpleNamespace(requested_amount=float(valor), installments=parcelas)
+        serasa = SimpleNamespace(**serasa) if serasa else None
+        bacen = SimpleNamespace(**bacen) if bacen else None
+
+        score = _calcular_score(serasa, bacen, perfil, pedido)
+        fatos = montar_fatos(_politica, score, pedido, perfil, fontes_indisponiveis, serasa, bacen)
+        resumo.registrar(score_antes, decisao_antes, score, _politica.avaliar(fatos).decisao)
+    return resumo
+
+
+def executar_replay(
+    caminho_politica: str = POLITICA_CREDITO_PATH,
+    score: str = SCORE_PADRAO,
+    processos: Optional[int] = None,
+    lote: int = REPLAY_LOTE,
+    desde: Optional[datetime] = None,
+    ate: Optional[datetime] = None,
+) -> ResumoReplay:
+    # Valida a política e a função de score antes de subir os processos
+    carregar_politica(caminho_politica)
+    _importar(score)
+
+    with engine.connect() as conn:
+        menor, maior = conn.execute(
+            _filtro_periodo(select(func.min(AnaliseCredito.id), func.max(AnaliseCredito.id)), desde, ate)
+        ).one()
+    resumo = ResumoReplay()
+    if menor is None:
+        return resumo
+
+    faixas = [(inicio, min(inicio + lote, maior + 1)) for inicio in range(menor, maior + 1, lote)]
+    with ProcessPoolExecutor(
+        max_workers=processos or os.cpu_count(),
+        initializer=_iniciar_processo,
+        initargs=(caminho_politica, score),
+    ) as executor:
+        futuros = [executor.submit(_replay_faixa, inicio, fim, desde, ate) for inicio, fim in faixas]
+        for futuro in as_completed(futuros):
+            resumo.somar(futuro.result())
+    return resumo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refaz as análises gravadas com outra política e compara.")
+    parser.add_argument("--politica", default=POLITICA_CREDITO_PATH, help="JSON da política a testar (padrão: a vigente)")
+    parser.add_argument("--score", default=SCORE_PADRAO, help="função de score, como modulo.funcao")
+    parser.add_argument("--processos", type=int, default=os.cpu_count())
+    parser.add_argument("--lote", type=int, default=REPLAY_LOTE, help="análises por faixa de id")
+    parser.add_argument("--desde", type=datetime.fromisoformat, help="data/hora inicial (ISO)")
+    parser.add_argument("--ate", type=datetime.fromisoformat, help="data/hora final, exclusiva (ISO)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resumo = executar_replay(args.politica, args.score, args.processos, args.lote, args.desde, args.ate)
+    duracao = time.perf_counter() - inicio
+    print(resumo.relatorio())
+    print(f"REPLAY: {resumo.total:,} análises em {duracao:.1f} s ({resumo.total / duracao if duracao else 0:,.0f}/s), {args.processos} processos.")
@@ -0,0 +1,173 @@
+# analysis/resiliencia.py
+#
+# Proteções em volta de cada cliente de bureau (analysis/bureaus.py):
+#
+#   - Circuit breaker: depois de BUREAU_CB_LIMITE_FALHAS falhas seguidas
+#     (erro ou timeout) o circuito abre e as consultas falham na hora, sem
+#     esperar o bureau. Passados BUREAU_CB_TEMPO_ABERTO_SECONDS, fica
+#     meio-aberto: UMA consulta de teste passa; se der certo fecha, senão
+#     abre de novo. Com o circuito aberto a análise sai rápido como
+#     "Análise Manual" em vez de segurar a requisição até o timeout.
+#
+#   - Hedge (opcional, BUREAU_HEDGE=true): se a consulta passar do p95 das
+#     latências recentes da fonte, dispara uma segunda igual e fica com a
+#     que responder primeiro. Corta a cauda de latência ao custo de poucas
+#     consultas a mais (~5%).
+#
+# O estado de cada fonte aparece em GET /api/admin/bureaus e no /metrics.
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Optional
+
+from pydantic import BaseModel
+
+from analysis.bureaus import ClienteBureau
+from models.models import PerfilUsuario
+
+BUREAU_CB_LIMITE_FALHAS = int(os.getenv("BUREAU_CB_LIMITE_FALHAS", 5))
+BUREAU_CB_TEMPO_ABERTO_SECONDS = float(os.getenv("BUREAU_CB_TEMPO_ABERTO_SECONDS", 30))
+
+BUREAU_HEDGE = os.getenv("BUREAU_HEDGE", "false").lower() == "true"
+BUREAU_HEDGE_PERCENTIL = float(os.getenv("BUREAU_HEDGE_PERCENTIL", 95))
+BUREAU_HEDGE_MIN_AMOSTRAS = int(os.getenv("BUREAU_HEDGE_MIN_AMOSTRAS", 20))
+BUREAU_HEDGE_ATRASO_MIN_MS = float(os.getenv("BUREAU_HEDGE_ATRASO_MIN_MS", 20))
+
+FECHADO, ABERTO, MEIO_ABERTO = "fechado", "aberto", "meio_aberto"
+
+
+class CircuitoAberto(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, limite_falhas: int = BUREAU_CB_LIMITE_FALHAS, tempo_aberto: float = BUREAU_CB_TEMPO_ABERTO_SECONDS):
+        self.limite_falhas = limite_falhas
+        self.tempo_aberto = tempo_aberto
+        self.estado = FECHADO
+        self.falhas_seguidas = 0
+        self.aberto_em = 0.0
+        self._teste_em_andamento = False
+        self.rejeitadas = 0
+        self.aberturas = 0
+
+    def permitir(self) -> bool:
+        """Chamado antes de cada consulta. False = falhar na hora."""
+        if self.estado == ABERTO and time.monotonic() - self.aberto_em >= self.tempo_aberto:
+            self.estado = MEIO_ABERTO
+        if self.estado == FECHADO:
+            return True
+        if self.estado == MEIO_ABERTO and not self._teste_em_andamento:
+            self._teste_em_andamento = True
+            return True
+        self.rejeitadas += 1
+        return False
+
+    def sucesso(self):
+        self.estado = FECHADO
+        self.falhas_seguidas = 0
+        self._teste_em_andamento = False
+
+    def falha(self):
+        self.falhas_seguidas += 1
+        if self.estado == MEIO_ABERTO or self.falhas_seguidas >= self.limite_falhas:
+            if self.estado != ABERTO:
+                self.aberturas += 1
+            self.estado = ABERTO
+            self.aberto_em = time.monotonic()
+        self._teste_em_andamento = False
+
+    def desistencia(self):
+        # Consulta cancelada por quem esperava: não conta como sucesso nem falha,
+        # mas libera a vaga de teste do meio-aberto
+        self._teste_em_andamento = False
+
+    def stats(self) -> dict:
+        return {
+            "estado": self.estado,
+            "falhas_seguidas": self.falhas_seguidas,
+            "aberturas": self.aberturas,
+            "rejeitadas": self.rejeitadas,
+        }
+
+
+class ClienteResiliente(ClienteBureau):
+    """Envolve um ClienteBureau com timeout, circuit breaker e hedge."""
+
+    def __init__(self, cliente: ClienteBureau, timeout: float, hedge: bool = BUREAU_HEDGE):
+        self.cliente = cliente
+        self.nome, self.modelo = cliente.nome, cliente.modelo
+        self.timeout = timeout
+        self.hedge = hedge
+        self.breaker = CircuitBreaker()
+        self._latencias = deque(maxlen=500)  # segundos, só das consultas que deram certo
+        self.hedges_disparados = 0
+        self.hedges_vencedores = 0
+
+    def _atraso_hedge(self) -> Optional[float]:
+        if not self.hedge or len(self._latencias) < BUREAU_HEDGE_MIN_AMOSTRAS:
+            return None
+        ordenadas = sorted(self._latencias)
+        p = ordenadas[min(len(ordenadas) - 1, int(BUREAU_HEDGE_PERCENTIL / 100 * len(ordenadas)))]
+        return max(p, BUREAU_HEDGE_ATRASO_MIN_MS / 1000)
+
+    async def _consultar_com_hedge(self, cpf: str, perfil: PerfilUsuario) -> BaseModel:
+        tarefas = [asyncio.ensure_future(self.cliente.consultar(cpf, perfil))]
+        try:
+            atraso = self._atraso_hedge()
+            if atraso is None:
+                return await tarefas[0]
+            feitas, _ = await asyncio.wait(tarefas, timeout=atraso)
+            if feitas:
+                return tarefas[0].result()
+
+            self.hedges_disparados += 1
+            tarefas.append(asyncio.ensure_future(self.cliente.consultar(cpf, perfil)))
+            pendentes = set(tarefas)
+            while pendentes:
+                feitas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in feitas:
+                    if tarefa.exception() is None:
+                        if tarefa is tarefas[1]:
+                            self.hedges_vencedores += 1
+                        return tarefa.result()
+            # As duas falharam: propaga o erro da original
+            return tarefas[0].result()
+        finally:
+            for tarefa in tarefas:
+                if not tarefa.done():
+                    tarefa.cancel()
+
+    async def consultar(self, cpf: str, perfil: PerfilUsuario) -> BaseModel:
+        if not self.breaker.permitir():
+            raise CircuitoAberto(f"{self.nome}: circuito aberto")
+        inicio = time.monotonic()
+        try:
+            resultado = await asyncio.wait_for(self._consultar_com_hedge(cpf, perfil), self.timeout)
+        except asyncio.CancelledError:
+            # Quem esperava desistiu: não diz nada sobre a saúde do bureau
+            self.breaker.desistencia()
+            raise
+        except Exception:
+            self.breaker.falha()
+            raise
+        self._latencias.append(time.monotonic() - inicio)
+        self.breaker.sucesso()
+        return resultado
+
+    def stats(self) -> dict:
+        ordenadas = sorted(self._latencias)
+
+        def percentil_ms(p):
+            return round(ordenadas[min(len(ordenadas) - 1, int(p / 100 * len(ordenadas)))] * 1000, 1) if ordenadas else None
+
+        return {
+            **self.breaker.stats(),
+            "latencia_p50_ms": percentil_ms(50),
+            "latencia_p95_ms": percentil_ms(95),
+            "hedge": self.hedge,
+            "hedges_disparados": self.hedges_disparados,
+            "hedges_vencedores": self.hedges_vencedores,
+        }
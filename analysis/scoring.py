@@ -0,0 +1,47 @@
+# analysis/scoring.py
+#
+# Score interno de crédito (0 a 1000) a partir dos bureaus e do perfil.
+# Fonte que não respondeu simplesmente não contribui; a decisão
+# (analysis/decision.py) é que trata a análise como incompleta.
+
+from typing import Optional
+
+from models.models import PerfilUsuario
+from schemas.schemas import BacenSCRData, CreditAnalysisRequest, SerasaData
+
+SCORE_MIN, SCORE_MAX = 0, 1000
+
+
+def calculate_credit_score(
+    serasa: Optional[SerasaData],
+    bacen: Optional[BacenSCRData],
+    perfil: PerfilUsuario,
+    payload: CreditAnalysisRequest,
+) -> int:
+    # Ponto de partida: score do Serasa, ou um score neutro sem ele
+    score = float(serasa.score) if serasa else 500.0
+
+    if serasa:
+        if serasa.has_negative_records:
+            score -= 150
+        score -= 25 * serasa.protests
+
+    renda = float(perfil.renda_mensal or 0)
+    if bacen:
+        # risk_level 1 (baixo) a 5 (alto)
+        score -= 40 * (bacen.risk_level - 1)
+        if bacen.total_overdue_value > 0:
+            score -= 100
+        if renda > 0 and bacen.total_loan_value > 0:
+            # Endividamento: dívida total em meses de renda (acima de 60 pesa)
+            meses_de_renda = bacen.total_loan_value / renda
+            score -= min(100.0, max(0.0, meses_de_renda - 60))
+
+    if perfil.possui_imovel:
+        score += 30
+    if perfil.possui_veiculo:
+        score += 15
+    if renda > 0 and payload.requested_amount > 24 * renda:
+        score -= 50  # pedido muito alto para a renda
+
+    return int(min(SCORE_MAX, max(SCORE_MIN, round(score))))
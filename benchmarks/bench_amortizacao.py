@@ -0,0 +1,36 @@
+# benchmarks/bench_amortizacao.py
+#
+# Micro-benchmark do motor de amortização: cronograma completo via NumPy
+# contra o mesmo cálculo feito com um laço Python, para prazos curtos e
+# para o prazo máximo do home equity (360 meses).
+#
+#   python -m benchmarks.bench_amortizacao
+
+import timeit
+
+from amortizacao import calcular_amortizacao
+
+N = 2_000
+
+
+def price_com_laco(valor, taxa, prazo):
+    parcela = valor * taxa / (1 - (1 + taxa) ** -prazo)
+    saldo, linhas = valor, []
+    for mes in range(1, prazo + 1):
+        juros = saldo * taxa
+        amortizacao = parcela - juros
+        saldo -= amortizacao
+        linhas.append({"mes": mes, "parcela": round(parcela, 2), "juros": round(juros, 2),
+                       "amortizacao": round(amortizacao, 2), "saldo_devedor": round(max(saldo, 0.0), 2)})
+    return linhas
+
+
+if __name__ == "__main__":
+    for prazo in (12, 60, 360):
+        for sistema in ("price", "sac"):
+            t = timeit.timeit(lambda: calcular_amortizacao(250_000, 0.01, prazo, sistema, incluir_cronograma=True), number=N)
+            print(f"{sistema:<6} {prazo:>4} meses  numpy: {t / N * 1e6:8.1f} µs")
+        t = timeit.timeit(lambda: price_com_laco(250_000, 0.01, prazo), number=N)
+        print(f"price  {prazo:>4} meses  laço:  {t / N * 1e6:8.1f} µs")
+        t = timeit.timeit(lambda: calcular_amortizacao(250_000, 0.01, prazo), number=N * 10)
+        print(f"price  {prazo:>4} meses  só totais: {t / (N * 10) * 1e6:5.1f} µs")
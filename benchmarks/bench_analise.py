@@ -0,0 +1,93 @@
+# benchmarks/bench_analise.py
+#
+# Sobe o stub dos bureaus (benchmarks/stub_bureaus.py) numa thread e mede
+# consultar_fontes em alguns cenários de latência: consulta em paralelo
+# contra em sequência, e o que acontece quando uma fonte passa do timeout
+# ou dá erro (análise parcial -> "Análise Manual"). No fim, uma rajada de
+# análises simultâneas do mesmo CPF para ver o cache + single-flight.
+#
+#   python -m benchmarks.bench_analise
+
+import asyncio
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import uvicorn
+
+PORTA = int(os.getenv("STUB_PORTA", 9100))
+BASE = f"http://127.0.0.1:{PORTA}"
+
+from analysis import data_sources
+from analysis.bureaus import ClienteHttp, fechar_clientes
+from analysis.data_sources import consultar_fontes, registrar_fonte
+from benchmarks.stub_bureaus import app
+from schemas.schemas import BacenSCRData, SerasaData
+
+# Perfil mínimo (só os campos que o simulador/score usam)
+PERFIL = SimpleNamespace(renda_mensal=8000, possui_imovel=True, possui_veiculo=False)
+CPF = "52998224725"
+
+# nome -> {fonte: latência em ms ou "erro"} (prefixo de caminho do stub)
+CENARIOS = {
+    "rápido (100 ms cada)": {"serasa": "100", "bacen_scr": "100"},
+    "lento (800 + 900 ms)": {"serasa": "800", "bacen_scr": "900"},
+    "serasa passa do timeout": {"serasa": "5000", "bacen_scr": "200"},
+    "bacen com erro": {"serasa": "200", "bacen_scr": "erro"},
+}
+
+
+def subir_stub():
+    servidor = uvicorn.Server(uvicorn.Config(app, port=PORTA, log_level="warning"))
+    threading.Thread(target=servidor.run, daemon=True).start()
+    while not servidor.started:
+        time.sleep(0.05)
+
+
+def apontar_para(cenario: dict):
+    # Cada fonte vira um ClienteHttp no stub, com a latência do cenário
+    registrar_fonte(ClienteHttp("serasa", SerasaData, f"{BASE}/{cenario['serasa']}/serasa"))
+    registrar_fonte(ClienteHttp("bacen_scr", BacenSCRData, f"{BASE}/{cenario['bacen_scr']}/bacen_scr"))
+    data_sources.cache_bureaus.local.clear()
+
+
+async def rodar(cenario: dict, sequencial: bool, cpf: str = CPF):
+    apontar_para(cenario)
+    inicio = time.perf_counter()
+    if sequencial:
+        falhas = []
+        for nome, cliente in data_sources.FONTES.items():
+            try:
+                await asyncio.wait_for(cliente.consultar(cpf, PERFIL), data_sources.ANALISE_TIMEOUT_FONTE_SECONDS)
+            except Exception:
+                falhas.append(nome)
+    else:
+        falhas = list((await consultar_fontes(cpf, PERFIL)).falhas)
+    return (time.perf_counter() - inicio) * 1000, falhas
+
+
+async def main():
+    print(f"timeout por fonte {data_sources.ANALISE_TIMEOUT_FONTE_SECONDS}s, prazo total {data_sources.ANALISE_PRAZO_TOTAL_SECONDS}s")
+    await rodar(CENARIOS["rápido (100 ms cada)"], False)  # aquecimento (conexões)
+    for i, (nome, cenario) in enumerate(CENARIOS.items()):
+        # CPF diferente por cenário: uma consulta lenta do cenário anterior
+        # ainda em andamento não pode ser "compartilhada" com o próximo
+        seq_ms, _ = await rodar(cenario, True, cpf=f"seq{i}")
+        par_ms, falhas = await rodar(cenario, False, cpf=f"par{i}")
+        print(f"  {nome:<26} sequencial {seq_ms:7.0f} ms   paralelo {par_ms:7.0f} ms   falhas: {', '.join(falhas) or '-'}")
+
+    # Cache: 50 análises simultâneas do mesmo CPF e depois mais 50
+    apontar_para(CENARIOS["lento (800 + 900 ms)"])
+    for rodada in ("frio", "quente"):
+        inicio = time.perf_counter()
+        await asyncio.gather(*(consultar_fontes(CPF, PERFIL) for _ in range(50)))
+        print(f"  cache {rodada:<6}: 50 análises do mesmo CPF em {(time.perf_counter() - inicio) * 1000:6.0f} ms")
+    for fonte, stats in data_sources.cache_bureaus.stats()["fontes"].items():
+        print(f"    {fonte:<10} {stats}")
+    await fechar_clientes()
+
+
+if __name__ == "__main__":
+    subir_stub()
+    asyncio.run(main())
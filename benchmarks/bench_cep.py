@@ -0,0 +1,53 @@
+# benchmarks/bench_cep.py
+#
+# Gera uma base sintética de CEPs (padrão: 1 milhão), constrói o índice
+# binário e mede a latência das consultas (encontrados e inexistentes).
+#
+#   python -m benchmarks.bench_cep --ceps 1000000
+
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from cep import BaseCep, construir_indice
+
+UFS = ["SP", "RJ", "MG", "RS", "PR", "BA", "PE", "CE", "SC", "GO"]
+
+
+def gerar_csv(path: str, total: int) -> list:
+    ceps = random.sample(range(1_000_000, 99_999_999), total)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["cep", "logradouro", "bairro", "cidade", "uf"])
+        for n in ceps:
+            writer.writerow([f"{n:08d}", f"Rua {n % 50_000}", f"Bairro {n % 3_000}", f"Cidade {n % 5_000}", UFS[n % len(UFS)]])
+    return ceps
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ceps", type=int, default=1_000_000)
+    parser.add_argument("--consultas", type=int, default=200_000)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    csv_path, idx_path = os.path.join(pasta, "ceps.csv"), os.path.join(pasta, "cep.idx")
+    ceps = gerar_csv(csv_path, args.ceps)
+
+    inicio = time.perf_counter()
+    construir_indice(csv_path, idx_path)
+    print(f"índice: {args.ceps:,} CEPs, {os.path.getsize(idx_path) / 1024 / 1024:.1f} MB "
+          f"(CSV {os.path.getsize(csv_path) / 1024 / 1024:.1f} MB), construído em {time.perf_counter() - inicio:.1f} s")
+
+    base = BaseCep(idx_path)
+    existentes = [f"{n:08d}" for n in random.choices(ceps, k=args.consultas)]
+    inexistentes = [f"{n:08d}" for n in random.choices(range(1_000_000, 99_999_999), k=args.consultas)]
+    for nome, consultas in (("encontrados", existentes), ("aleatórios", inexistentes)):
+        inicio = time.perf_counter()
+        for c in consultas:
+            base.buscar(c)
+        por_consulta = (time.perf_counter() - inicio) / len(consultas)
+        print(f"  {nome:<12} {por_consulta * 1e6:6.2f} µs/consulta  ({1 / por_consulta:,.0f} consultas/s)")
@@ -0,0 +1,57 @@
+# benchmarks/bench_dados_especificos.py
+#
+# Vazão da validação de dados_especificos por produto: validador compilado
+# (TypeAdapter em cache) contra montar o model a cada chamada, e quanto
+# custa recusar um payload inválido ou grande demais.
+#
+#   python -m benchmarks.bench_dados_especificos
+
+import timeit
+
+from catalogo import obter_catalogo
+from dados_especificos import DadosInvalidos, _montar_validadores, validar_dados_especificos
+
+N = 20_000
+
+EXEMPLOS = {
+    "number": 350000.0,
+    "integer": 2020,
+    "string": "casa",
+    "boolean": True,
+}
+
+
+def payload_valido(produto) -> dict:
+    dados = {nome: EXEMPLOS[c.tipo] for nome, c in produto.campos_especificos.items()}
+    dados["observacao"] = "cliente indicado"
+    return dados
+
+
+def payload_invalido(produto) -> dict:
+    return {nome: "x" if c.tipo != "string" else 1 for nome, c in produto.campos_especificos.items()} or {"extra": [1, 2]}
+
+
+def validar_ignorando_erro(tipo, dados):
+    try:
+        validar_dados_especificos(tipo, dados)
+    except DadosInvalidos:
+        pass
+
+
+if __name__ == "__main__":
+    catalogo = obter_catalogo()
+    grande = {f"campo_{i}": "x" * 400 for i in range(40)}
+
+    print(f"{'produto':<20} {'válido':>12} {'inválido':>12} {'grande':>12} {'sem cache':>12}  (validações/s)")
+    for codigo, produto in catalogo.produtos.items():
+        valido, invalido = payload_valido(produto), payload_invalido(produto)
+        t_valido = timeit.timeit(lambda: validar_dados_especificos(codigo, valido), number=N)
+        t_invalido = timeit.timeit(lambda: validar_ignorando_erro(codigo, invalido), number=N)
+        t_grande = timeit.timeit(lambda: validar_ignorando_erro(codigo, grande), number=N)
+        # Sem cache: remonta os models/TypeAdapters do catálogo a cada chamada
+        n_sem_cache = N // 100
+        t_sem_cache = timeit.timeit(lambda: _montar_validadores(catalogo)[codigo].validate_python(valido), number=n_sem_cache)
+        print(
+            f"{codigo:<20} {N / t_valido:>12,.0f} {N / t_invalido:>12,.0f} "
+            f"{N / t_grande:>12,.0f} {n_sem_cache / t_sem_cache:>12,.0f}"
+        )
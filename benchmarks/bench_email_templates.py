@@ -0,0 +1,40 @@
+# benchmarks/bench_email_templates.py
+#
+# Vazão de renderização dos templates de e-mail compilados (email_templates.py),
+# comparada a reprocessar o layout a cada chamada (lendo o arquivo e
+# substituindo os campos por regex, sem compilação prévia).
+#
+#   python -m benchmarks.bench_email_templates
+
+import os
+import timeit
+
+from email_templates import TEMPLATES_DIR, _FIELD_RE, _escape_html, render_email
+
+N = 20_000
+
+CONTEXTOS = {
+    "verificacao": {"nome": "Maria <Silva>", "codigo": "482913"},
+    "redefinicao_senha": {"nome": "Maria Silva", "link": "http://localhost:8080/redefinir-senha?token=abc.def.ghi"},
+    "contato": {
+        "nome": "João",
+        "email": "joao@exemplo.com",
+        "telefone": "(11) 99999-0000",
+        "assunto": "Dúvida",
+        "mensagem": "Olá,\nGostaria de saber mais sobre o home equity.\nObrigado!",
+    },
+}
+
+
+def render_sem_compilar(nome, contexto):
+    with open(os.path.join(TEMPLATES_DIR, nome + ".html"), encoding="utf-8") as f:
+        source = f.read()
+    return _FIELD_RE.sub(lambda m: _escape_html(contexto[m.group(1)]), source)
+
+
+if __name__ == "__main__":
+    print(f"{'template':<20} {'compilado':>16} {'sem compilar':>16}")
+    for nome, contexto in CONTEXTOS.items():
+        t_compilado = timeit.timeit(lambda: render_email(nome, **contexto), number=N)
+        t_ingenuo = timeit.timeit(lambda: render_sem_compilar(nome, contexto), number=N)
+        print(f"{nome:<20} {N / t_compilado:>12,.0f} /s  {N / t_ingenuo:>12,.0f} /s")
@@ -0,0 +1,73 @@
+# benchmarks/bench_features.py
+#
+# Leitura do perfil no início da análise de crédito, num SQLite temporário
+# com N perfis (gerados como em bench_pre_aprovacao) e as features já
+# calculadas (analysis/features.py):
+#   - antes: SELECT do perfil inteiro + GET da pré-aprovação + derivar
+#     idade/tempo de emprego/faixa de renda a cada análise;
+#   - agora: um SELECT de features_perfil com a pré-aprovação (outer join).
+#
+#   python -m benchmarks.bench_features --perfis 100000 --leituras 5000
+
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.bench_pre_aprovacao import popular  # configura o SQLite temporário
+
+from sqlalchemy import select
+
+from analysis.features import calcular_features, recalcular_todas
+from analysis.pre_aprovacao import executar_pre_aprovacao
+from db import AsyncSessionLocal
+from models.models import FeaturesPerfil, PerfilUsuario, PreAprovacao
+
+
+async def antes(db, user_id: int):
+    perfil = (await db.execute(select(PerfilUsuario).where(PerfilUsuario.user_id == user_id))).scalars().first()
+    pre = await db.get(PreAprovacao, user_id)
+    features = calcular_features(
+        perfil.renda_mensal, perfil.possui_imovel, perfil.possui_veiculo, perfil.data_admissao, perfil.data_nascimento
+    )
+    return features, pre
+
+
+async def agora(db, user_id: int):
+    result = await db.execute(
+        select(FeaturesPerfil, PreAprovacao)
+        .outerjoin(PreAprovacao, PreAprovacao.user_id == FeaturesPerfil.user_id)
+        .where(FeaturesPerfil.user_id == user_id)
+    )
+    return result.first()
+
+
+async def medir(rotulo: str, ler, ids):
+    async with AsyncSessionLocal() as db:
+        await ler(db, ids[0])  # aquecimento
+        inicio = time.perf_counter()
+        for user_id in ids:
+            await ler(db, user_id)
+            db.expunge_all()  # como numa requisição nova: nada vem do identity map
+        duracao = time.perf_counter() - inicio
+    print(f"  {rotulo:<48} {duracao * 1e6 / len(ids):7.0f} µs por análise")
+
+
+async def main(args):
+    ids = [random.randint(1, args.perfis) for _ in range(args.leituras)]
+    await medir("antes (perfil + pré-aprovação + derivar)", antes, ids)
+    await medir("agora (features_perfil + pré-aprovação, 1 SELECT)", agora, ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--perfis", type=int, default=100_000)
+    parser.add_argument("--leituras", type=int, default=5_000)
+    args = parser.parse_args()
+
+    popular(args.perfis)
+    executar_pre_aprovacao()
+    inicio = time.perf_counter()
+    total = recalcular_todas()
+    print(f"features de {total:,} perfis calculadas em {time.perf_counter() - inicio:.1f} s")
+    asyncio.run(main(args))
@@ -0,0 +1,103 @@
+# benchmarks/bench_filtros_json.py
+#
+# Gera alguns milhões de simulações sintéticas no Postgres (DATABASE_URL) e
+# compara o tempo de filtros em dados_especificos:
+#   - antes: tudo num jsonpath @? (o GIN jsonb_path_ops só atende igualdade);
+#   - agora: compilar_filtros (faixas nas chaves numéricas pelos btree de
+#     expressão, o resto pelo @? com GIN);
+#   - sem índices: compilar_filtros com index/bitmap scan desligados.
+# Use um banco descartável: o script cria um usuário próprio e apaga suas
+# simulações no final.
+#
+#   DATABASE_URL=postgresql://... python -m benchmarks.bench_filtros_json --linhas 3000000
+
+import argparse
+import time
+
+from sqlalchemy import literal, select, text
+from sqlalchemy.dialects.postgresql import JSONPATH
+
+from db import Base, engine, SessionLocal
+from filtros_json import compilar_filtros, jsonpath_filtros, parse_filtros
+from models.models import Simulacao
+
+EMAIL_BENCH = "benchmark-filtros@exemplo.com"
+
+
+def preparar(linhas: int) -> int:
+    with engine.begin() as conn:
+        user_id = conn.execute(text(
+            "INSERT INTO users (full_name, email, phone, cpf, password_hash, is_verified) "
+            "VALUES ('Benchmark', :email, '0', '00000000191', 'x', true) "
+            "ON CONFLICT (email) DO UPDATE SET full_name = EXCLUDED.full_name RETURNING id"
+        ), {"email": EMAIL_BENCH}).scalar()
+        conn.execute(text("DELETE FROM simulacoes WHERE user_id = :u"), {"u": user_id})
+        # Gerado no próprio Postgres: muito mais rápido que inserir pelo Python
+        conn.execute(text("""
+            INSERT INTO simulacoes (user_id, valor_desejado, prazo_meses, motivo_emprestimo,
+                                    tipo_emprestimo, dados_especificos)
+            SELECT :u, 100000, 120, 'benchmark',
+                   CASE WHEN g % 2 = 0 THEN 'imovel-garantia' ELSE 'veiculo-garantia' END,
+                   CASE WHEN g % 2 = 0
+                        THEN jsonb_build_object('valor_imovel', (random() * 3000000)::int,
+                                                'tipo_imovel', (ARRAY['casa','apto','terreno'])[1 + g % 3],
+                                                'imovel_quitado', g % 5 = 0)
+                        ELSE jsonb_build_object('valor_veiculo', (random() * 200000)::int,
+                                                'ano_veiculo', 2005 + g % 20)
+                   END
+            FROM generate_series(1, :n) AS g
+        """), {"u": user_id, "n": linhas})
+        conn.execute(text("ANALYZE simulacoes"))
+    return user_id
+
+
+def medir(filtros, modo: str, repeticoes=5) -> float:
+    coluna = Simulacao.dados_especificos
+    if modo == "antes":
+        condicoes = [coluna.op("@?")(literal(jsonpath_filtros(parse_filtros(filtros)), JSONPATH))]
+    else:
+        condicoes = compilar_filtros(coluna, parse_filtros(filtros), "postgresql")
+    query = select(Simulacao.id).where(*condicoes)
+    db = SessionLocal()
+    try:
+        # Sem index/bitmap scan o planner só tem o seq scan
+        usar_indice = "on" if modo != "sem índices" else "off"
+        db.execute(text(f"SET enable_bitmapscan = {usar_indice}"))
+        db.execute(text(f"SET enable_indexscan = {usar_indice}"))
+        db.execute(text(f"SET enable_indexonlyscan = {usar_indice}"))
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            db.execute(query).all()
+        return (time.perf_counter() - inicio) / repeticoes * 1000
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=3_000_000)
+    args = parser.parse_args()
+    assert engine.dialect.name == "postgresql", "Este benchmark precisa de um DATABASE_URL Postgres."
+
+    Base.metadata.create_all(bind=engine)
+    for indice in Simulacao.__table__.indexes:  # tabela que já existia
+        indice.create(engine, checkfirst=True)
+    print(f"Gerando {args.linhas:,} simulações sintéticas...")
+    user_id = preparar(args.linhas)
+    print(f"{'filtro':<46}{'antes (@?)':>14}{'agora':>14}{'sem índices':>14}")
+
+    consultas = [
+        ["valor_imovel:gt:2900000"],
+        ["valor_veiculo:lt:2000"],
+        ["ano_veiculo:gte:2024"],
+        ["valor_imovel:gt:2900000", "tipo_imovel:eq:casa"],
+        ["tipo_imovel:eq:terreno", "imovel_quitado:eq:true"],
+        ["ano_veiculo:eq:2024"],
+    ]
+    for filtros in consultas:
+        tempos = "".join(f"{medir(filtros, modo):>14.1f}" for modo in ("antes", "agora", "sem índices"))
+        print(f"{' & '.join(filtros):<46}{tempos}   ms")
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM simulacoes WHERE user_id = :u"), {"u": user_id})
+        conn.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id})
@@ -0,0 +1,96 @@
+# benchmarks/bench_listagem.py
+#
+# Requisições/s de GET /api/simulacoes/ numa conta com 1.000 simulações:
+# caminho antigo (objetos ORM completos + validação no response_model +
+# encoder padrão) contra o caminho rápido (só as colunas do schema + orjson).
+#
+# Roda em processo, com um SQLite temporário e sem autenticação real:
+#
+#   python -m benchmarks.bench_listagem --linhas 1000 --limite 200
+
+import argparse
+import os
+import tempfile
+import time
+
+# O banco temporário precisa estar configurado antes de importar db.py
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'bench.db')}"
+
+from typing import List
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import schemas.simulacao as schemas
+import security
+from db import Base, SessionLocal, engine, get_async_db
+from models.models import Simulacao, User
+from routes import simulations
+
+
+def popular(linhas: int) -> User:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(full_name="Benchmark", email="bench@exemplo.com", phone="0", cpf="52998224725", password_hash="x", is_verified=True)
+    db.add(user)
+    db.commit()
+    db.add_all(
+        Simulacao(
+            user_id=user.id, valor_desejado=100000 + i, prazo_meses=120, motivo_emprestimo="benchmark",
+            tipo_emprestimo="imovel-garantia", sistema_amortizacao="price",
+            dados_especificos={"valor_imovel": 300000 + i, "tipo_imovel": "casa", "imovel_quitado": i % 2 == 0},
+            valor_parcela=1434.71, valor_total=172165.2, juros_total=72165.2,
+        )
+        for i in range(linhas)
+    )
+    db.commit()
+    db.refresh(user)
+    db.expunge(user)
+    db.close()
+    return user
+
+
+def montar_app(user: User) -> FastAPI:
+    app = FastAPI()
+    app.include_router(simulations.router)
+
+    # Como a rota era antes: carrega os objetos ORM e deixa o response_model validar/serializar
+    @app.get("/antigo", response_model=List[schemas.SimulacaoOut])
+    async def listar_antigo(limite: int = 50, db: AsyncSession = Depends(get_async_db)):
+        result = await db.execute(
+            select(Simulacao).where(Simulacao.user_id == user.id)
+            .order_by(Simulacao.criado_em.desc(), Simulacao.id.desc()).limit(limite + 1)
+        )
+        return result.scalars().all()[:limite]
+
+    app.dependency_overrides[security.get_current_active_user] = lambda: user
+    return app
+
+
+def medir(client: TestClient, url: str, duracao: float) -> float:
+    client.get(url).raise_for_status()  # aquecimento
+    n, fim = 0, time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        client.get(url)
+        n += 1
+    return n / duracao
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=1000)
+    parser.add_argument("--limite", type=int, default=200)
+    parser.add_argument("--duracao", type=float, default=5.0)
+    args = parser.parse_args()
+
+    user = popular(args.linhas)
+    with TestClient(montar_app(user)) as client:
+        antes = medir(client, f"/antigo?limite={args.limite}", args.duracao)
+        depois = medir(client, f"/api/simulacoes/?limite={args.limite}", args.duracao)
+
+    print(f"{args.linhas} simulações na conta, páginas de {args.limite}")
+    print(f"  antes  (ORM + response_model): {antes:8.1f} req/s")
+    print(f"  depois (colunas + orjson):     {depois:8.1f} req/s  ({depois / antes:.1f}x)")
@@ -0,0 +1,80 @@
+# benchmarks/bench_login.py
+#
+# Mede logins/s e a latência (p50/p99) de uma rota não relacionada (/health)
+# enquanto uma rajada de logins acontece. Rode contra o servidor antes e depois
+# de uma mudança para comparar:
+#
+#   uvicorn main:app --workers 1
+#   python -m benchmarks.bench_login --email voce@exemplo.com --senha 'Senha@123'
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    k = min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))
+    return valores[k]
+
+
+async def rajada_logins(client, email, senha, duracao, concorrencia, resultados):
+    fim = time.perf_counter() + duracao
+
+    async def worker():
+        while time.perf_counter() < fim:
+            try:
+                r = await client.post("/api/auth/token", data={"username": email, "password": senha})
+                status = r.status_code
+            except httpx.TimeoutException:
+                status = "timeout"
+            resultados[status] = resultados.get(status, 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(concorrencia)))
+
+
+async def sonda_health(client, duracao, latencias):
+    fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        inicio = time.perf_counter()
+        try:
+            await client.get("/health")
+        except httpx.TimeoutException:
+            pass  # conta como a latência até o timeout
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def main(args):
+    resultados, latencias = {}, []
+    limites = httpx.Limits(max_connections=args.concorrencia + 5)
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=30) as client:
+        inicio = time.perf_counter()
+        await asyncio.gather(
+            rajada_logins(client, args.email, args.senha, args.duracao, args.concorrencia, resultados),
+            sonda_health(client, args.duracao, latencias),
+        )
+        decorrido = time.perf_counter() - inicio
+
+    ok = resultados.get(200, 0)
+    print(f"Respostas por status: {resultados}")
+    print(f"Logins OK/s:          {ok / decorrido:.1f}")
+    print(f"/health amostras:     {len(latencias)}")
+    if latencias:
+        print(f"/health p50:          {statistics.median(latencias):.1f} ms")
+        print(f"/health p99:          {percentil(latencias, 99):.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de login vs. rotas não relacionadas")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--senha", required=True)
+    parser.add_argument("--duracao", type=float, default=15.0, help="segundos")
+    parser.add_argument("--concorrencia", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,106 @@
+# benchmarks/bench_politica.py
+#
+# Vazão do motor de regras (analysis/politica.py): a política compilada
+# contra um interpretador simples que percorre o JSON a cada avaliação, e o
+# make_decision completo (fatos + regras + resposta). No fim, um dry-run de
+# uma política candidata (score de aprovação 680, comprometimento 35%) sobre
+# os mesmos casos, mostrando quantas decisões mudariam.
+#
+#   python -m benchmarks.bench_politica
+
+import json
+import operator
+import random
+import time
+from types import SimpleNamespace
+
+from analysis.decision import make_decision
+from analysis.features import calcular_features
+from analysis.politica import POLITICA_CREDITO_PATH, DryRun, Fatos, compilar_politica
+from schemas.schemas import CreditAnalysisRequest
+
+CASOS = 200_000
+SEMENTE = 42
+
+OPS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq, "!=": operator.ne}
+
+
+def gerar_casos(n: int) -> list:
+    rng = random.Random(SEMENTE)
+    casos = []
+    for _ in range(n):
+        renda = rng.choice([0, 1500, 3000, 6000, 12000, 25000])
+        valor = rng.choice([1000, 5000, 20000, 80000, 2_000_000])
+        parcelas = rng.choice([12, 24, 48, 120, 180])
+        parcela = valor * 0.02 / (1 - 1.02 ** -parcelas)
+        casos.append(Fatos(
+            score=rng.randint(250, 950),
+            fontes_indisponiveis=rng.random() < 0.03,
+            restricao=rng.random() < 0.1,
+            renda=float(renda),
+            comprometimento=parcela / renda if renda else float("inf"),
+            valor=float(valor),
+            parcelas=parcelas,
+            fora_limites_produto=valor > 1_000_000 or parcelas > 120,
+            faixa_renda=sum(renda > limite for limite in (2000, 5000, 10000, 20000)),
+            meses_emprego=rng.choice([0, 3, 12, 60, 240]),
+            idade=rng.randint(18, 80),
+        ))
+    return casos
+
+
+def interpretar(data: dict, fatos: Fatos) -> int:
+    # O que o motor faria sem compilar: percorre regras e condições a cada chamada
+    parametros = data["parametros"]
+    valores = fatos._asdict()
+    for i, regra in enumerate(data["regras"]):
+        for fato, op, valor in regra["quando"]:
+            if isinstance(valor, str):
+                valor = parametros[valor[1:]]
+            if not OPS[op](valores[fato], valor):
+                break
+        else:
+            return i
+    return len(data["regras"])
+
+
+def medir(rotulo: str, n: int, funcao):
+    inicio = time.perf_counter()
+    funcao()
+    duracao = time.perf_counter() - inicio
+    print(f"  {rotulo:<34} {n / duracao:>12,.0f} avaliações/s   ({duracao * 1e6 / n:.2f} µs cada)")
+
+
+def main():
+    with open(POLITICA_CREDITO_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    vigente = compilar_politica(data)
+    casos = gerar_casos(CASOS)
+
+    print(f"Política {vigente.versao}, {len(vigente.resultados)} regras, {CASOS:,} casos")
+    interpretadas = [interpretar(data, f) for f in casos[:1000]]
+    assert interpretadas == [vigente._plano(*f) for f in casos[:1000]], "compilada e interpretada divergem"
+
+    medir("interpretada (JSON a cada vez)", CASOS, lambda: [interpretar(data, f) for f in casos])
+    medir("compilada", CASOS, lambda: [vigente.avaliar(f) for f in casos])
+
+    perfil = SimpleNamespace(**calcular_features(6000, False, False, None, None))
+    pedidos = [CreditAnalysisRequest(cpf="52998224725", requested_amount=f.valor, installments=f.parcelas) for f in casos[:20_000]]
+    medir("make_decision completo", len(pedidos), lambda: [make_decision(700, p, perfil) for p in pedidos])
+
+    candidata = compilar_politica({
+        **data,
+        "versao": "candidata",
+        "parametros": {**data["parametros"], "score_aprovacao": 680, "comprometimento_maximo": 0.35},
+    })
+    comparacao = DryRun()
+    for f in casos:
+        comparacao.registrar(vigente.avaliar(f), candidata.avaliar(f))
+    stats = comparacao.stats()
+    print(f"Dry-run {vigente.versao} x {candidata.versao}: {stats['divergentes']:,} de {stats['avaliadas']:,} decisões mudam ({stats['taxa_divergencia']:.2%})")
+    for transicao, n in sorted(stats["transicoes"].items(), key=lambda t: -t[1]):
+        print(f"    {transicao:<32} {n:>8,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_pre_aprovacao.py
+#
+# Gera N usuários com perfil sintético num SQLite temporário e roda o job de
+# pré-aprovação (analysis/pre_aprovacao.py), medindo perfis/s e o pico de
+# memória (que deve depender do tamanho do lote, não de N).
+#
+#   python -m benchmarks.bench_pre_aprovacao --perfis 1000000 --lote 10000
+
+import argparse
+import os
+import random
+import resource
+import tempfile
+import time
+from datetime import date, timedelta
+
+# O banco temporário precisa estar configurado antes de importar db.py
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+from sqlalchemy import func, insert, select
+
+from analysis.pre_aprovacao import executar_pre_aprovacao
+from db import Base, engine
+from models.models import PerfilUsuario, PreAprovacao, User
+
+
+def popular(total: int, lote: int = 50_000):
+    Base.metadata.create_all(bind=engine)
+    hoje = date.today()
+    with engine.begin() as conn:
+        for inicio in range(0, total, lote):
+            ids = range(inicio + 1, min(total, inicio + lote) + 1)
+            conn.execute(insert(User), [
+                {"id": i, "full_name": f"Cliente {i}", "email": f"c{i}@exemplo.com", "phone": "0",
+                 "cpf": f"{i:011d}", "password_hash": "x", "is_verified": True}
+                for i in ids
+            ])
+            conn.execute(insert(PerfilUsuario), [
+                {"user_id": i, "renda_mensal": round(random.lognormvariate(8.3, 0.7), 2),
+                 "possui_imovel": random.random() < 0.4, "possui_veiculo": random.random() < 0.5,
+                 "data_admissao": hoje - timedelta(days=random.randint(0, 7000)) if random.random() < 0.8 else None,
+                 "data_nascimento": hoje - timedelta(days=random.randint(18 * 365, 75 * 365))}
+                for i in ids
+            ])
+
+
+def pico_memoria_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KB
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--perfis", type=int, default=200_000)
+    parser.add_argument("--lote", type=int, default=10_000)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    popular(args.perfis)
+    print(f"{args.perfis:,} perfis gerados em {time.perf_counter() - inicio:.1f} s (pico de memória até aqui: {pico_memoria_mb():.0f} MB)")
+
+    inicio = time.perf_counter()
+    total = executar_pre_aprovacao(args.lote)
+    duracao = time.perf_counter() - inicio
+    print(f"pré-aprovação: {total:,} perfis em {duracao:.1f} s ({total / duracao:,.0f} perfis/s), lote de {args.lote:,}")
+    print(f"pico de memória do processo: {pico_memoria_mb():.0f} MB")
+
+    with engine.connect() as conn:
+        aprovados = conn.scalar(select(func.count()).select_from(PreAprovacao).where(PreAprovacao.limite_aprovado > 0))
+        media = conn.scalar(select(func.avg(PreAprovacao.score)))
+    print(f"com limite pré-aprovado: {aprovados:,} ({aprovados / total:.0%}), score médio {media:.0f}")
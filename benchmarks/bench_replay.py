@@ -0,0 +1,114 @@
+# benchmarks/bench_replay.py
+#
+# Gera N análises sintéticas em analises_credito (SQLite temporário), já
+# decididas pela política vigente, e mede o replay (analysis/replay.py):
+#   - com a própria política vigente: nenhuma decisão pode mudar (confere
+#     que o replay reproduz o pipeline online);
+#   - com uma candidata (score de aprovação 680, comprometimento 35%), com
+#     1 processo e com todos os núcleos.
+#
+#   python -m benchmarks.bench_replay --analises 1000000
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from types import SimpleNamespace
+
+# O banco temporário precisa estar configurado antes de importar db.py
+_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_dir, 'bench.db')}"
+
+from sqlalchemy import insert
+
+from analysis.bureaus import gerar_bacen_scr, gerar_serasa
+from analysis.decision import make_decision
+from analysis.features import calcular_features
+from analysis.politica import POLITICA_CREDITO_PATH, politica_vigente
+from analysis.replay import executar_replay
+from analysis.scoring import calculate_credit_score
+from db import Base, engine
+from models.models import AnaliseCredito, User
+from schemas.schemas import BacenSCRData, CreditAnalysisRequest, SerasaData
+
+
+def popular(total: int, lote: int = 20_000):
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    versao = politica_vigente().versao
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "full_name": "Cliente", "email": "c@exemplo.com", "phone": "0",
+                                     "cpf": "52998224725", "password_hash": "x", "is_verified": True}])
+        for inicio in range(0, total, lote):
+            linhas = []
+            for i in range(inicio, min(total, inicio + lote)):
+                perfil = SimpleNamespace(
+                    **calcular_features(round(rng.lognormvariate(8.3, 0.7), 2), rng.random() < 0.4, rng.random() < 0.5, None, None),
+                    possui_restricao=rng.random() < 0.1,
+                )
+                pedido = CreditAnalysisRequest(
+                    cpf="52998224725",
+                    requested_amount=rng.choice([2000, 5000, 10000, 30000, 80000]),
+                    installments=rng.choice([12, 24, 36, 48, 60]),
+                )
+                cpf = f"{i:011d}"
+                serasa = SerasaData(**gerar_serasa(random.Random(i), cpf, perfil)) if rng.random() > 0.02 else None
+                bacen = BacenSCRData(**gerar_bacen_scr(random.Random(-i), cpf, perfil))
+                falhas = [] if serasa else ["serasa"]
+                score = calculate_credit_score(serasa, bacen, perfil, pedido)
+                decisao = make_decision(score, pedido, perfil, falhas, serasa=serasa, bacen=bacen)
+                linhas.append({
+                    "user_id": 1,
+                    "valor_solicitado": pedido.requested_amount,
+                    "parcelas": pedido.installments,
+                    "perfil": {"renda_mensal": perfil.renda_mensal, "possui_imovel": perfil.possui_imovel,
+                               "possui_veiculo": perfil.possui_veiculo, "data_admissao": None, "data_nascimento": None},
+                    "serasa": serasa.model_dump() if serasa else None,
+                    "bacen_scr": bacen.model_dump(),
+                    "fontes_indisponiveis": falhas,
+                    "score": score,
+                    "decisao": decisao.decision,
+                    "versao_politica": versao,
+                    "pre_aprovada": False,
+                })
+            conn.execute(insert(AnaliseCredito), linhas)
+
+
+def candidata() -> str:
+    with open(POLITICA_CREDITO_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    data["versao"] = "candidata"
+    data["parametros"].update(score_aprovacao=680, comprometimento_maximo=0.35)
+    caminho = os.path.join(_dir, "candidata.json")
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    return caminho
+
+
+def medir(rotulo: str, total: int, **kwargs):
+    inicio = time.perf_counter()
+    resumo = executar_replay(**kwargs)
+    duracao = time.perf_counter() - inicio
+    print(f"  {rotulo:<36} {duracao:6.1f} s   {total / duracao:>10,.0f} análises/s")
+    return resumo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--analises", type=int, default=200_000)
+    parser.add_argument("--lote", type=int, default=50_000)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    popular(args.analises)
+    print(f"{args.analises:,} análises geradas em {time.perf_counter() - inicio:.1f} s")
+
+    nucleos = os.cpu_count()
+    vigente = medir("vigente, 1 processo", args.analises, processos=1, lote=args.lote)
+    assert not vigente.transicoes, f"replay com a política vigente mudou decisões: {vigente.transicoes}"
+    caminho = candidata()
+    medir("candidata, 1 processo", args.analises, caminho_politica=caminho, processos=1, lote=args.lote)
+    resumo = medir(f"candidata, {nucleos} processos", args.analises, caminho_politica=caminho, processos=nucleos, lote=args.lote)
+    print(resumo.relatorio())
@@ -0,0 +1,92 @@
+# benchmarks/bench_resiliencia.py
+#
+# Mede as proteções de analysis/resiliencia.py com o simulador de bureau
+# (sem rede, semente fixa):
+#
+#   - circuit breaker: o Serasa "trava" (toda consulta passa do timeout) e
+#     rodamos análises em sequência, com e sem breaker. Sem breaker toda
+#     análise espera o timeout; com breaker só as primeiras esperam.
+#
+#   - hedge: bureau com cauda longa (lognormal) e consultas em sequência,
+#     com e sem hedge. Compara p50/p99 e quantas consultas a mais custou.
+#
+#   python -m benchmarks.bench_resiliencia
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from analysis import data_sources
+from analysis.bureaus import SimuladorBureau, gerar_bacen_scr, gerar_serasa
+from analysis.data_sources import consultar_fontes
+from analysis.resiliencia import ClienteResiliente
+from benchmarks.bench_login import percentil
+from schemas.schemas import BacenSCRData, SerasaData
+
+PERFIL = SimpleNamespace(renda_mensal=8000, possui_imovel=True, possui_veiculo=False)
+TIMEOUT = 0.3
+ANALISES = 40
+CONSULTAS_HEDGE = 1000
+
+
+def simulador(nome: str, modelo, gerar, latencia: str) -> SimuladorBureau:
+    return SimuladorBureau(nome, modelo, gerar, semente=7, latencia=latencia, taxa_erro=0)
+
+
+async def cenario_breaker(com_breaker: bool):
+    serasa = ClienteResiliente(simulador("serasa", SerasaData, gerar_serasa, "fixa:5000"), timeout=TIMEOUT)
+    bacen = ClienteResiliente(simulador("bacen_scr", BacenSCRData, gerar_bacen_scr, "fixa:20"), timeout=TIMEOUT)
+    if not com_breaker:
+        # limite inalcançável = breaker desligado
+        serasa.breaker.limite_falhas = bacen.breaker.limite_falhas = 10**9
+    data_sources.FONTES.clear()
+    data_sources.FONTES.update({"serasa": serasa, "bacen_scr": bacen})
+
+    latencias, motivos = [], {}
+    inicio = time.perf_counter()
+    for i in range(ANALISES):
+        t = time.perf_counter()
+        # CPF diferente a cada análise para não cair no cache
+        resultado = await consultar_fontes(f"cb{com_breaker}{i}", PERFIL, timeout_fonte=TIMEOUT)
+        latencias.append((time.perf_counter() - t) * 1000)
+        for motivo in resultado.falhas.values():
+            motivos[motivo] = motivos.get(motivo, 0) + 1
+    total = time.perf_counter() - inicio
+    rotulo = "com breaker" if com_breaker else "sem breaker"
+    print(
+        f"  {rotulo}: {ANALISES} análises em {total:5.2f} s   p50 {percentil(latencias, 50):5.0f} ms   "
+        f"p99 {percentil(latencias, 99):5.0f} ms   falhas: {motivos}"
+    )
+    print(f"    serasa: {serasa.stats()}")
+
+
+async def cenario_hedge(hedge: bool):
+    cliente = ClienteResiliente(
+        simulador("serasa", SerasaData, gerar_serasa, "lognormal:20:0.8"), timeout=5, hedge=hedge
+    )
+    latencias = []
+    for i in range(CONSULTAS_HEDGE):
+        t = time.perf_counter()
+        await cliente.consultar(f"h{i}", PERFIL)
+        latencias.append((time.perf_counter() - t) * 1000)
+    stats = cliente.stats()
+    rotulo = "com hedge" if hedge else "sem hedge"
+    print(
+        f"  {rotulo}: p50 {percentil(latencias, 50):5.1f} ms   p95 {percentil(latencias, 95):5.1f} ms   "
+        f"p99 {percentil(latencias, 99):5.1f} ms   máx {max(latencias):6.1f} ms   "
+        f"consultas extras {stats['hedges_disparados']} ({stats['hedges_disparados'] / CONSULTAS_HEDGE:.1%}), "
+        f"hedge venceu {stats['hedges_vencedores']}"
+    )
+
+
+async def main():
+    print(f"Circuit breaker: serasa travado (5 s), timeout por fonte {TIMEOUT * 1000:.0f} ms")
+    await cenario_breaker(False)
+    await cenario_breaker(True)
+    print("Hedge: latência lognormal (mediana 20 ms, sigma 0.8)")
+    await cenario_hedge(False)
+    await cenario_hedge(True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
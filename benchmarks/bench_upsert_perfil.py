@@ -0,0 +1,90 @@
+# benchmarks/bench_upsert_perfil.py
+#
+# Latência do PUT /api/perfil/me no banco: fluxo antigo (SELECT + setattr +
+# COMMIT + refresh) contra o upsert em um comando (INSERT ... ON CONFLICT ...
+# RETURNING). Também conta quantos comandos cada fluxo manda ao banco, que
+# é o que pesa num Postgres remoto (Neon).
+#
+# Usa o DATABASE_URL configurado (Postgres ou SQLite). Cria um usuário de
+# teste e apaga no final:
+#
+#   python -m benchmarks.bench_upsert_perfil --repeticoes 200
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import delete, event, insert
+
+import schemas.perfil as schemas
+from db import Base, SessionLocal, engine
+from models.models import PerfilUsuario, User
+from routes.profile import upsert_perfil_stmt
+
+EMAIL_BENCH = "benchmark-perfil@exemplo.com"
+
+comandos = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar(*_):
+    global comandos
+    comandos += 1
+
+
+def salvar_antigo(db, user_id: int, dados: dict):
+    perfil = db.query(PerfilUsuario).filter(PerfilUsuario.user_id == user_id).first()
+    if perfil:
+        for key, value in dados.items():
+            setattr(perfil, key, value)
+    else:
+        perfil = PerfilUsuario(user_id=user_id, **dados)
+        db.add(perfil)
+    db.commit()
+    db.refresh(perfil)
+    return schemas.PerfilUsuarioOut.model_validate(perfil)
+
+
+def salvar_upsert(db, user_id: int, dados: dict):
+    perfil = db.execute(upsert_perfil_stmt(engine.dialect.name, user_id, dados)).mappings().one()
+    db.commit()
+    return dict(perfil)
+
+
+def medir(salvar, user_id: int, repeticoes: int):
+    global comandos
+    latencias = []
+    comandos = 0
+    for i in range(repeticoes):
+        dados = {"cidade": f"Cidade {i}", "renda_mensal": 5000 + i, "possui_imovel": i % 2 == 0}
+        db = SessionLocal()
+        inicio = time.perf_counter()
+        salvar(db, user_id, dados)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        db.close()
+    latencias.sort()
+    return statistics.median(latencias), latencias[int(0.99 * (len(latencias) - 1))], comandos / repeticoes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(delete(User).where(User.email == EMAIL_BENCH))
+        user_id = conn.execute(
+            insert(User).values(full_name="Benchmark", email=EMAIL_BENCH, phone="0", cpf="00000000191",
+                                password_hash="x", is_verified=True).returning(User.id)
+        ).scalar_one()
+
+    try:
+        print(f"banco: {engine.dialect.name}, {args.repeticoes} salvamentos")
+        for nome, salvar in (("antigo (select+commit+refresh)", salvar_antigo), ("upsert ... returning", salvar_upsert)):
+            p50, p99, por_salvamento = medir(salvar, user_id, args.repeticoes)
+            print(f"  {nome:<32} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms   {por_salvamento:.1f} comandos/salvamento")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(delete(PerfilUsuario).where(PerfilUsuario.user_id == user_id))
+            conn.execute(delete(User).where(User.id == user_id))
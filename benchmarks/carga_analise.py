@@ -0,0 +1,121 @@
+# benchmarks/carga_analise.py
+#
+# Teste de carga de POST /api/analise-credito numa taxa alvo (req/s).
+#
+# Carga em "malha aberta": as requisições são disparadas no ritmo programado,
+# esperando ou não as anteriores terminarem, e a latência conta a partir do
+# horário programado. Assim, um servidor lento aparece nos percentis em vez
+# de simplesmente receber menos carga.
+#
+# Para exercitar os bureaus simulados (e não só o cache/pré-aprovação), suba
+# o servidor com, por exemplo:
+#
+#   BUREAU_CACHE_TTL_SECONDS=0 BUREAU_SIMULADOR_LATENCIA=lognormal:150:0.5 \
+#   BUREAU_SIMULADOR_TAXA_ERRO=0.02 uvicorn main:app --workers 1
+#   python -m benchmarks.carga_analise --email voce@exemplo.com --senha 'Senha@123' --rps 50 --duracao 30
+#
+# Com --modo jobs, cada requisição vai para POST /api/analise-credito/jobs e
+# acompanha o resultado pelo SSE; aparecem a latência de aceitar o job
+# (o que segura o worker web) e a de ponta a ponta.
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.bench_login import percentil
+
+
+async def login(client: httpx.AsyncClient, email: str, senha: str) -> tuple:
+    r = await client.post("/api/auth/token", data={"username": email, "password": senha})
+    r.raise_for_status()
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    me = await client.get("/api/users/me", headers=headers)
+    me.raise_for_status()
+    return headers, me.json()["cpf"]
+
+
+async def acompanhar_job(client, headers, job_id: str) -> dict:
+    # Lê o SSE até o evento final e devolve o último corpo
+    async with client.stream("GET", f"/api/analise-credito/jobs/{job_id}/eventos", headers=headers) as r:
+        async for linha in r.aiter_lines():
+            if linha.startswith("data: "):
+                job = json.loads(linha[6:])
+                if job["status"] in ("concluida", "erro"):
+                    return job
+    raise httpx.ReadError("stream SSE terminou sem resultado")
+
+
+async def disparar(client, headers, corpo, programado, latencias, status, decisoes, modo, aceites):
+    # Espera o horário programado da requisição
+    atraso = programado - time.perf_counter()
+    if atraso > 0:
+        await asyncio.sleep(atraso)
+    try:
+        if modo == "jobs":
+            r = await client.post("/api/analise-credito/jobs", json=corpo, headers=headers)
+            aceites.append((time.perf_counter() - programado) * 1000)
+            chave = r.status_code
+            resultado = None
+            if r.status_code == 202:
+                job = await acompanhar_job(client, headers, r.json()["job_id"])
+                chave, resultado = job["status"], job["resultado"]
+        else:
+            r = await client.post("/api/analise-credito", json=corpo, headers=headers)
+            chave = r.status_code
+            resultado = r.json() if r.status_code == 200 else None
+        if resultado:
+            decisao = resultado["decision"]
+            decisoes[decisao] = decisoes.get(decisao, 0) + 1
+    except httpx.HTTPError as e:
+        chave = type(e).__name__
+    latencias.append((time.perf_counter() - programado) * 1000)
+    status[chave] = status.get(chave, 0) + 1
+
+
+async def main(args):
+    limites = httpx.Limits(max_connections=args.conexoes, max_keepalive_connections=args.conexoes)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limites) as client:
+        headers, cpf = await login(client, args.email, args.senha)
+        corpo = {"cpf": cpf, "requested_amount": args.valor, "installments": args.parcelas}
+
+        latencias, status, decisoes, aceites = [], {}, {}, []
+        total = int(args.rps * args.duracao)
+        inicio = time.perf_counter() + 0.1
+        tarefas = [
+            asyncio.create_task(disparar(
+                client, headers, corpo, inicio + i / args.rps, latencias, status, decisoes, args.modo, aceites
+            ))
+            for i in range(total)
+        ]
+        await asyncio.gather(*tarefas)
+        duracao = time.perf_counter() - inicio
+
+    ok = status.get("concluida" if args.modo == "jobs" else 200, 0)
+    print(f"alvo {args.rps:.0f} req/s por {args.duracao:.0f} s: {total} requisições em {duracao:.1f} s")
+    print(f"  vazão: {total / duracao:.1f} req/s enviadas, {ok / duracao:.1f} req/s concluídas")
+    print(f"  status: {status}")
+    print(f"  decisões: {decisoes}")
+    print(
+        f"  latência (ms): p50 {percentil(latencias, 50):.0f}  p90 {percentil(latencias, 90):.0f}  "
+        f"p99 {percentil(latencias, 99):.0f}  máx {max(latencias, default=0):.0f}"
+    )
+    if aceites:
+        print(f"  aceite do job (ms): p50 {percentil(aceites, 50):.0f}  p99 {percentil(aceites, 99):.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--senha", required=True)
+    parser.add_argument("--rps", type=float, default=20)
+    parser.add_argument("--duracao", type=float, default=10, help="segundos")
+    parser.add_argument("--valor", type=float, default=10000)
+    parser.add_argument("--parcelas", type=int, default=24)
+    parser.add_argument("--conexoes", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--modo", choices=["sincrono", "jobs"], default="sincrono")
+    asyncio.run(main(parser.parse_args()))
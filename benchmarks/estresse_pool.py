@@ -0,0 +1,99 @@
+# benchmarks/estresse_pool.py
+#
+# Reproduz o esgotamento do pool de conexões (db.py) localmente: um pool
+# pequeno (2 + 1 de overflow, timeout de 1 s) e muito mais clientes
+# concorrentes do que conexões, cada um segurando a conexão um tempo (como
+# uma rota que faz I/O com a sessão aberta). Roda no engine síncrono
+# (threads, como as rotas def no threadpool) e no assíncrono (tasks), e
+# mostra, para cada um, quantos esgotaram e as métricas do /metrics
+# (espera p50/p95/p99, histograma, overflow, invalidações).
+#
+# Por padrão usa um SQLite temporário; com --usar-env usa o DATABASE_URL e
+# as DB_POOL_* do ambiente (.env), por exemplo um Postgres local.
+#
+#   python -m benchmarks.estresse_pool
+#   python -m benchmarks.estresse_pool --clientes 50 --segurar-ms 200 --invalidar 0.05
+#   DB_POOL_SIZE=20 DB_MAX_OVERFLOW=10 python -m benchmarks.estresse_pool --usar-env
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# A configuração do pool precisa estar no ambiente antes de importar db.py
+if "--usar-env" not in sys.argv:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'estresse.db')}"
+    os.environ.setdefault("DB_POOL_SIZE", "2")
+    os.environ.setdefault("DB_MAX_OVERFLOW", "1")
+    os.environ.setdefault("DB_POOL_TIMEOUT_SECONDS", "1")
+
+from sqlalchemy import exc, text
+
+from db import async_engine, engine, estado_pools
+
+
+def cliente_sync(segurar: float, invalidar: float) -> bool:
+    """True se conseguiu conexão, False se o pool esgotou."""
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            time.sleep(segurar)
+            if random.random() < invalidar:
+                conn.invalidate()  # como uma conexão derrubada pelo servidor
+    except exc.TimeoutError:
+        return False
+    return True
+
+
+async def cliente_async(segurar: float, invalidar: float) -> bool:
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await asyncio.sleep(segurar)
+            if random.random() < invalidar:
+                await conn.invalidate()
+    except exc.TimeoutError:
+        return False
+    return True
+
+
+def mostrar(rotulo: str, resultados: list, duracao: float, stats: dict):
+    esgotados = resultados.count(False)
+    print(f"{rotulo}: {len(resultados)} clientes em {duracao:.1f} s, {esgotados} esgotaram o pool ({esgotados / len(resultados):.0%})")
+    print(f"  pool {stats['pool_size']} + {stats['max_overflow']} overflow, timeout {stats['timeout_s']} s, pre_ping={stats['pre_ping']}")
+    print(f"  pico em uso {stats['pico_em_uso']}, conexões abertas {stats['conexoes_abertas']} "
+          f"(overflow {stats['conexoes_overflow']}), invalidações {stats['invalidacoes']}, esgotamentos {stats['esgotamentos']}")
+    print(f"  espera p50 {stats['espera_ms_p50']} ms, p95 {stats['espera_ms_p95']} ms, p99 {stats['espera_ms_p99']} ms")
+    for faixa, n in stats["espera_ms_histograma"].items():
+        if n:
+            print(f"    {faixa:>8} ms {n:>6}  {'#' * max(1, 40 * n // len(resultados))}")
+
+
+async def rodar_async(args) -> list:
+    segurar = args.segurar_ms / 1000
+    return await asyncio.gather(*(cliente_async(segurar, args.invalidar) for _ in range(args.clientes)))
+
+
+def main(args):
+    segurar = args.segurar_ms / 1000
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clientes) as executor:
+        resultados = list(executor.map(lambda _: cliente_sync(segurar, args.invalidar), range(args.clientes)))
+    mostrar("sync (threads)", resultados, time.perf_counter() - inicio, estado_pools()["sync"])
+
+    inicio = time.perf_counter()
+    resultados = asyncio.run(rodar_async(args))
+    mostrar("async (tasks)", resultados, time.perf_counter() - inicio, estado_pools()["async"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clientes", type=int, default=30, help="clientes concorrentes")
+    parser.add_argument("--segurar-ms", type=float, default=300, help="quanto tempo cada cliente segura a conexão")
+    parser.add_argument("--invalidar", type=float, default=0.1, help="fração das conexões invalidadas no fim")
+    parser.add_argument("--usar-env", action="store_true", help="usar DATABASE_URL e DB_POOL_* do ambiente")
+    main(parser.parse_args())
@@ -0,0 +1,44 @@
+# benchmarks/stub_bureaus.py
+#
+# Servidor local que imita as APIs do Serasa e do SCR do Bacen, com latência
+# configurável, para testar analysis/data_sources.py sem sair da máquina.
+#
+#   GET /serasa/{cpf}        -> SerasaData
+#   GET /bacen_scr/{cpf}     -> BacenSCRData
+#
+# A latência padrão vem de STUB_LATENCIA_MS. Com um prefixo no caminho dá
+# para escolher por URL (útil para apontar cada fonte para um cenário):
+#   /800/serasa/{cpf}    responde em 800 ms
+#   /erro/serasa/{cpf}   responde 500
+#
+#   uvicorn benchmarks.stub_bureaus:app --port 9100
+#   SERASA_API_URL=http://127.0.0.1:9100/serasa BACEN_SCR_API_URL=http://127.0.0.1:9100/bacen_scr uvicorn main:app
+
+import asyncio
+import os
+
+from fastapi import FastAPI, HTTPException
+
+STUB_LATENCIA_MS = float(os.getenv("STUB_LATENCIA_MS", 100))
+
+app = FastAPI(title="Stub dos bureaus")
+
+
+async def _esperar(modo: str):
+    if modo == "erro":
+        raise HTTPException(status_code=500, detail="erro simulado")
+    await asyncio.sleep((float(modo) if modo else STUB_LATENCIA_MS) / 1000)
+
+
+@app.get("/serasa/{cpf}")
+@app.get("/{modo}/serasa/{cpf}")
+async def serasa(cpf: str, modo: str = ""):
+    await _esperar(modo)
+    return {"cpf": cpf, "score": 720, "has_negative_records": False, "protests": 0, "debts_value": 1200.0}
+
+
+@app.get("/bacen_scr/{cpf}")
+@app.get("/{modo}/bacen_scr/{cpf}")
+async def bacen_scr(cpf: str, modo: str = ""):
+    await _esperar(modo)
+    return {"cpf": cpf, "total_loan_value": 150000.0, "total_overdue_value": 0.0, "risk_level": 1}
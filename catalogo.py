@@ -0,0 +1,153 @@
+# catalogo.py
+#
+# Catálogo de produtos de empréstimo (taxas, limites de prazo/valor e campos
+# esperados em Simulacao.dados_especificos).
+#
+# O arquivo (data/produtos.json, ou CATALOGO_PRODUTOS_PATH) é lido uma vez e
+# vira uma estrutura imutável em memória. Quando o arquivo muda, um catálogo
+# novo é montado e trocado de uma vez (uma atribuição), então as requisições
+# sempre enxergam uma versão completa: a antiga ou a nova, nunca uma mistura.
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+CATALOGO_PRODUTOS_PATH = os.getenv(
+    "CATALOGO_PRODUTOS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "produtos.json"),
+)
+# De quanto em quanto tempo (no máximo) conferimos se o arquivo mudou
+CATALOGO_CHECK_INTERVAL_SECONDS = float(os.getenv("CATALOGO_CHECK_INTERVAL_SECONDS", 5))
+
+# Tipos aceitos em campos_especificos (dados_especificos.py tem um validador para cada)
+TIPOS_CAMPO = ("number", "integer", "string", "boolean")
+
+
+@dataclass(frozen=True)
+class CampoEspecifico:
+    tipo: str  # um de TIPOS_CAMPO
+    obrigatorio: bool = False
+
+
+@dataclass(frozen=True)
+class Produto:
+    codigo: str
+    nome: str
+    taxa_juros_mensal: float
+    prazo_min: int
+    prazo_max: int
+    valor_min: float
+    valor_max: float
+    campos_especificos: Mapping[str, CampoEspecifico]
+
+    @property
+    def campos_obrigatorios(self) -> frozenset:
+        return frozenset(k for k, c in self.campos_especificos.items() if c.obrigatorio)
+
+    def validar_limites(self, valor: float, prazo_meses: int) -> Optional[str]:
+        """Retorna a mensagem de erro, ou None se valor e prazo estão dentro dos limites."""
+        if not self.valor_min <= valor <= self.valor_max:
+            return f"Para '{self.nome}' o valor deve estar entre {self.valor_min:.2f} e {self.valor_max:.2f}."
+        if not self.prazo_min <= prazo_meses <= self.prazo_max:
+            return f"Para '{self.nome}' o prazo deve estar entre {self.prazo_min} e {self.prazo_max} meses."
+        return None
+
+
+@dataclass(frozen=True)
+class Catalogo:
+    produtos: Mapping[str, Produto]
+    padrao: str
+    versao: str
+
+    def produto(self, tipo_emprestimo: str) -> Produto:
+        """Busca O(1); tipos não cadastrados caem no produto padrão."""
+        return self.produtos.get(tipo_emprestimo) or self.produtos[self.padrao]
+
+
+def _montar_catalogo(data: dict, versao: str) -> Catalogo:
+    produtos = {}
+    for codigo, p in data["produtos"].items():
+        campos = {}
+        for nome, c in p.get("campos_especificos", {}).items():
+            if c["tipo"] not in TIPOS_CAMPO:
+                raise ValueError(
+                    f"Produto '{codigo}', campo '{nome}': tipo '{c['tipo']}' inválido. Use um de: {', '.join(TIPOS_CAMPO)}."
+                )
+            campos[nome] = CampoEspecifico(tipo=c["tipo"], obrigatorio=bool(c.get("obrigatorio", False)))
+        produto = Produto(
+            codigo=codigo,
+            nome=p.get("nome", codigo),
+            taxa_juros_mensal=float(p["taxa_juros_mensal"]),
+            prazo_min=int(p["prazo_min"]),
+            prazo_max=int(p["prazo_max"]),
+            valor_min=float(p["valor_min"]),
+            valor_max=float(p["valor_max"]),
+            campos_especificos=MappingProxyType(campos),
+        )
+        if produto.prazo_min > produto.prazo_max:
+            raise ValueError(f"Produto '{codigo}': prazo_min maior que prazo_max.")
+        if produto.valor_min > produto.valor_max:
+            raise ValueError(f"Produto '{codigo}': valor_min maior que valor_max.")
+        produtos[codigo] = produto
+    padrao = data.get("padrao", "default")
+    if padrao not in produtos:
+        raise ValueError(f"Produto padrão '{padrao}' não existe no catálogo.")
+    return Catalogo(produtos=MappingProxyType(produtos), padrao=padrao, versao=versao)
+
+
+def carregar_catalogo(path: str = CATALOGO_PRODUTOS_PATH) -> Catalogo:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return _montar_catalogo(data, versao=str(os.stat(path).st_mtime_ns))
+
+
+_catalogo: Catalogo = carregar_catalogo()
+_mtime_ns = os.stat(CATALOGO_PRODUTOS_PATH).st_mtime_ns
+_proxima_checagem = time.monotonic() + CATALOGO_CHECK_INTERVAL_SECONDS
+_reload_lock = threading.Lock()
+
+
+def recarregar_catalogo() -> Catalogo:
+    """Relê o arquivo e troca o catálogo em uso. Em caso de erro mantém o atual."""
+    global _catalogo, _mtime_ns
+    with _reload_lock:
+        mtime_ns = _mtime_ns
+        try:
+            mtime_ns = os.stat(CATALOGO_PRODUTOS_PATH).st_mtime_ns
+            novo = carregar_catalogo(CATALOGO_PRODUTOS_PATH)
+        except Exception as e:
+            # Qualquer erro (ex.: "produtos" como lista) mantém o último catálogo bom
+            print(f"CATÁLOGO: erro ao recarregar {CATALOGO_PRODUTOS_PATH}, mantendo versão {_catalogo.versao}: {e!r}")
+            # Guarda o mtime da versão quebrada: só relê quando o arquivo mudar de novo
+            _mtime_ns = mtime_ns
+            return _catalogo
+        _catalogo = novo
+        _mtime_ns = int(novo.versao)
+        print(f"CATÁLOGO: versão {novo.versao} carregada ({len(novo.produtos)} produtos).")
+        return _catalogo
+
+
+def obter_catalogo() -> Catalogo:
+    """
+    Retorna o catálogo em uso. No máximo a cada CATALOGO_CHECK_INTERVAL_SECONDS
+    confere o mtime do arquivo e, se mudou, recarrega.
+    """
+    global _proxima_checagem
+    agora = time.monotonic()
+    if agora >= _proxima_checagem:
+        _proxima_checagem = agora + CATALOGO_CHECK_INTERVAL_SECONDS
+        try:
+            mudou = os.stat(CATALOGO_PRODUTOS_PATH).st_mtime_ns != _mtime_ns
+        except OSError:
+            mudou = False
+        if mudou:
+            return recarregar_catalogo()
+    return _catalogo
+
+
+def obter_produto(tipo_emprestimo: str) -> Produto:
+    return obter_catalogo().produto(tipo_emprestimo)
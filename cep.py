@@ -0,0 +1,176 @@
+# cep.py
+#
+# Consulta de CEP offline, sem chamar nenhum serviço externo.
+#
+# A base de CEPs (CSV) é convertida uma vez num índice binário ordenado
+# (data/cep.idx, ou CEP_INDEX_PATH) que é aberto com mmap: o sistema
+# operacional carrega só as páginas usadas e a busca é binária sobre o
+# array de CEPs, então cada consulta custa ~20 comparações.
+#
+# Formato do arquivo (little-endian):
+#   cabeçalho   "CEP1", total de registros, início dos registros, início das strings
+#   ceps        total x uint32, em ordem crescente
+#   registros   total x (logradouro, bairro, cidade: uint32 offsets nas strings; uf: 2 bytes; 2 de folga)
+#   strings     cada texto uma vez só: uint16 tamanho + UTF-8
+#
+# Gerar o índice a partir do CSV (colunas cep, logradouro, bairro, cidade, uf):
+#
+#   python cep.py ceps.csv data/cep.idx --delimitador ";"
+
+import argparse
+import csv
+import mmap
+import os
+import re
+import struct
+import threading
+from bisect import bisect_left
+from typing import Dict, Optional
+
+CEP_INDEX_PATH = os.getenv(
+    "CEP_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cep.idx"),
+)
+
+MAGIC = b"CEP1"
+_CABECALHO = struct.Struct("<4sIII")
+_REGISTRO = struct.Struct("<III2s2x")
+_TAMANHO_TEXTO = struct.Struct("<H")
+
+_NAO_DIGITOS = re.compile(r"\D")
+
+
+def normalizar_cep(cep: str) -> Optional[str]:
+    """'01001-000' -> '01001000'. Retorna None se não tiver 8 dígitos."""
+    digitos = _NAO_DIGITOS.sub("", cep or "")
+    return digitos if len(digitos) == 8 else None
+
+
+class BaseCep:
+    """Índice de CEPs aberto via mmap (somente leitura)."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.total, self._inicio_registros, self._inicio_strings = _CABECALHO.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} não é um índice de CEP válido.")
+        inicio_ceps = _CABECALHO.size
+        self._ceps = memoryview(self._mm)[inicio_ceps:inicio_ceps + 4 * self.total].cast("I")
+
+    def _texto(self, offset: int) -> str:
+        inicio = self._inicio_strings + offset
+        (tamanho,) = _TAMANHO_TEXTO.unpack_from(self._mm, inicio)
+        inicio += _TAMANHO_TEXTO.size
+        return self._mm[inicio:inicio + tamanho].decode("utf-8")
+
+    def buscar(self, cep: str) -> Optional[Dict[str, str]]:
+        cep = normalizar_cep(cep)
+        if cep is None:
+            return None
+        numero = int(cep)
+        i = bisect_left(self._ceps, numero)
+        if i == self.total or self._ceps[i] != numero:
+            return None
+        logradouro, bairro, cidade, uf = _REGISTRO.unpack_from(self._mm, self._inicio_registros + i * _REGISTRO.size)
+        return {
+            "cep": cep,
+            "logradouro": self._texto(logradouro),
+            "bairro": self._texto(bairro),
+            "cidade": self._texto(cidade),
+            "estado": uf.decode("ascii"),
+        }
+
+
+_base: Optional[BaseCep] = None
+_lock = threading.Lock()
+
+
+def obter_base_cep() -> Optional[BaseCep]:
+    """Abre o índice na primeira chamada. None se o arquivo não existir."""
+    global _base
+    if _base is None:
+        with _lock:
+            if _base is None and os.path.exists(CEP_INDEX_PATH):
+                _base = BaseCep(CEP_INDEX_PATH)
+    return _base
+
+
+def buscar_cep(cep: str) -> Optional[Dict[str, str]]:
+    base = obter_base_cep()
+    return base.buscar(cep) if base else None
+
+
+CAMPOS_ENDERECO = ("logradouro", "bairro", "cidade", "estado")
+
+
+def preencher_endereco(dados: dict) -> dict:
+    """
+    Normaliza dados["cep"] (só dígitos) e completa os campos de endereço que
+    vieram vazios com os da base local. O que o cliente digitou é mantido.
+    Levanta ValueError se o CEP não tiver 8 dígitos.
+    """
+    if not dados.get("cep"):
+        return dados
+    cep = normalizar_cep(dados["cep"])
+    if cep is None:
+        raise ValueError("CEP deve ter 8 dígitos.")
+    dados["cep"] = cep
+    endereco = buscar_cep(cep)
+    if endereco:
+        for campo in CAMPOS_ENDERECO:
+            if not dados.get(campo) and endereco[campo]:
+                dados[campo] = endereco[campo]
+    return dados
+
+
+def construir_indice(csv_path: str, destino: str, delimitador: str = ",", encoding: str = "utf-8") -> int:
+    """Converte o CSV da base de CEPs no índice binário. Retorna o total de CEPs."""
+    enderecos = {}
+    with open(csv_path, newline="", encoding=encoding) as f:
+        for linha in csv.DictReader(f, delimiter=delimitador):
+            linha = {(k or "").strip().lower(): (v or "").strip() for k, v in linha.items()}
+            cep = normalizar_cep(linha.get("cep", ""))
+            uf = (linha.get("uf") or linha.get("estado") or "").upper()
+            if cep is None or len(uf) != 2:
+                continue
+            enderecos[int(cep)] = (linha.get("logradouro", ""), linha.get("bairro", ""), linha.get("cidade", ""), uf)
+
+    strings = bytearray()
+    offsets: Dict[str, int] = {}
+
+    def guardar(texto: str) -> int:
+        if texto not in offsets:
+            # Corta no limite do tamanho (2 bytes) sem partir um caractere UTF-8 no meio
+            bruto = texto.encode("utf-8")[:0xFFFF].decode("utf-8", "ignore").encode("utf-8")
+            offsets[texto] = len(strings)
+            strings.extend(_TAMANHO_TEXTO.pack(len(bruto)) + bruto)
+        return offsets[texto]
+
+    ceps = sorted(enderecos)
+    registros = bytearray()
+    for numero in ceps:
+        logradouro, bairro, cidade, uf = enderecos[numero]
+        registros += _REGISTRO.pack(guardar(logradouro), guardar(bairro), guardar(cidade), uf.encode("ascii"))
+
+    inicio_registros = _CABECALHO.size + 4 * len(ceps)
+    inicio_strings = inicio_registros + len(registros)
+    tmp = destino + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_CABECALHO.pack(MAGIC, len(ceps), inicio_registros, inicio_strings))
+        f.write(struct.pack(f"<{len(ceps)}I", *ceps))
+        f.write(registros)
+        f.write(strings)
+    os.replace(tmp, destino)  # troca atômica: quem já tem o arquivo aberto continua lendo o antigo
+    return len(ceps)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera o índice binário de CEPs a partir de um CSV.")
+    parser.add_argument("csv", help="CSV com as colunas cep, logradouro, bairro, cidade e uf")
+    parser.add_argument("destino", nargs="?", default=CEP_INDEX_PATH)
+    parser.add_argument("--delimitador", default=",")
+    parser.add_argument("--encoding", default="utf-8")
+    args = parser.parse_args()
+    total = construir_indice(args.csv, args.destino, args.delimitador, args.encoding)
+    print(f"{total} CEPs gravados em {args.destino} ({os.path.getsize(args.destino) / 1024 / 1024:.1f} MB).")
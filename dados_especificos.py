@@ -0,0 +1,128 @@
+# dados_especificos.py
+#
+# Validação de Simulacao.dados_especificos por produto.
+#
+# Para cada produto do catálogo montamos (uma vez) um model Pydantic com os
+# campos de `campos_especificos` e guardamos o TypeAdapter dele, que já é o
+# validador compilado do pydantic-core. Na requisição é só um dict lookup
+# pelo tipo_emprestimo + validate_python, sem remontar schema nenhum.
+#
+# Os validadores ficam em cache por versão do catálogo: quando o catálogo
+# é recarregado (catalogo.py), a próxima chamada remonta todos de uma vez.
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, Strict, TypeAdapter, ValidationError, create_model
+from pydantic.functional_validators import AfterValidator
+from typing_extensions import Annotated
+
+from catalogo import TIPOS_CAMPO as TIPOS_CATALOGO, Catalogo, Produto, obter_catalogo
+
+# Limites do payload (o banco não é lugar para anexos/base64)
+DADOS_ESPECIFICOS_MAX_CHAVES = int(os.getenv("DADOS_ESPECIFICOS_MAX_CHAVES", 50))
+DADOS_ESPECIFICOS_MAX_BYTES = int(os.getenv("DADOS_ESPECIFICOS_MAX_BYTES", 8192))
+DADOS_ESPECIFICOS_MAX_CARACTERES = int(os.getenv("DADOS_ESPECIFICOS_MAX_CARACTERES", 500))
+
+Texto = Annotated[str, Strict(), Field(max_length=DADOS_ESPECIFICOS_MAX_CARACTERES)]
+
+# strict: "123" não vira número e "true" não vira booleano
+TIPOS_CAMPO = {
+    "number": Annotated[float, Strict(), Field(allow_inf_nan=False)],
+    "integer": Annotated[int, Strict()],
+    "string": Texto,
+    "boolean": Annotated[bool, Strict()],
+}
+# O catálogo só aceita tipos de TIPOS_CATALOGO: todos precisam de validador aqui
+_sem_validador = set(TIPOS_CATALOGO) - set(TIPOS_CAMPO)
+if _sem_validador:
+    raise RuntimeError(f"Tipos do catálogo sem validador: {', '.join(sorted(_sem_validador))}")
+
+
+class DadosInvalidos(ValueError):
+    pass
+
+
+def _valor_escalar(valor: Any) -> Any:
+    # Campos fora do catálogo são aceitos, mas só valores simples (sem listas/objetos)
+    if valor is None or isinstance(valor, (bool, int)):
+        return valor
+    if isinstance(valor, float):
+        if valor != valor or valor in (float("inf"), float("-inf")):
+            raise ValueError("número inválido")
+        return valor
+    if isinstance(valor, str):
+        if len(valor) > DADOS_ESPECIFICOS_MAX_CARACTERES:
+            raise ValueError(f"texto com mais de {DADOS_ESPECIFICOS_MAX_CARACTERES} caracteres")
+        return valor
+    raise ValueError("deve ser texto, número, booleano ou null")
+
+
+class _DadosEspecificosBase(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    __pydantic_extra__: Dict[str, Annotated[Any, AfterValidator(_valor_escalar)]]
+
+
+def _tipo(produto: Produto, nome: str) -> Any:
+    tipo = produto.campos_especificos[nome].tipo
+    if tipo not in TIPOS_CAMPO:
+        raise ValueError(f"Produto '{produto.codigo}', campo '{nome}': tipo '{tipo}' sem validador.")
+    return TIPOS_CAMPO[tipo]
+
+
+def _montar_validadores(catalogo: Catalogo) -> Dict[str, TypeAdapter]:
+    validadores = {}
+    for codigo, produto in catalogo.produtos.items():
+        campos = {
+            nome: (_tipo(produto, nome), ...) if c.obrigatorio else (Optional[_tipo(produto, nome)], None)
+            for nome, c in produto.campos_especificos.items()
+        }
+        modelo = create_model(f"DadosEspecificos_{codigo}", __base__=_DadosEspecificosBase, **campos)
+        validadores[codigo] = TypeAdapter(modelo)
+    return validadores
+
+
+_validadores: Dict[str, TypeAdapter] = {}
+_versao: Optional[str] = None
+_lock = threading.Lock()
+
+
+def obter_validador(tipo_emprestimo: str) -> TypeAdapter:
+    """Validador compilado do produto (tipos não cadastrados usam o produto padrão)."""
+    global _validadores, _versao
+    catalogo = obter_catalogo()
+    if catalogo.versao != _versao:
+        with _lock:
+            if catalogo.versao != _versao:
+                _validadores = _montar_validadores(catalogo)
+                _versao = catalogo.versao
+    return _validadores[catalogo.produto(tipo_emprestimo).codigo]
+
+
+def _mensagens(erro: ValidationError) -> List[str]:
+    mensagens = []
+    for e in erro.errors(include_url=False):
+        campo = ".".join(str(parte) for parte in e["loc"])
+        mensagens.append(f"{campo}: {e['msg']}" if campo else e["msg"])
+    return mensagens
+
+
+def validar_dados_especificos(tipo_emprestimo: str, dados: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Valida dados_especificos contra o produto e devolve o dict normalizado
+    (campos opcionais ausentes não são incluídos). Levanta DadosInvalidos.
+    """
+    # Checagens baratas primeiro: payload grande é recusado antes de validar campo a campo
+    if len(dados) > DADOS_ESPECIFICOS_MAX_CHAVES:
+        raise DadosInvalidos(f"dados_especificos aceita no máximo {DADOS_ESPECIFICOS_MAX_CHAVES} campos.")
+    if len(json.dumps(dados, ensure_ascii=False).encode()) > DADOS_ESPECIFICOS_MAX_BYTES:
+        raise DadosInvalidos(f"dados_especificos deve ter no máximo {DADOS_ESPECIFICOS_MAX_BYTES} bytes.")
+
+    try:
+        modelo = obter_validador(tipo_emprestimo).validate_python(dados)
+    except ValidationError as e:
+        raise DadosInvalidos("; ".join(_mensagens(e)))
+    return modelo.model_dump(exclude_unset=True)
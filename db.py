@@ -1,8 +1,14 @@
 import os
+from typing import Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv # Importar dotenv
 
+from pool_metricas import AsyncAdaptedQueuePoolMedido, QueuePoolMedido, estado_pool, instrumentar
+
 # Carrega as variáveis do arquivo .env
 load_dotenv()
 
@@ -20,19 +26,125 @@ connect_args = {}
 if DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
 
+# Pool de conexões, por ambiente (.env). Cada processo tem dois pools (o do
+# engine síncrono e o do assíncrono), então o máximo de conexões por worker é
+# a soma dos dois: (DB_POOL_SIZE + DB_MAX_OVERFLOW) + (DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW).
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", DB_POOL_SIZE))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", DB_MAX_OVERFLOW))
+# Quanto esperar por uma conexão livre antes de dar TimeoutError
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", 30))
+# Reabre conexões mais velhas que isso (-1 = nunca). No Neon, algo abaixo do
+# tempo de suspensão do compute (ex.: 300) evita pegar conexão já derrubada.
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", -1))
+# true: testa a conexão (SELECT 1) a cada checkout, pessimista, ótimo para nuvem.
+# false: otimista, sem ida extra ao banco; conexão morta só é descoberta no
+# erro (e invalidada), então combine com DB_POOL_RECYCLE_SECONDS.
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# LIFO reaproveita sempre as mesmas conexões e deixa as outras ociosas
+# expirarem (bom com recycle e com poolers que fecham conexões paradas)
+DB_POOL_LIFO = os.getenv("DB_POOL_LIFO", "false").lower() == "true"
+
+
+def _opcoes_pool(url, poolclass, pool_size: int, max_overflow: int) -> dict:
+    u = make_url(url)
+    if u.get_backend_name() == "sqlite" and u.database in (None, "", ":memory:"):
+        # SQLite em memória usa o pool próprio do dialeto (uma conexão só)
+        return {"pool_pre_ping": DB_POOL_PRE_PING}
+    return {
+        "poolclass": poolclass,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_use_lifo": DB_POOL_LIFO,
+    }
+
+
 engine = create_engine(
     DATABASE_URL,
     connect_args=connect_args,
-    pool_pre_ping=True, # Mantém a conexão viva (ótimo para nuvem)
     future=True,
+    **_opcoes_pool(DATABASE_URL, QueuePoolMedido, DB_POOL_SIZE, DB_MAX_OVERFLOW),
 )
+instrumentar(engine)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
+
+def _async_database_url(url: str):
+    """
+    Converte a URL síncrona para o driver assíncrono equivalente:
+    postgresql -> postgresql+asyncpg, sqlite -> sqlite+aiosqlite.
+    """
+    u = make_url(url)
+    if u.get_backend_name() == "sqlite":
+        return u.set(drivername="sqlite+aiosqlite")
+    if u.get_backend_name() == "postgresql":
+        query = dict(u.query)
+        # O asyncpg não entende os parâmetros de SSL da libpq (usados pelo Neon)
+        sslmode = query.pop("sslmode", None)
+        query.pop("channel_binding", None)
+        if sslmode:
+            query["ssl"] = sslmode
+        return u.set(drivername="postgresql+asyncpg", query=query)
+    return u
+
+
+async_engine = create_async_engine(
+    _async_database_url(DATABASE_URL),
+    **_opcoes_pool(DATABASE_URL, AsyncAdaptedQueuePoolMedido, DB_ASYNC_POOL_SIZE, DB_ASYNC_MAX_OVERFLOW),
+)
+instrumentar(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+
+def upsert_stmt(dialeto: str, model, conflict_cols, update_cols, values: Optional[dict] = None, where=None):
+    """
+    INSERT ... ON CONFLICT (conflict_cols) DO UPDATE SET col = excluded.col
+    para cada coluna de update_cols (Postgres e SQLite >= 3.35). Sem `values`
+    serve para executemany. `where(excluded)` devolve a condição do UPDATE.
+    Outros bancos: NotImplementedError.
+    """
+    if dialeto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialeto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert não suportado no banco '{dialeto}'.")
+
+    stmt = insert(model)
+    if values is not None:
+        stmt = stmt.values(**values)
+    # Sem colunas para atualizar, o DO UPDATE "vazio" (chave = chave) ainda
+    # faz o RETURNING devolver a linha existente (DO NOTHING não devolveria)
+    atualizar = list(update_cols) or list(conflict_cols)
+    return stmt.on_conflict_do_update(
+        index_elements=list(conflict_cols),
+        set_={c: stmt.excluded[c] for c in atualizar},
+        where=where(stmt.excluded) if where is not None else None,
+    )
+
+
+def estado_pools() -> dict:
+    """Configuração e métricas dos dois pools (aparece no /metrics)."""
+    return {"sync": estado_pool(engine.pool), "async": estado_pool(async_engine.pool)}
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Sessão assíncrona: use nas rotas async para não bloquear o event loop."""
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,102 @@
+# email_templates.py
+#
+# Templates de e-mail carregados e "compilados" uma única vez (na importação).
+# Cada template tem uma versão HTML (.html) e uma versão texto puro (.txt) em
+# templates/email/. Os campos usam a sintaxe {{ campo }} ou {{ campo|br }}
+# (quebra de linha vira <br> no HTML).
+#
+# Compilar = quebrar o arquivo em partes fixas + posições dos campos. Renderizar
+# é só preencher essas posições e fazer um "".join, sem reprocessar o layout.
+
+import html
+import os
+import re
+from typing import Callable, Dict, List, Tuple
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "email")
+
+_FIELD_RE = re.compile(r"\{\{\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*(?:\|\s*([a-z]+)\s*)?\}\}")
+
+
+def _escape_html(value) -> str:
+    return html.escape(str(value), quote=True)
+
+
+def _escape_html_br(value) -> str:
+    return _escape_html(value).replace("\r\n", "\n").replace("\n", "<br>")
+
+
+def _plain(value) -> str:
+    return str(value)
+
+
+_HTML_FILTERS: Dict[str, Callable] = {"": _escape_html, "br": _escape_html_br}
+_TEXT_FILTERS: Dict[str, Callable] = {"": _plain, "br": _plain}
+
+
+class CompiledTemplate:
+    """Layout pré-processado: partes fixas + lista de (posição, campo, filtro)."""
+
+    def __init__(self, source: str, filters: Dict[str, Callable]):
+        self._parts: List[str] = []
+        self._slots: List[Tuple[int, str, Callable]] = []
+        pos = 0
+        for match in _FIELD_RE.finditer(source):
+            self._parts.append(source[pos:match.start()])
+            name, filter_name = match.group(1), match.group(2) or ""
+            if filter_name not in filters:
+                raise ValueError(f"Filtro de template desconhecido: {filter_name}")
+            self._slots.append((len(self._parts), name, filters[filter_name]))
+            self._parts.append("")  # lugar do campo
+            pos = match.end()
+        self._parts.append(source[pos:])
+        self.fields = frozenset(name for _, name, _ in self._slots)
+
+    def render(self, context: dict) -> str:
+        parts = self._parts.copy()
+        for index, name, fn in self._slots:
+            parts[index] = fn(context[name])
+        return "".join(parts)
+
+
+class EmailTemplate:
+    def __init__(self, name: str, html_source: str, text_source: str):
+        self.name = name
+        self.html = CompiledTemplate(html_source, _HTML_FILTERS)
+        self.text = CompiledTemplate(text_source, _TEXT_FILTERS)
+        self.fields = self.html.fields | self.text.fields
+
+    def render(self, **context) -> Tuple[str, str]:
+        """Retorna (html, texto)."""
+        missing = self.fields - context.keys()
+        if missing:
+            raise KeyError(f"Campos faltando no template '{self.name}': {sorted(missing)}")
+        return self.html.render(context), self.text.render(context)
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def load_templates(directory: str = TEMPLATES_DIR) -> Dict[str, EmailTemplate]:
+    templates = {}
+    for filename in sorted(os.listdir(directory)):
+        name, ext = os.path.splitext(filename)
+        if ext != ".html":
+            continue
+        text_path = os.path.join(directory, name + ".txt")
+        templates[name] = EmailTemplate(
+            name,
+            _read(os.path.join(directory, filename)),
+            _read(text_path) if os.path.exists(text_path) else "",
+        )
+    return templates
+
+
+TEMPLATES = load_templates()
+
+
+def render_email(name: str, **context) -> Tuple[str, str]:
+    """Renderiza o template `name` e retorna (html, texto)."""
+    return TEMPLATES[name].render(**context)
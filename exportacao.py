@@ -0,0 +1,145 @@
+# exportacao.py
+#
+# Exportação de TODAS as simulações (inclusive dados_especificos) para o
+# back office, em NDJSON ou CSV.
+#
+# As linhas são lidas com cursor do lado do servidor (yield_per) e escritas
+# conforme chegam, então a memória fica constante independente do tamanho
+# da tabela. Usado pela rota /api/admin/exportar/simulacoes e pela linha de
+# comando:
+#
+#   python exportacao.py --formato csv --desde 2025-01-01 --saida simulacoes.csv
+
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db import SessionLocal
+from filtros_json import FiltroJson, compilar_filtros, parse_filtros
+from models.models import Simulacao
+
+COLUNAS = [
+    "id",
+    "user_id",
+    "criado_em",
+    "tipo_emprestimo",
+    "motivo_emprestimo",
+    "valor_desejado",
+    "prazo_meses",
+    "sistema_amortizacao",
+    "valor_parcela",
+    "valor_total",
+    "juros_total",
+    "dados_especificos",
+]
+
+FORMATOS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Linhas buscadas por ida ao banco / escritas por pedaço da resposta
+TAMANHO_LOTE = 1000
+
+
+def _json_default(valor):
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(valor)!r}")
+
+
+def iter_simulacoes(
+    db: Session,
+    desde: Optional[datetime] = None,
+    ate: Optional[datetime] = None,
+    tipo_emprestimo: Optional[str] = None,
+    filtros_json: Sequence[FiltroJson] = (),
+) -> Iterator[dict]:
+    """Percorre as simulações em ordem de id, TAMANHO_LOTE linhas por vez."""
+    query = select(*(getattr(Simulacao, c) for c in COLUNAS))
+    if desde:
+        query = query.where(Simulacao.criado_em >= desde)
+    if ate:
+        query = query.where(Simulacao.criado_em < ate)
+    if tipo_emprestimo:
+        query = query.where(Simulacao.tipo_emprestimo == tipo_emprestimo)
+    query = query.where(*compilar_filtros(Simulacao.dados_especificos, filtros_json, db.bind.dialect.name))
+    query = query.order_by(Simulacao.id).execution_options(yield_per=TAMANHO_LOTE)
+
+    for row in db.execute(query).mappings():
+        yield row
+
+
+def gerar_ndjson(linhas: Iterator[dict]) -> Iterator[bytes]:
+    buffer = []
+    for linha in linhas:
+        buffer.append(json.dumps(dict(linha), default=_json_default, ensure_ascii=False))
+        if len(buffer) >= TAMANHO_LOTE:
+            yield ("\n".join(buffer) + "\n").encode()
+            buffer.clear()
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode()
+
+
+def gerar_csv(linhas: Iterator[dict]) -> Iterator[bytes]:
+    saida = io.StringIO()
+    writer = csv.writer(saida)
+    writer.writerow(COLUNAS)
+    contador = 0
+    for linha in linhas:
+        registro = dict(linha)
+        registro["dados_especificos"] = json.dumps(registro["dados_especificos"], default=_json_default, ensure_ascii=False)
+        writer.writerow([registro[c] for c in COLUNAS])
+        contador += 1
+        if contador >= TAMANHO_LOTE:
+            yield saida.getvalue().encode()
+            saida.seek(0)
+            saida.truncate()
+            contador = 0
+    yield saida.getvalue().encode()
+
+
+def exportar(formato: str, **filtros) -> Iterator[bytes]:
+    """
+    Gera o arquivo inteiro em pedaços. Abre e fecha a própria sessão, pois
+    numa StreamingResponse o gerador continua rodando depois da rota retornar.
+    """
+    gerar = gerar_ndjson if formato == "ndjson" else gerar_csv
+    db = SessionLocal()
+    try:
+        yield from gerar(iter_simulacoes(db, **filtros))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta as simulações em NDJSON ou CSV.")
+    parser.add_argument("--formato", choices=sorted(FORMATOS), default="ndjson")
+    parser.add_argument("--desde", type=datetime.fromisoformat, help="data/hora inicial (inclusive)")
+    parser.add_argument("--ate", type=datetime.fromisoformat, help="data/hora final (exclusive)")
+    parser.add_argument("--tipo", dest="tipo_emprestimo", help="filtra por tipo_emprestimo")
+    parser.add_argument("--filtro", action="append", default=[], help="campo:operador:valor em dados_especificos (pode repetir)")
+    parser.add_argument("--saida", help="arquivo de saída (padrão: stdout)")
+    args = parser.parse_args()
+    filtros_json = parse_filtros(args.filtro)
+
+    destino = open(args.saida, "wb") if args.saida else sys.stdout.buffer
+    try:
+        for pedaco in exportar(
+            args.formato,
+            desde=args.desde,
+            ate=args.ate,
+            tipo_emprestimo=args.tipo_emprestimo,
+            filtros_json=filtros_json,
+        ):
+            destino.write(pedaco)
+    finally:
+        if args.saida:
+            destino.close()
@@ -0,0 +1,132 @@
+# filtros_json.py
+#
+# Filtros sobre as chaves de Simulacao.dados_especificos.
+#
+# Formato aceito pela API: "campo:operador:valor", ex.
+#   valor_imovel:gt:500000
+#   tipo_imovel:eq:casa
+#   imovel_quitado:eq:true
+#
+# No Postgres (coluna JSONB + índice GIN jsonb_path_ops) os filtros viram
+# UM predicado jsonpath com o operador @?. O GIN jsonb_path_ops só acelera
+# igualdade (==) dentro do jsonpath; faixas (gt, gte, lt, lte) nas chaves
+# numéricas de CAMPOS_NUMERICOS_INDEXADOS viram comparações com a mesma
+# expressão dos índices btree ix_simulacoes_dados_<campo> (models.py).
+# Faixa em outra chave continua no jsonpath (sem índice).
+# No SQLite (desenvolvimento) viram comparações com json_extract.
+
+import json
+import math
+import re
+from dataclasses import dataclass
+from typing import List, Sequence, Union
+
+from sqlalchemy import Numeric, case, cast, func, literal, literal_column
+from sqlalchemy.dialects.postgresql import JSONPATH
+
+OPERADORES = {"eq": "==", "ne": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+FAIXA = ("gt", "gte", "lt", "lte")
+
+# Chaves numéricas de dados_especificos com índice btree de expressão no
+# Postgres (models.py; em banco existente, migrar_jsonb.py)
+CAMPOS_NUMERICOS_INDEXADOS = ("valor_imovel", "valor_veiculo", "ano_veiculo")
+
+_CAMPO_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,63}$")
+
+Valor = Union[str, int, float, bool]
+
+
+class FiltroInvalido(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class FiltroJson:
+    campo: str
+    operador: str  # chave de OPERADORES
+    valor: Valor
+
+
+def _converter_valor(texto: str) -> Valor:
+    if texto in ("true", "false"):
+        return texto == "true"
+    for conversor in (int, float):
+        try:
+            return conversor(texto)
+        except ValueError:
+            pass
+    return texto
+
+
+def parse_filtro(texto: str) -> FiltroJson:
+    partes = texto.split(":", 2)
+    if len(partes) != 3:
+        raise FiltroInvalido(f"Filtro '{texto}' deve ter o formato campo:operador:valor.")
+    campo, operador, valor = partes
+    if not _CAMPO_RE.match(campo):
+        raise FiltroInvalido(f"Campo inválido no filtro: '{campo}'.")
+    if operador not in OPERADORES:
+        raise FiltroInvalido(f"Operador inválido no filtro: '{operador}'. Use um de: {', '.join(OPERADORES)}.")
+    valor_convertido = _converter_valor(valor)
+    if isinstance(valor_convertido, float) and not math.isfinite(valor_convertido):
+        # float() aceita nan/inf, que não são literais de jsonpath e não comparam direito no SQLite
+        raise FiltroInvalido(f"Valor numérico inválido no filtro: '{valor}'.")
+    if isinstance(valor_convertido, (str, bool)) and operador not in ("eq", "ne"):
+        raise FiltroInvalido(f"O operador '{operador}' só vale para números.")
+    return FiltroJson(campo, operador, valor_convertido)
+
+
+def parse_filtros(textos: Sequence[str]) -> List[FiltroJson]:
+    return [parse_filtro(t) for t in textos]
+
+
+def _literal_jsonpath(valor: Valor) -> str:
+    if isinstance(valor, bool):
+        return "true" if valor else "false"
+    if isinstance(valor, (int, float)):
+        return repr(valor)
+    return json.dumps(valor)  # string jsonpath usa as mesmas regras de escape do JSON
+
+
+def jsonpath_filtros(filtros: Sequence[FiltroJson]) -> str:
+    """Ex: '$ ? (@.valor_imovel > 500000 && @.tipo_imovel == "casa")'"""
+    condicoes = [f"@.{f.campo} {OPERADORES[f.operador]} {_literal_jsonpath(f.valor)}" for f in filtros]
+    return f"$ ? ({' && '.join(condicoes)})"
+
+
+def expressao_numerica(coluna, campo: str):
+    """
+    O valor numérico de coluna->campo, ou NULL se não for número (nunca dá
+    erro de cast). É a expressão dos índices btree: a consulta precisa usar
+    exatamente a mesma. campo e 'number' vão como literais (não parâmetros)
+    para o planner casar a expressão com o índice também em planos genéricos.
+    """
+    chave = literal_column(f"'{campo}'")  # só nomes de CAMPOS_NUMERICOS_INDEXADOS
+    return case(
+        (func.jsonb_typeof(coluna.op("->")(chave)) == literal_column("'number'"),
+         cast(coluna.op("->>")(chave), Numeric)),
+    )
+
+
+def compilar_filtros(coluna, filtros: Sequence[FiltroJson], dialeto: str) -> list:
+    """Converte os filtros em expressões SQLAlchemy para usar em .where(*...)."""
+    if not filtros:
+        return []
+    if dialeto == "postgresql":
+        expressoes, restantes = [], []
+        for f in filtros:
+            if f.operador in FAIXA and f.campo in CAMPOS_NUMERICOS_INDEXADOS:
+                valor = literal(f.valor, Numeric)  # numeric x numeric: o btree atende
+                expressoes.append(expressao_numerica(coluna, f.campo).op(OPERADORES[f.operador])(valor))
+            else:
+                restantes.append(f)
+        if restantes:
+            expressoes.append(coluna.op("@?")(literal(jsonpath_filtros(restantes), JSONPATH)))
+        return expressoes
+
+    expressoes = []
+    for f in filtros:
+        extraido = func.json_extract(coluna, f"$.{f.campo}")
+        valor = int(f.valor) if isinstance(f.valor, bool) else f.valor  # JSON true/false -> 1/0 no SQLite
+        expressoes.append(extraido.op(OPERADORES[f.operador].replace("==", "="))(valor))
+    return expressoes
@@ -0,0 +1,282 @@
+# mailer.py
+#
+# Worker de envio de e-mails de longa duração.
+# As rotas só enfileiram a mensagem; um único worker (por processo) mantém a
+# conexão SMTP aberta e envia as mensagens em lotes pela mesma sessão.
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from typing import List, Optional
+
+import aiosmtplib
+from dotenv import load_dotenv
+
+from metricas import percentil
+
+load_dotenv()
+
+
+class MailQueueFull(Exception):
+    """A fila de envio atingiu o limite configurado."""
+
+
+class MailWorker:
+    def __init__(
+        self,
+        hostname: Optional[str],
+        port: int,
+        username: Optional[str],
+        password: Optional[str],
+        sender: Optional[str],
+        use_tls: bool = True,
+        start_tls: bool = False,
+        validate_certs: bool = True,
+        max_queue: int = 1000,
+        batch_size: int = 20,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        idle_timeout: float = 30.0,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.validate_certs = validate_certs
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.idle_timeout = idle_timeout
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        # Contador de mensagens aceitas e ainda não enviadas (protegido por lock,
+        # pois as rotas síncronas enfileiram a partir das threads do threadpool)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+        self.connections_opened = 0
+        self._send_latencies_ms: deque = deque(maxlen=500)
+        self._queue_wait_ms: deque = deque(maxlen=500)
+
+    @classmethod
+    def from_env(cls) -> "MailWorker":
+        return cls(
+            hostname=os.getenv("MAIL_SERVER"),
+            port=int(os.getenv("MAIL_PORT", 465)),
+            username=os.getenv("MAIL_USERNAME"),
+            password=os.getenv("MAIL_PASSWORD"),
+            sender=os.getenv("MAIL_FROM"),
+            start_tls=os.getenv("MAIL_STARTTLS", "False").lower() == 'true',
+            use_tls=os.getenv("MAIL_SSL_TLS", "True").lower() == 'true',
+            validate_certs=os.getenv("MAIL_VALIDATE_CERTS", "True").lower() == 'true',
+            max_queue=int(os.getenv("MAIL_QUEUE_MAX", 1000)),
+            batch_size=int(os.getenv("MAIL_BATCH_SIZE", 20)),
+            max_retries=int(os.getenv("MAIL_MAX_RETRIES", 5)),
+            idle_timeout=float(os.getenv("MAIL_IDLE_TIMEOUT_SECONDS", 30)),
+        )
+
+    # --- API usada pelas rotas ---
+
+    def enqueue(
+        self,
+        subject: str,
+        recipients: List[str],
+        html: str,
+        text: Optional[str] = None,
+        reply_to: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Coloca uma mensagem na fila de envio. Pode ser chamada tanto de rotas
+        async quanto de rotas síncronas (threadpool).
+        Levanta MailQueueFull quando a fila está cheia (backpressure).
+        """
+        # Monta antes de reservar a vaga: cabeçalho inválido (ex.: quebra de
+        # linha no assunto) levanta ValueError sem ocupar a fila
+        message = self._build_message(subject, recipients, html, text, reply_to)
+
+        with self._pending_lock:
+            if self._pending >= self.max_queue:
+                raise MailQueueFull()
+            self._pending += 1
+
+        item = (time.monotonic(), message)
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if self._loop is not None and running_loop is not self._loop:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        else:
+            self._queue.put_nowait(item)
+
+    def _build_message(self, subject, recipients, html, text, reply_to) -> EmailMessage:
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = self.sender
+        message["To"] = ", ".join(recipients)
+        message["Date"] = formatdate(localtime=True)
+        message["Message-ID"] = make_msgid()
+        if reply_to:
+            message["Reply-To"] = ", ".join(reply_to)
+        # Texto puro como alternativa; o HTML é a versão preferida
+        message.set_content(text or "")
+        message.add_alternative(html, subtype="html")
+        return message
+
+    # --- Ciclo de vida ---
+
+    async def start(self):
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.create_task(self._run(), name="mail-worker")
+
+    async def stop(self, drain_timeout: float = 10.0):
+        """Tenta esvaziar a fila antes de encerrar e fecha a conexão SMTP."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"MAILER: encerrando com {self._queue.qsize()} mensagens na fila.")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self._disconnect()
+
+    # --- Conexão SMTP ---
+
+    async def _connect(self):
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            validate_certs=self.validate_certs,
+        )
+        await smtp.connect()
+        if self.username:
+            await smtp.login(self.username, self.password)
+        self._smtp = smtp
+        self.connections_opened += 1
+
+    async def _disconnect(self):
+        if self._smtp is not None:
+            try:
+                await self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    # --- Loop principal ---
+
+    async def _next_batch(self) -> list:
+        # Com conexão aberta, espera no máximo idle_timeout antes de fechá-la
+        if self._smtp is not None:
+            try:
+                first = await asyncio.wait_for(self._queue.get(), timeout=self.idle_timeout)
+            except asyncio.TimeoutError:
+                await self._disconnect()
+                first = await self._queue.get()
+        else:
+            first = await self._queue.get()
+
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            self.batches += 1
+            for item in batch:
+                try:
+                    await self._send(item)
+                except Exception as e:
+                    # Erro fora dos previstos no _send (codificação, bug no retry...):
+                    # conta como falha e segue, senão o worker morre e a fila só enche
+                    print(f"MAILER: erro inesperado ao enviar mensagem: {e!r}")
+                    self.failed += 1
+                    await self._disconnect()
+                finally:
+                    with self._pending_lock:
+                        self._pending -= 1
+                    self._queue.task_done()
+
+    async def _send(self, item):
+        enqueued_at, message = item
+        self._queue_wait_ms.append((time.monotonic() - enqueued_at) * 1000)
+
+        attempt = 0
+        while True:
+            try:
+                if self._smtp is None or not self._smtp.is_connected:
+                    await self._connect()
+                started = time.monotonic()
+                await self._smtp.send_message(message)
+                self._send_latencies_ms.append((time.monotonic() - started) * 1000)
+                self.sent += 1
+                break
+            except aiosmtplib.SMTPResponseException as e:
+                if 500 <= e.code < 600:
+                    # Erro permanente (ex: destinatário inválido): não adianta repetir
+                    print(f"MAILER: falha permanente ({e.code}) para {message['To']}: {e.message}")
+                    self.failed += 1
+                    break
+                print(f"MAILER: erro temporário ({e.code}): {e.message}")
+            except (aiosmtplib.SMTPException, OSError) as e:
+                print(f"MAILER: erro de conexão SMTP: {e}")
+
+            await self._disconnect()
+            attempt += 1
+            if attempt > self.max_retries:
+                print(f"MAILER: desistindo após {self.max_retries} tentativas para {message['To']}")
+                self.failed += 1
+                break
+            self.retries += 1
+            await asyncio.sleep(min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    # --- Métricas ---
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._pending,
+            "max_queue": self.max_queue,
+            "connected": self._smtp is not None and self._smtp.is_connected,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "batches": self.batches,
+            "connections_opened": self.connections_opened,
+            "send_latency_ms_p50": percentil(self._send_latencies_ms, 50),
+            "send_latency_ms_p95": percentil(self._send_latencies_ms, 95),
+            "queue_wait_ms_p95": percentil(self._queue_wait_ms, 95),
+        }
+
+
+mail_worker = MailWorker.from_env()
@@ -1,20 +1,44 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 # Importe seus modelos e o engine do DB
 from models import models
-from db import engine
+from db import engine, async_engine, estado_pools
+import security
+from passwords import password_pool
+from mailer import mail_worker
+from analysis.bureaus import fechar_clientes
+from analysis.cache_bureaus import cache_bureaus
+from analysis.data_sources import estado_fontes
+from analysis.jobs import fila_analises
+from analysis.politica import dry_run
 
 # Importe os roteadores
-from routes import auth, users, profile, simulations, contact
+from routes import auth, users, profile, simulations, contact, produtos, admin, cep, analysis
 
 # Cria as tabelas no banco de dados (se não existirem)
 models.Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Inicialização dos componentes de longa duração
+    await mail_worker.start()
+    await fila_analises.start()
+    yield
+    # Encerramento
+    await fila_analises.stop()
+    await mail_worker.stop()
+    password_pool.shutdown()
+    await fechar_clientes()
+    await async_engine.dispose()
+
 app = FastAPI(
     title="API de Empréstimos e Clientes",
     description="Uma API para gerenciar clientes, perfis, simulações e análise de crédito.",
-    version="1.1.0"
+    version="1.1.0",
+    lifespan=lifespan,
 )
 
 # --- CORREÇÃO APLICADA AQUI ---
@@ -38,6 +62,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"], # Paginação de /api/simulacoes/
 )
 
 # Inclui os roteadores na aplicação principal
@@ -45,9 +70,27 @@ app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(profile.router)
 app.include_router(simulations.router)
+app.include_router(produtos.router)
+app.include_router(admin.router)
+app.include_router(cep.router)
+app.include_router(analysis.router)
 app.include_router(contact.router, tags=["Contato"])
 
 @app.get("/health", tags=["Status"])
 def health():
     """Endpoint para verificar a saúde da API."""
     return {"status": "ok"}
+
+@app.get("/metrics", tags=["Status"], dependencies=[Depends(security.require_admin_api_key)])
+def metrics():
+    """Métricas internas da API (caches, filas, pool do banco, etc.). Exige o header X-Admin-Key."""
+    return {
+        "principal_cache": security.principal_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "mail": mail_worker.stats(),
+        "bureau_cache": cache_bureaus.stats(),
+        "bureaus": estado_fontes(),
+        "analise_jobs": fila_analises.stats(),
+        "politica_dry_run": dry_run.stats(),
+        "db_pool": estado_pools(),
+    }
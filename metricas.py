@@ -0,0 +1,12 @@
+# metricas.py
+#
+# Funções comuns às métricas expostas no /metrics (fila de e-mails, fila de
+# análises, pool de conexões).
+
+
+def percentil(valores, p) -> float:
+    """Percentil p (0-100) por posição nas amostras ordenadas; 0.0 sem amostras."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return round(ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))], 2)
@@ -0,0 +1,53 @@
+# migrar_jsonb.py
+#
+# Converte simulacoes.dados_especificos de JSON para JSONB no Postgres e cria
+# os índices usados pelos filtros de /api/simulacoes/?filtro=...: o GIN
+# (igualdade) e um btree de expressão por chave numérica (faixas, ver
+# filtros_json.py). O create_all do main.py só cria tabelas novas, não
+# altera as existentes.
+#
+#   python migrar_jsonb.py
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+from db import engine
+from filtros_json import CAMPOS_NUMERICOS_INDEXADOS
+from models.models import Simulacao
+
+if __name__ == "__main__":
+    if engine.dialect.name != "postgresql":
+        print("Nada a fazer: JSONB/GIN só existem no Postgres.")
+        raise SystemExit(0)
+
+    # CREATE INDEX CONCURRENTLY não pode rodar dentro de transação
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        tipo = conn.execute(text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'simulacoes' AND column_name = 'dados_especificos'"
+        )).scalar()
+
+        if tipo == "json":
+            print("Convertendo dados_especificos para JSONB...")
+            conn.execute(text(
+                "ALTER TABLE simulacoes ALTER COLUMN dados_especificos "
+                "TYPE jsonb USING dados_especificos::jsonb"
+            ))
+        else:
+            print(f"dados_especificos já é {tipo}.")
+
+        print("Criando índice GIN (pode demorar em tabelas grandes)...")
+        conn.execute(text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_simulacoes_dados_especificos_gin "
+            "ON simulacoes USING gin (dados_especificos jsonb_path_ops)"
+        ))
+
+        # Mesmo DDL do models.py (a expressão precisa ser idêntica à da consulta)
+        indices = {i.name: i for i in Simulacao.__table__.indexes}
+        for campo in CAMPOS_NUMERICOS_INDEXADOS:
+            nome = f"ix_simulacoes_dados_{campo}"
+            print(f"Criando índice {nome}...")
+            ddl = str(CreateIndex(indices[nome], if_not_exists=True).compile(dialect=engine.dialect))
+            conn.execute(text(ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)))
+
+    print("Migração concluída!")
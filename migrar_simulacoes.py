@@ -0,0 +1,45 @@
+# migrar_simulacoes.py
+#
+# Atualiza a tabela simulacoes de um banco já existente para o modelo atual
+# (o create_all do main.py só cria tabelas novas, não altera as existentes):
+#   - coluna sistema_amortizacao ("price" ou "sac");
+#   - índice ix_simulacoes_user_criado_id (user_id, criado_em, id), usado pela
+#     listagem paginada por cursor (sem ele, cada página varre as simulações).
+#
+# RODE ANTES DE SUBIR A VERSÃO NOVA DA API: sem a coluna, toda consulta a
+# simulacoes (criar, listar, exportar) falha com "no such column" /
+# "column does not exist". Pode rodar mais de uma vez. No Postgres o índice
+# é criado com CONCURRENTLY, sem travar escritas na tabela (se falhar no
+# meio, o índice fica INVALID: DROP INDEX nele e rode de novo).
+#
+#   python migrar_simulacoes.py
+
+from sqlalchemy import inspect, text
+
+from db import engine
+
+if __name__ == "__main__":
+    with engine.begin() as conn:
+        if not inspect(conn).has_table("simulacoes"):
+            print("Nada a fazer: a tabela simulacoes ainda não existe (o create_all cria completa).")
+            raise SystemExit(0)
+
+        colunas = {c["name"] for c in inspect(conn).get_columns("simulacoes")}
+        if "sistema_amortizacao" in colunas:
+            print("sistema_amortizacao já existe.")
+        else:
+            print("Adicionando simulacoes.sistema_amortizacao...")
+            conn.execute(text(
+                "ALTER TABLE simulacoes ADD COLUMN sistema_amortizacao VARCHAR(10) DEFAULT 'price'"
+            ))
+
+    # CREATE INDEX CONCURRENTLY não pode rodar dentro de transação
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        print("Criando ix_simulacoes_user_criado_id (pode demorar em tabelas grandes)...")
+        concorrente = "CONCURRENTLY " if engine.dialect.name == "postgresql" else ""
+        conn.execute(text(
+            f"CREATE INDEX {concorrente}IF NOT EXISTS ix_simulacoes_user_criado_id "
+            "ON simulacoes (user_id, criado_em, id)"
+        ))
+
+    print("Migração concluída!")
@@ -1,8 +1,12 @@
 from datetime import datetime
 from sqlalchemy import (Column, Integer, String, DateTime, Float, ForeignKey, 
-                        Boolean, Date, Numeric, UniqueConstraint, func, JSON) 
+                        Boolean, Date, Numeric, UniqueConstraint, Index, func, JSON, SmallInteger) 
 
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.expression import Grouping
+
+from filtros_json import CAMPOS_NUMERICOS_INDEXADOS, expressao_numerica
 from sqlalchemy.ext.declarative import declarative_base
 
 from db import Base
@@ -84,12 +88,14 @@ class Simulacao(Base):
 
     # 2. O CAMPO FLEXÍVEL (A MUDANÇA CRÍTICA)
     # Aqui é onde os 14 tipos de formulários serão salvos.
-    # Use JSONB no Postgres, ou JSON no SQLite/MySQL.
-    dados_especificos = Column(JSON, nullable=True)
+    # JSONB (indexável com GIN) no Postgres, JSON no SQLite/MySQL.
+    dados_especificos = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
 
     # 3. DADOS DE CÁLCULO (Calculados pelo backend)
     # É bom deixar como nullable=True, pois serão preenchidos
     # depois que a simulação for criada e calculada.
+    # Em banco já existente, criar com migrar_simulacoes.py antes do deploy
+    sistema_amortizacao = Column(String(10), nullable=True, default="price")  # "price" ou "sac"
     valor_parcela = Column(Numeric(12, 2), nullable=True)
     valor_total = Column(Numeric(12, 2), nullable=True)
     juros_total = Column(Numeric(12, 2), nullable=True)
@@ -98,3 +104,109 @@ class Simulacao(Base):
 
     # Relacionamento
     user = relationship("User", back_populates="simulacoes")
+
+    __table_args__ = (
+        # Listagem paginada por usuário: WHERE user_id = ? ORDER BY criado_em DESC, id DESC
+        Index("ix_simulacoes_user_criado_id", "user_id", "criado_em", "id"),
+        # Filtros por chave de dados_especificos (operadores @> e @? do JSONB). Só no Postgres.
+        Index(
+            "ix_simulacoes_dados_especificos_gin",
+            "dados_especificos",
+            postgresql_using="gin",
+            postgresql_ops={"dados_especificos": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+# Filtros de faixa (gt/gte/lt/lte) nas chaves numéricas de dados_especificos:
+# o GIN não atende faixa. Um btree por chave, na expressão que o
+# filtros_json.py usa na consulta. Só no Postgres.
+for _campo in CAMPOS_NUMERICOS_INDEXADOS:
+    Simulacao.__table__.append_constraint(Index(
+        f"ix_simulacoes_dados_{_campo}",
+        # O Postgres exige parênteses em volta de expressão que não é chamada de função
+        Grouping(expressao_numerica(Simulacao.__table__.c.dados_especificos, _campo)),
+    ).ddl_if(dialect="postgresql"))
+
+
+class PreAprovacao(Base):
+    # Resultado do job noturno de pré-aprovação (analysis/pre_aprovacao.py).
+    # Uma linha por usuário, sobrescrita a cada execução.
+    __tablename__ = "pre_aprovacoes"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Integer, nullable=False)
+    limite_aprovado = Column(Numeric(12, 2), nullable=False)  # 0 = sem pré-aprovação
+    # Hash dos campos do perfil usados no cálculo: se o perfil mudou, o
+    # resultado não vale mais e a análise online segue o fluxo completo
+    assinatura_perfil = Column(String(32), nullable=False)
+    calculado_em = Column(DateTime(timezone=True), nullable=False)
+
+
+class FeaturesPerfil(Base):
+    # Variáveis da análise de crédito pré-calculadas a partir do perfil
+    # (analysis/features.py). Atualizada pelo PUT /api/perfil/me quando muda
+    # algum campo de origem; a análise lê só esta linha.
+    __tablename__ = "features_perfil"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    versao = Column(SmallInteger, nullable=False)          # FEATURES_VERSAO do cálculo
+    data_referencia = Column(Date, nullable=False)          # "hoje" usado em idade e meses_emprego
+    assinatura = Column(String(32), nullable=False)         # mesma de pre_aprovacoes.assinatura_perfil
+
+    # Campos de origem (copiados do perfil)
+    renda_mensal = Column(Numeric(10, 2), nullable=True)
+    possui_imovel = Column(Boolean, nullable=False)
+    possui_veiculo = Column(Boolean, nullable=False)
+    data_admissao = Column(Date, nullable=True)
+    data_nascimento = Column(Date, nullable=True)
+
+    # Derivadas
+    faixa_renda = Column(SmallInteger, nullable=False)
+    meses_emprego = Column(SmallInteger, nullable=False)   # 0 = sem data de admissão
+    idade = Column(SmallInteger, nullable=False)           # 0 = sem data de nascimento
+
+
+class AnaliseCredito(Base):
+    # Histórico das análises de crédito online (analysis/pipeline.py): as
+    # entradas como foram usadas (pedido, dados do perfil, respostas dos
+    # bureaus) e o que foi decidido. É a base do replay de políticas
+    # (analysis/replay.py).
+    __tablename__ = "analises_credito"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    criado_em = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+    # Pedido
+    valor_solicitado = Column(Numeric(12, 2), nullable=False)
+    parcelas = Column(Integer, nullable=False)
+
+    # Entradas (JSON: sem migração quando o modelo dos bureaus ganhar campos)
+    perfil = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    serasa = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)      # None = não respondeu
+    bacen_scr = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    fontes_indisponiveis = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False, default=list)
+
+    # Resultado
+    score = Column(Integer, nullable=False)
+    decisao = Column(String(20), nullable=False)
+    versao_politica = Column(String(50), nullable=True)  # None = pré-aprovação gravada antes de usar a política
+    pre_aprovada = Column(Boolean, nullable=False, default=False)
+
+
+class AnaliseJob(Base):
+    # Estado das análises assíncronas (analysis/jobs.py). A fila e a execução
+    # ficam no processo que recebeu o POST; o estado vai para o banco para o
+    # GET e o SSE funcionarem em qualquer worker do uvicorn. Linhas com mais
+    # de ANALISE_JOB_TTL_SECONDS são apagadas pela própria fila.
+    __tablename__ = "analise_jobs"
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(String(20), nullable=False)
+    criado_em = Column(DateTime(timezone=True), nullable=False, index=True)
+    iniciado_em = Column(DateTime(timezone=True), nullable=True)
+    concluido_em = Column(DateTime(timezone=True), nullable=True)
+    resultado = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)  # CreditAnalysisResponse
+    erro = Column(String(255), nullable=True)
@@ -0,0 +1,133 @@
+# passwords.py
+#
+# Hash/verificação bcrypt fora do processo web.
+# Este módulo é importado pelos processos filhos do pool, por isso
+# não deve importar nada do app (db, models, FastAPI...).
+#
+# hash/verify são async: a rota espera o resultado no event loop, sem
+# prender uma thread do threadpool do anyio durante o bcrypt.
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Quantos processos calculam bcrypt em paralelo
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", 2))
+# Quantas operações podem estar em andamento/na fila ao mesmo tempo.
+# Acima disso a requisição é recusada na hora (503) em vez de esperar.
+PASSWORD_POOL_MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING", 32))
+# Tempo máximo esperando o resultado de uma operação
+PASSWORD_POOL_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_POOL_TIMEOUT_SECONDS", 10))
+
+
+class PasswordPoolSaturated(Exception):
+    """A fila de operações de senha está cheia."""
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordPool:
+    """Executor de processos com limite de profundidade de fila."""
+
+    def __init__(self, workers: int, max_pending: int, timeout: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Criado sob demanda: scripts que só importam o módulo não sobem processos
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    # "spawn": o worker web tem threads, fork aqui não é seguro
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def _finished(self, future: Future):
+        # Chamado quando a operação termina de fato (ou é cancelada antes de
+        # começar). Só aqui a vaga é liberada: depois de um timeout o processo
+        # ainda está calculando, e a vaga continua contando no limite.
+        with self._lock:
+            self.pending -= 1
+            if not future.cancelled() and future.exception() is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+        self._slots.release()
+
+    async def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordPoolSaturated()
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+                self.failed += 1
+            self._slots.release()
+            raise
+        future.add_done_callback(self._finished)
+        try:
+            # No timeout, wait_for cancela o future (só tem efeito se ainda não começou)
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise PasswordPoolSaturated()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+        }
+
+
+password_pool = PasswordPool(
+    workers=PASSWORD_POOL_WORKERS,
+    max_pending=PASSWORD_POOL_MAX_PENDING,
+    timeout=PASSWORD_POOL_TIMEOUT_SECONDS,
+)
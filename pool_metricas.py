@@ -0,0 +1,170 @@
+# pool_metricas.py
+#
+# Métricas do pool de conexões do banco (db.py), expostas no /metrics:
+#   - conexões em uso, ociosas e em overflow agora, e o pico em uso;
+#   - espera por uma conexão: histograma em faixas de ms e p50/p95/p99;
+#   - esgotamentos (TimeoutError depois de DB_POOL_TIMEOUT_SECONDS esperando);
+#   - conexões abertas com o pool já acima do pool_size (overflow) e
+#     invalidações (conexão descartada por erro ou por recycle).
+#
+# O tempo de espera não vem nos eventos do SQLAlchemy, então o pool é uma
+# subclasse de QueuePool que cronometra o _do_get (fila do pool + abrir
+# conexão nova quando precisa). O resto vem dos eventos de pool (connect,
+# checkout, invalidate, soft_invalidate, close), ligados por instrumentar().
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from metricas import percentil
+
+# Limites (ms) das faixas do histograma de espera; a última faixa é "+inf"
+LIMITES_ESPERA_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class MetricasPool:
+    def __init__(self, amostras: int = 2000):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.pico_em_uso = 0
+        self.conexoes_abertas = 0
+        self.conexoes_fechadas = 0
+        self.conexoes_overflow = 0
+        self.invalidacoes = 0
+        self.invalidacoes_soft = 0
+        self.esgotamentos = 0
+        self._histograma = [0] * (len(LIMITES_ESPERA_MS) + 1)
+        self._esperas_ms = deque(maxlen=amostras)
+
+    def espera(self, ms: float, esgotou: bool = False):
+        with self._lock:
+            self._histograma[bisect_left(LIMITES_ESPERA_MS, ms)] += 1
+            self._esperas_ms.append(ms)
+            if esgotou:
+                self.esgotamentos += 1
+
+    def checkout(self, em_uso: int):
+        with self._lock:
+            self.checkouts += 1
+            self.pico_em_uso = max(self.pico_em_uso, em_uso)
+
+    def conectou(self, overflow: bool):
+        with self._lock:
+            self.conexoes_abertas += 1
+            if overflow:
+                self.conexoes_overflow += 1
+
+    def fechou(self):
+        with self._lock:
+            self.conexoes_fechadas += 1
+
+    def invalidou(self, soft: bool = False):
+        with self._lock:
+            if soft:
+                self.invalidacoes_soft += 1
+            else:
+                self.invalidacoes += 1
+
+    def histograma(self) -> dict:
+        rotulos = [f"<={limite}" for limite in LIMITES_ESPERA_MS] + [f">{LIMITES_ESPERA_MS[-1]}"]
+        return dict(zip(rotulos, self._histograma))
+
+    def stats(self) -> dict:
+        with self._lock:
+            esperas = list(self._esperas_ms)
+            return {
+                "checkouts": self.checkouts,
+                "pico_em_uso": self.pico_em_uso,
+                "conexoes_abertas": self.conexoes_abertas,
+                "conexoes_fechadas": self.conexoes_fechadas,
+                "conexoes_overflow": self.conexoes_overflow,
+                "invalidacoes": self.invalidacoes,
+                "invalidacoes_soft": self.invalidacoes_soft,
+                "esgotamentos": self.esgotamentos,
+                "espera_ms_p50": percentil(esperas, 50),
+                "espera_ms_p95": percentil(esperas, 95),
+                "espera_ms_p99": percentil(esperas, 99),
+                "espera_ms_histograma": self.histograma(),
+            }
+
+
+class _PoolMedido:
+    """Mixin para QueuePool: cronometra a espera por conexão."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metricas = MetricasPool()
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super()._do_get()
+        except exc.TimeoutError:
+            self.metricas.espera((time.perf_counter() - inicio) * 1000, esgotou=True)
+            raise
+        self.metricas.espera((time.perf_counter() - inicio) * 1000)
+        return conexao
+
+    def recreate(self):
+        # engine.dispose() troca o pool; os contadores continuam no novo
+        novo = super().recreate()
+        novo.metricas = self.metricas
+        return novo
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout_s": self.timeout(),
+            "recycle_s": self._recycle,
+            "pre_ping": self._pre_ping,
+            "em_uso": self.checkedout(),
+            "ociosas": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            **self.metricas.stats(),
+        }
+
+
+class QueuePoolMedido(_PoolMedido, QueuePool):
+    pass
+
+
+class AsyncAdaptedQueuePoolMedido(_PoolMedido, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrumentar(engine):
+    """Liga os eventos de pool do engine (síncrono; no assíncrono use .sync_engine)."""
+    if not isinstance(engine.pool, _PoolMedido):
+        return
+
+    # Sempre engine.pool: depois de um dispose() o pool é outro
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        engine.pool.metricas.conectou(overflow=engine.pool.overflow() > 0)
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        engine.pool.metricas.checkout(engine.pool.checkedout())
+
+    @event.listens_for(engine, "close")
+    def _close(dbapi_connection, connection_record):
+        engine.pool.metricas.fechou()
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_connection, connection_record, exception):
+        engine.pool.metricas.invalidou()
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _soft_invalidate(dbapi_connection, connection_record, exception):
+        engine.pool.metricas.invalidou(soft=True)
+
+
+def estado_pool(pool) -> dict:
+    if isinstance(pool, _PoolMedido):
+        return pool.stats()
+    return {"pool": pool.status()}
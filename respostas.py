@@ -0,0 +1,53 @@
+# respostas.py
+#
+# Caminho rápido para respostas JSON de leitura (listas e perfil).
+#
+# Em vez de carregar objetos ORM completos, validar cada um no response_model
+# e passar pelo encoder padrão, a rota busca só as colunas do schema de saída
+# (tuplas do banco, sem identity map) e serializa direto com orjson. Os dados
+# vêm do nosso próprio banco, já no formato do schema, então revalidar não
+# acrescenta nada. O response_model continua na rota para a documentação.
+
+from decimal import Decimal
+from typing import Any, Mapping, Optional, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy import null
+
+
+def colunas_schema(modelo, schema: Type[BaseModel]) -> list:
+    """
+    Colunas do model SQLAlchemy com os mesmos nomes dos campos do schema, na
+    mesma ordem. Campos do schema sem coluna no banco saem como NULL.
+    """
+    return [
+        getattr(modelo, campo) if hasattr(modelo, campo) else null().label(campo)
+        for campo in schema.model_fields
+    ]
+
+
+def _orjson_default(valor):
+    # Colunas Numeric chegam como Decimal
+    if isinstance(valor, Decimal):
+        return float(valor)
+    raise TypeError
+
+
+def resposta_json(
+    conteudo: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """
+    Resposta JSON serializada com orjson (datas em ISO 8601, Decimal -> float).
+    Obs: ao devolver uma Response pronta, headers do parâmetro `response` da
+    rota são ignorados; passe-os aqui.
+    """
+    return Response(
+        content=orjson.dumps(conteudo, default=_orjson_default),
+        status_code=status_code,
+        headers=dict(headers or {}),
+        media_type="application/json",
+    )
@@ -0,0 +1,64 @@
+# routes/admin.py
+
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+import security
+from analysis.data_sources import estado_fontes
+from analysis.politica import estado_politica
+from exportacao import FORMATOS, exportar
+from filtros_json import FiltroInvalido, parse_filtros
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["Back Office"],
+    dependencies=[Depends(security.require_admin_api_key)]
+)
+
+@router.get("/exportar/simulacoes", summary="Exportar todas as simulações (NDJSON ou CSV)")
+def exportar_simulacoes(
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    desde: Optional[datetime] = None,
+    ate: Optional[datetime] = None,
+    tipo_emprestimo: Optional[str] = None,
+    filtro: List[str] = Query([], description="Filtro em dados_especificos, 'campo:operador:valor'. Pode repetir."),
+):
+    """
+    Exporta as simulações de todos os usuários, incluindo dados_especificos.
+    A resposta é gerada em streaming, lendo o banco em lotes: a memória do
+    servidor não cresce com o tamanho da tabela.
+    """
+    try:
+        filtros_json = parse_filtros(filtro)
+    except FiltroInvalido as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    nome_arquivo = f"simulacoes.{formato}"
+    return StreamingResponse(
+        exportar(formato, desde=desde, ate=ate, tipo_emprestimo=tipo_emprestimo, filtros_json=filtros_json),
+        media_type=FORMATOS[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nome_arquivo}"'},
+    )
+
+
+@router.get("/bureaus", summary="Estado dos bureaus (circuit breaker, latência, hedge)")
+def estado_bureaus():
+    """
+    Para cada fonte: estado do circuit breaker (fechado, aberto ou
+    meio_aberto), falhas seguidas, quantas vezes abriu, consultas rejeitadas
+    com o circuito aberto, latência p50/p95 e contadores do hedge.
+    """
+    return estado_fontes()
+
+
+@router.get("/politica", summary="Política de crédito vigente, candidata e resultado do dry-run")
+def politica_credito():
+    """
+    Versão e regras da política vigente e, se POLITICA_CANDIDATA_PATH estiver
+    configurada, da candidata, com a contagem de análises em que as duas
+    decidiram diferente (ex.: "Análise Manual -> Aprovado").
+    """
+    return estado_politica()
@@ -1,16 +1,19 @@
+import json
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Imports dos módulos do projeto
 import schemas.schemas as schemas
 import security
-from db import get_db
+from db import get_async_db
 from models.models import User
+from validators import _only_digits
 
 # Imports dos novos módulos de análise
-from analysis.data_sources import consultar_serasa, consultar_banco_central_scr
-from analysis.scoring import calculate_credit_score
-from analysis.decision import make_decision
+from analysis.jobs import JobAnalise, JobsFilaCheia, fila_analises
+from analysis.pipeline import PerfilNaoEncontrado, executar_analise
 
 router = APIRouter(
     prefix="/api",
@@ -18,41 +21,140 @@ router = APIRouter(
     dependencies=[Depends(security.get_current_active_user)]
 )
 
+# Intervalo dos comentários de keep-alive no stream SSE (proxies derrubam conexão parada)
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def _conferir_cpf(current_user: User, payload: schemas.CreditAnalysisRequest):
+    if current_user.cpf != _only_digits(payload.cpf):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Não é permitido solicitar análise para outro CPF."
+        )
+
+
+def _perfil_nao_encontrado() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Perfil de usuário não encontrado. Crie um perfil antes de solicitar a análise."
+    )
+
+
+def _job_out(job: JobAnalise) -> schemas.AnaliseJobOut:
+    return schemas.AnaliseJobOut(
+        job_id=job.id,
+        status=job.status,
+        criado_em=job.criado_em,
+        iniciado_em=job.iniciado_em,
+        concluido_em=job.concluido_em,
+        resultado=job.resultado,
+        erro=job.erro,
+    )
+
+
+async def _obter_job(job_id: str, current_user: User) -> JobAnalise:
+    job = await fila_analises.obter(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Análise não encontrada ou expirada.")
+    return job
+
+
 @router.post("/analise-credito", response_model=schemas.CreditAnalysisResponse, summary="Executar análise de crédito")
-def analisar_credito(
-    payload: schemas.CreditAnalysisRequest, 
-    db: Session = Depends(get_db), 
+async def analisar_credito(
+    payload: schemas.CreditAnalysisRequest,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(security.get_current_active_user)
 ):
     """
     Executa uma análise de crédito completa para o usuário autenticado.
-    """
-    print(f"\n--- INICIANDO ANÁLISE DE CRÉDITO PARA USUÁRIO: {current_user.email} ---")
 
-    if current_user.cpf != payload.cpf:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Não é permitido solicitar análise para outro CPF."
-        )
+    Os bureaus são consultados em paralelo, com timeout por fonte e prazo
+    total (analysis/data_sources.py). Se algum não responder, a decisão
+    vira "Análise Manual" e a fonte aparece em `fontes_indisponiveis`.
 
-    perfil = current_user.perfil
-    if not perfil:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail="Perfil de usuário não encontrado. Crie um perfil antes de solicitar a análise."
-        )
+    Se o job noturno já pré-aprovou o cliente (analysis/pre_aprovacao.py), o
+    perfil não mudou desde então, o pedido cabe no limite e Serasa e SCR
+    recentes estão no cache, responde na hora (se a política vigente aprova
+    com eles; senão segue o fluxo normal).
+
+    Para não segurar a requisição enquanto os bureaus respondem, use
+    POST /api/analise-credito/jobs.
+    """
+    print(f"\n--- INICIANDO ANÁLISE DE CRÉDITO PARA USUÁRIO: {current_user.email} ---")
+    _conferir_cpf(current_user, payload)
 
+    # current_user vem do cache de autenticação (sem sessão): o perfil é consultado no pipeline
     try:
-        serasa_data = consultar_serasa(perfil)
-        bacen_data = consultar_banco_central_scr(perfil)
-        score = calculate_credit_score(serasa_data, bacen_data, perfil, payload)
-        decision = make_decision(score, payload, perfil)
-        
-        print(f"DECISÃO FINAL: {decision.decision} - {decision.message}")
+        decision = await executar_analise(db, current_user.id, current_user.cpf, payload)
         print("--- FIM DA ANÁLI-SE ---\n")
-        
         return decision
+    except PerfilNaoEncontrado:
+        raise _perfil_nao_encontrado()
     except Exception as e:
         print(f"ERRO INESPERADO: {e}")
         raise HTTPException(status_code=500, detail="Ocorreu um erro interno ao processar a análise.")
 
+
+@router.post(
+    "/analise-credito/jobs",
+    response_model=schemas.AnaliseJobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Enfileirar análise de crédito (assíncrona)",
+)
+async def enfileirar_analise(
+    payload: schemas.CreditAnalysisRequest,
+    current_user: User = Depends(security.get_current_active_user)
+):
+    """
+    Coloca a análise na fila e responde na hora com o `job_id`. Acompanhe por
+    GET /api/analise-credito/jobs/{job_id} ou pelo stream SSE
+    /api/analise-credito/jobs/{job_id}/eventos. O resultado é o mesmo
+    CreditAnalysisResponse do modo síncrono.
+    """
+    _conferir_cpf(current_user, payload)
+    try:
+        job = await fila_analises.enfileirar(current_user.id, current_user.cpf, payload)
+    except JobsFilaCheia:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Muitas análises em andamento. Tente novamente em instantes.",
+            headers={"Retry-After": "5"},
+        )
+    return _job_out(job)
+
+
+@router.get("/analise-credito/jobs/{job_id}", response_model=schemas.AnaliseJobOut, summary="Status da análise assíncrona")
+async def status_analise(job_id: str, current_user: User = Depends(security.get_current_active_user)):
+    return _job_out(await _obter_job(job_id, current_user))
+
+
+@router.get("/analise-credito/jobs/{job_id}/eventos", summary="Acompanhar a análise assíncrona (SSE)")
+async def eventos_analise(job_id: str, current_user: User = Depends(security.get_current_active_user)):
+    """
+    Server-Sent Events: um evento `status` a cada mudança (na_fila,
+    processando, concluida, erro), com o mesmo corpo do GET. O stream termina
+    quando a análise acaba. Funciona em qualquer worker: se o job roda em
+    outro processo, o estado vem do banco.
+    """
+    job = await _obter_job(job_id, current_user)
+
+    async def eventos():
+        atual, ultimo = job, None
+        while True:
+            if atual.status != ultimo:
+                ultimo = atual.status
+                corpo = json.dumps(_job_out(atual).model_dump(mode="json"), ensure_ascii=False)
+                yield f"event: status\ndata: {corpo}\n\n"
+            if atual.terminado:
+                return
+            mudou = await fila_analises.esperar_mudanca(atual, SSE_KEEPALIVE_SECONDS)
+            if mudou is None:
+                yield ": keep-alive\n\n"
+            else:
+                atual = mudou
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
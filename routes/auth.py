@@ -4,21 +4,22 @@ from datetime import timedelta, datetime, timezone
 import random
 import string
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr # --- NOVO ---
 
 # Seus imports existentes
 import schemas.user as schemas
 import security
-from db import get_db
+from db import get_db, get_async_db
 from models.models import User
 
-# --- NOVO: Imports para envio de e-mail ---
-from fastapi_mail import FastMail, MessageSchema
-# Reutilizando a configuração de e-mail do seu arquivo de contato
-from routes.contact import conf 
+# --- Envio de e-mail: enfileira no worker SMTP do processo ---
+from mailer import mail_worker, MailQueueFull
+from email_templates import render_email
 
 
 
@@ -43,12 +44,12 @@ class VerificationPayload(BaseModel):
 class ResendVerificationPayload(BaseModel):
     email: EmailStr
 
+
 # --- NOVA ROTA: Endpoint para reenviar o código de verificação ---
 @router.post("/resend-verification", status_code=status.HTTP_200_OK, summary="Reenviar código de verificação")
 def resend_verification_code(
     payload: ResendVerificationPayload,
     db: Session = Depends(get_db),
-    background_tasks: BackgroundTasks = BackgroundTasks()
 ):
     user = security.get_user_by_email(db, email=payload.email)
 
@@ -71,44 +72,18 @@ def resend_verification_code(
     user.verification_expires_at = new_expires_at
     db.commit()
 
-    # Envia o novo código por e-mail em background
-    html_body = f"""
-        <div style="font-family: Arial, sans-serif; background-color: #f4f4f7; padding: 20px;">
-    <div style="max-width: 600px; margin: 20px auto; background-color: #ffffff; border-radius: 8px; border: 1px solid #e2e8f0; overflow: hidden;">
-        
-        <div style="padding: 20px; text-align: center; border-bottom: 1px solid #e2e8f0;">
-            <img src="https://res.cloudinary.com/daeczbv7v/image/upload/v1758805746/Metropolitan_logo_semfundo_as8xh0.png" 
-                 alt="Metropolitan Logo" 
-                 style="width: 140px; height: auto;"/>
-        </div>
-
-        <div style="padding: 30px; line-height: 1.6; color: #333;">
-            <h2 style="font-size: 20px; color: #1a202c; margin-top: 0;">Seu Código de Verificação</h2>
-            <p style="font-size: 16px;">Olá <strong>{novo_usuario.full_name}</strong>,</p>
-            <p style="font-size: 16px;">Para ativar sua conta na <strong>Metropolitan</strong>, utilize o código de verificação abaixo:</p>
-            
-            <div style="background-color: #f7fafc; padding: 20px; text-align: center; border-radius: 6px; margin: 25px 0;">
-                <p style="font-size: 32px; letter-spacing: 8px; margin: 0; color: #2d3748; font-weight: bold;">{verification_code}</p>
-            </div>
-            
-            <p style="font-size: 14px; color: #555;">Este código expira em <strong>15 minutos</strong>. Por segurança, não o compartilhe com ninguém.</p>
-        </div>
-
-        <div style="padding: 20px; font-size: 12px; color: #718096; text-align: center; background-color: #f7fafc; border-top: 1px solid #e2e8f0;">
-            <p style="margin: 0;">© 2025 Metropolitan Ltd. Todos os direitos reservados.</p>
-            <p style="margin: 5px 0 0 0;">Você recebeu esta mensagem como parte do seu processo de cadastro.</p>
-        </div>
-    </div>
-</div>
-    """
-    message = MessageSchema(
-        subject="Seu Novo Código de Verificação - Metropolitan",
-        recipients=[user.email],
-        body=html_body,
-        subtype="html"
-    )
-    fm = FastMail(conf)
-    background_tasks.add_task(fm.send_message, message)
+    # Envia o novo código por e-mail (o layout já vem compilado de templates/email)
+    html_body, text_body = render_email("verificacao", nome=user.full_name, codigo=new_code)
+    try:
+        mail_worker.enqueue(
+            subject="Seu Novo Código de Verificação - Metropolitan",
+            recipients=[user.email],
+            html=html_body,
+            text=text_body,
+        )
+    except MailQueueFull:
+        # Mesma resposta de quando o e-mail não existe (um 503 aqui revelaria a conta)
+        print(f"Fila de e-mail cheia: novo código de verificação não enviado para {user.email}")
 
     return {"message": "Se um usuário com este e-mail existir, um novo código será enviado."}
 
@@ -120,12 +95,15 @@ def create_verification_code(length: int = 6) -> str:
 
 
 # Rota de Login agora verifica se o e-mail foi confirmado ---
+# As rotas que calculam bcrypt (login, cadastro, nova senha) são async: o
+# hash roda no pool de processos (passwords.py) e a espera fica no event
+# loop, sem ocupar uma thread do threadpool durante o cálculo.
 @router.post("/token")
-def login_for_access_token(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
-    user = security.get_user_by_email(db, email=form_data.username)
+async def login_for_access_token(db: AsyncSession = Depends(get_async_db), form_data: OAuth2PasswordRequestForm = Depends()):
+    user = await security.get_user_by_email_async(db, email=form_data.username)
     
     # Sua verificação de senha continua a mesma
-    if not user or not security.verify_password(form_data.password, user.password_hash):
+    if not user or not await security.verify_password(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -150,18 +128,18 @@ def login_for_access_token(db: Session = Depends(get_db), form_data: OAuth2Passw
 
 # --- ALTERADO: Rota de Cadastro agora envia o e-mail de verificação ---
 @router.post("/clientes", status_code=status.HTTP_201_CREATED, summary="Criar um novo cliente")
-def criar_cliente(payload: schemas.UserCreate, db: Session = Depends(get_db), background_tasks: BackgroundTasks = BackgroundTasks()):
+async def criar_cliente(payload: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Suas validações de e-mail e CPF continuam as mesmas
-    if db.query(User).filter(User.email == payload.email).first():
+    if await db.scalar(select(User.id).where(User.email == payload.email)):
         raise HTTPException(status_code=400, detail="E-mail já cadastrado")
-    if db.query(User).filter(User.cpf == payload.cpf).first():
+    if await db.scalar(select(User.id).where(User.cpf == payload.cpf)):
         raise HTTPException(status_code=400, detail="CPF já cadastrado")
 
     # Geração do código e data de expiração
     verification_code = create_verification_code()
     expires_at = datetime.now(timezone.utc) + timedelta(minutes=15) 
 
-    hashed_pwd = security.hash_password(payload.password)
+    hashed_pwd = await security.hash_password(payload.password)
     
     # Cria o usuário com o status de verificação como Falso
     novo_usuario = User(
@@ -176,47 +154,21 @@ def criar_cliente(payload: schemas.UserCreate, db: Session = Depends(get_db), ba
         verification_expires_at=expires_at
     )
     db.add(novo_usuario)
-    db.commit()
-    db.refresh(novo_usuario)
+    await db.commit()
+    await db.refresh(novo_usuario)
 
     # --- LÓGICA DE ENVIO DE E-MAIL ---
-    html_body = f""" 
-        <div style="font-family: Arial, sans-serif; background-color: #f4f4f7; padding: 20px;">
-    <div style="max-width: 600px; margin: 20px auto; background-color: #ffffff; border-radius: 8px; border: 1px solid #e2e8f0; overflow: hidden;">
-        
-        <div style="padding: 20px; text-align: center; border-bottom: 1px solid #e2e8f0;">
-            <img src="https://res.cloudinary.com/daeczbv7v/image/upload/v1758805746/Metropolitan_logo_semfundo_as8xh0.png" 
-                 alt="Metropolitan Logo" 
-                 style="width: 140px; height: auto;"/>
-        </div>
-
-        <div style="padding: 30px; line-height: 1.6; color: #333;">
-            <h2 style="font-size: 20px; color: #1a202c; margin-top: 0;">Seu Código de Verificação</h2>
-            <p style="font-size: 16px;">Olá <strong>{novo_usuario.full_name}</strong>,</p>
-            <p style="font-size: 16px;">Para ativar sua conta na <strong>Metropolitan</strong>, utilize o código de verificação abaixo:</p>
-            
-            <div style="background-color: #f7fafc; padding: 20px; text-align: center; border-radius: 6px; margin: 25px 0;">
-                <p style="font-size: 32px; letter-spacing: 8px; margin: 0; color: #2d3748; font-weight: bold;">{verification_code}</p>
-            </div>
-            
-            <p style="font-size: 14px; color: #555;">Este código expira em <strong>15 minutos</strong>. Por segurança, não o compartilhe com ninguém.</p>
-        </div>
-
-        <div style="padding: 20px; font-size: 12px; color: #718096; text-align: center; background-color: #f7fafc; border-top: 1px solid #e2e8f0;">
-            <p style="margin: 0;">© 2025 Metropolitan Ltd. Todos os direitos reservados.</p>
-            <p style="margin: 5px 0 0 0;">Você recebeu esta mensagem como parte do seu processo de cadastro.</p>
-        </div>
-    </div>
-</div>
-        """
-    message = MessageSchema(
-        subject="Seu Código de Verificação - Metropolitan",
-        recipients=[novo_usuario.email],
-        body=html_body,
-        subtype="html"
-    )
-    fm = FastMail(conf)
-    background_tasks.add_task(fm.send_message, message)
+    html_body, text_body = render_email("verificacao", nome=novo_usuario.full_name, codigo=verification_code)
+    try:
+        mail_worker.enqueue(
+            subject="Seu Código de Verificação - Metropolitan",
+            recipients=[novo_usuario.email],
+            html=html_body,
+            text=text_body,
+        )
+    except MailQueueFull:
+        # O cadastro já foi salvo; o cliente pode pedir o reenvio do código
+        print(f"Fila de e-mail cheia: código de verificação não enviado para {novo_usuario.email}")
 
     return {"message": "Cliente criado com sucesso. Um código foi enviado para o seu e-mail para verificação."}
 
@@ -254,7 +206,6 @@ def verify_user_email(payload: VerificationPayload, db: Session = Depends(get_db
 def request_password_reset(
     payload: ForgotPasswordPayload,
     db: Session = Depends(get_db),
-    background_tasks: BackgroundTasks = BackgroundTasks()
 ):
     user = security.get_user_by_email(db, email=payload.email)
    
@@ -267,51 +218,23 @@ def request_password_reset(
         )
         
         reset_link = f"http://localhost:8080/redefinir-senha?token={reset_token}"
-        html_body = f"""
-        <div style="font-family: Arial, sans-serif; background-color: #f4f4f7; padding: 20px;">
-    <div style="max-width: 600px; margin: 20px auto; background-color: #ffffff; border-radius: 8px; border: 1px solid #e2e8f0; overflow: hidden;">
-        
-        <div style="padding: 20px; text-align: center; border-bottom: 1px solid #e2e8f0;">
-            <img src="https://res.cloudinary.com/daeczbv7v/image/upload/v1758805746/Metropolitan_logo_semfundo_as8xh0.png" 
-                 alt="Metropolitan Logo" 
-                 style="width: 140px; height: auto;"/>
-        </div>
-
-        <div style="padding: 30px; line-height: 1.6; color: #333;">
-            <h2 style="font-size: 20px; color: #1a202c; margin-top: 0;">Redefinição de Senha</h2>
-            <p style="font-size: 16px;">Olá <strong>{user.full_name}</strong>,</p>
-            <p style="font-size: 16px;">Recebemos uma solicitação para redefinir sua senha. Clique no botão abaixo para criar uma nova:</p>
-            <div style="text-align: center; margin: 25px 0;">
-                <a href="{reset_link}" style="background-color: #4a3aff; color: #ffffff; padding: 12px 25px; text-decoration: none; border-radius: 5px; font-size: 16px; font-weight: bold; display: inline-block;">
-                    Redefinir Minha Senha
-                </a>
-            </div>
-            
-            <p style="font-size: 14px; color: #555;">Se você não solicitou isso, pode ignorar este e-mail com segurança.</p>
-            <p style="font-size: 14px; color: #555;">Este link é válido por <strong>15 minutos</strong>.</p>
-        </div>
-
-        <div style="padding: 20px; font-size: 12px; color: #718096; text-align: center; background-color: #f7fafc; border-top: 1px solid #e2e8f0;">
-            <p style="margin: 0;">© 2025 Metropolitan Ltd. Todos os direitos reservados.</p>
-            <p style="margin: 5px 0 0 0;">Você recebeu esta mensagem porque uma redefinição de senha foi solicitada.</p>
-        </div>
-    </div>
-</div>
-"""
-        message = MessageSchema(
-            subject="Redefinição de Senha - Metropolitan",
-            recipients=[user.email],
-            body=html_body,
-            subtype="html"
-        )
-        fm = FastMail(conf)
-        background_tasks.add_task(fm.send_message, message)
+        html_body, text_body = render_email("redefinicao_senha", nome=user.full_name, link=reset_link)
+        try:
+            mail_worker.enqueue(
+                subject="Redefinição de Senha - Metropolitan",
+                recipients=[user.email],
+                html=html_body,
+                text=text_body,
+            )
+        except MailQueueFull:
+            # Mesma resposta de quando o e-mail não existe (um 503 aqui revelaria a conta)
+            print(f"Fila de e-mail cheia: link de redefinição de senha não enviado para {user.email}")
 
     return {"message": "Se uma conta com este e-mail existir, um link para redefinição de senha foi enviado."}
 
 
 @router.post("/reset-password", status_code=status.HTTP_200_OK, summary="Redefinir a senha")
-def reset_password(payload: ResetPasswordPayload, db: Session = Depends(get_db)):
+async def reset_password(payload: ResetPasswordPayload, db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token inválido ou expirado",
@@ -319,14 +242,14 @@ def reset_password(payload: ResetPasswordPayload, db: Session = Depends(get_db))
     )
     
     email = security.verify_token(payload.token, credentials_exception)
-    user = security.get_user_by_email(db, email=email)
+    user = await security.get_user_by_email_async(db, email=email)
 
     if not user:
         raise credentials_exception # Não deveria acontecer se o token for válido, mas é uma segurança extra
 
     # Atualiza a senha do usuário
-    new_hashed_password = security.hash_password(payload.new_password)
+    new_hashed_password = await security.hash_password(payload.new_password)
     user.password_hash = new_hashed_password
-    db.commit()
+    await db.commit()
 
     return {"message": "Sua senha foi redefinida com sucesso!"}
\ No newline at end of file
@@ -0,0 +1,26 @@
+# routes/cep.py
+
+from fastapi import APIRouter, HTTPException, status
+
+import schemas.cep as schemas
+from cep import buscar_cep, normalizar_cep, obter_base_cep
+
+router = APIRouter(
+    prefix="/api/cep",
+    tags=["CEP"]
+)
+
+@router.get("/{cep}", response_model=schemas.EnderecoCepOut, summary="Buscar endereço pelo CEP")
+def consultar_cep(cep: str):
+    """
+    Busca o endereço na base local de CEPs (cep.py), sem chamadas externas.
+    Aceita o CEP com ou sem hífen. Usado para preencher o endereço no perfil.
+    """
+    if normalizar_cep(cep) is None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="CEP deve ter 8 dígitos.")
+    if obter_base_cep() is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Base de CEPs indisponível.")
+    endereco = buscar_cep(cep)
+    if not endereco:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="CEP não encontrado.")
+    return endereco
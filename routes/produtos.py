@@ -0,0 +1,38 @@
+# routes/produtos.py
+
+from fastapi import APIRouter
+
+import schemas.produto as schemas
+from catalogo import obter_catalogo
+
+router = APIRouter(
+    prefix="/api/produtos",
+    tags=["Produtos"]
+)
+
+@router.get("/", response_model=schemas.CatalogoOut, summary="Listar produtos de empréstimo")
+def listar_produtos():
+    """
+    Retorna o catálogo em uso: taxas, limites de valor/prazo e os campos
+    esperados em dados_especificos. O front usa para montar os sliders e formulários.
+    """
+    catalogo = obter_catalogo()
+    return {
+        "versao": catalogo.versao,
+        "padrao": catalogo.padrao,
+        "produtos": [
+            {
+                "codigo": p.codigo,
+                "nome": p.nome,
+                "taxa_juros_mensal": p.taxa_juros_mensal,
+                "prazo_min": p.prazo_min,
+                "prazo_max": p.prazo_max,
+                "valor_min": p.valor_min,
+                "valor_max": p.valor_max,
+                "campos_especificos": {
+                    k: {"tipo": c.tipo, "obrigatorio": c.obrigatorio} for k, c in p.campos_especificos.items()
+                },
+            }
+            for p in catalogo.produtos.values()
+        ],
+    }
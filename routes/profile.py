@@ -1,13 +1,17 @@
 # routes/profile.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Imports dos módulos do projeto
 import schemas.perfil as schemas  # <--- Use o schema de perfil CORRIGIDO
 import security
-from db import get_db
+from db import get_async_db, upsert_stmt
 from models.models import PerfilUsuario, User # Importe os modelos
+from respostas import colunas_schema, resposta_json
+from cep import preencher_endereco
+from analysis.features import CAMPOS_ORIGEM, calcular_features, precisa_recalcular, upsert_features_stmt
 
 router = APIRouter(
     prefix="/api/perfil",
@@ -16,47 +20,61 @@ router = APIRouter(
 )
 
 @router.get("/me", response_model=schemas.PerfilUsuarioOut, summary="Obter perfil do usuário logado")
-def obter_perfil(db: Session = Depends(get_db), current_user: User = Depends(security.get_current_active_user)):
+async def obter_perfil(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(security.get_current_active_user)):
     """
     Obtém o perfil de dados detalhados do usuário logado.
     Útil para o frontend preencher a Etapa 3 se o usuário já tiver dados.
     """
-    perfil = db.query(PerfilUsuario).filter(PerfilUsuario.user_id == current_user.id).first()
+    # Só as colunas do PerfilUsuarioOut, serializadas com orjson (respostas.py)
+    result = await db.execute(
+        select(*colunas_schema(PerfilUsuario, schemas.PerfilUsuarioOut)).where(PerfilUsuario.user_id == current_user.id)
+    )
+    perfil = result.mappings().first()
     if not perfil:
         raise HTTPException(status_code=404, detail="Perfil não encontrado para este usuário.")
-    return perfil
+    return resposta_json(dict(perfil))
+
+
+def upsert_perfil_stmt(dialeto: str, user_id: int, dados: dict):
+    """
+    INSERT ... ON CONFLICT (user_id) DO UPDATE ... RETURNING: cria ou atualiza
+    o perfil e devolve a linha em um único comando (Postgres e SQLite >= 3.35).
+    Só os campos em `dados` são gravados; os demais ficam como estão.
+    """
+    return upsert_stmt(
+        dialeto, PerfilUsuario, ["user_id"], dados, values={"user_id": user_id, **dados}
+    ).returning(*colunas_schema(PerfilUsuario, schemas.PerfilUsuarioOut))
 
 
 @router.put("/me", response_model=schemas.PerfilUsuarioOut, summary="Atualizar ou Criar perfil do usuário logado (Upsert)")
-def atualizar_ou_criar_perfil(
+async def atualizar_ou_criar_perfil(
     payload: schemas.PerfilUsuarioCreate, # <-- Usa o schema de perfil CORRIGIDO
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(security.get_current_active_user)
 ):
     """
     Atualiza o perfil do usuário logado. 
     Se o perfil não existir, ele é criado (Upsert).
     Esta é a rota que deve ser chamada na ETAPA 3 do fluxo de simulação.
+
+    Uma única ida ao banco (upsert_perfil_stmt), gravando só os campos enviados.
+    Se vier o CEP, os campos de endereço em branco são preenchidos pela base
+    local de CEPs (cep.py).
+
+    Se algum campo usado na análise de crédito mudar (renda, bens, datas), as
+    features pré-calculadas (analysis/features.py) são atualizadas no mesmo
+    commit.
     """
-    # 1. Tenta encontrar o perfil existente
-    perfil = db.query(PerfilUsuario).filter(PerfilUsuario.user_id == current_user.id).first()
-    
-    # Use .model_dump() para Pydantic v2 (ou .dict() para v1)
-    payload_data = payload.model_dump(exclude_unset=True)
-
-    if perfil:
-        # 2. Se ENCONTROU -> ATUALIZA
-        print("Perfil encontrado. Atualizando...")
-        for key, value in payload_data.items():
-            setattr(perfil, key, value)
-    else:
-        # 3. Se NÃO ENCONTROU -> CRIA
-        print("Perfil não encontrado. Criando...")
-        payload_data['user_id'] = current_user.id # Associa ao usuário logado
-        perfil = PerfilUsuario(**payload_data)
-        db.add(perfil)
-    
-    # 4. Salva as mudanças no banco
-    db.commit()
-    db.refresh(perfil)
-    return perfil
\ No newline at end of file
+    try:
+        dados = preencher_endereco(payload.model_dump(exclude_unset=True))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    dialeto = db.bind.dialect.name
+    stmt = upsert_perfil_stmt(dialeto, current_user.id, dados)
+    result = await db.execute(stmt)
+    perfil = result.mappings().one()
+    if precisa_recalcular(dados):
+        features = calcular_features(**{campo: perfil[campo] for campo in CAMPOS_ORIGEM})
+        await db.execute(upsert_features_stmt(dialeto), [{"user_id": current_user.id, **features}])
+    await db.commit()
+    return resposta_json(dict(perfil))
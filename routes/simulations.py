@@ -1,14 +1,23 @@
 # routes/simulations.py
 
-from typing import List
-from fastapi import APIRouter, Depends, status
+import base64
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import String, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 # Imports dos módulos do projeto
 import schemas.simulacao as schemas 
 import security
-from db import get_db
+from db import get_db, get_async_db
 from models.models import Simulacao, User 
+from amortizacao import calcular_amortizacao, calcular_lote
+from catalogo import Produto, obter_catalogo, obter_produto
+from filtros_json import FiltroInvalido, compilar_filtros, parse_filtros
+from dados_especificos import DadosInvalidos, validar_dados_especificos
+from respostas import colunas_schema, resposta_json
 
 router = APIRouter(
     prefix="/api/simulacoes",
@@ -18,30 +27,32 @@ router = APIRouter(
 
 # --- INÍCIO DA MUDANÇA ---
 
-def calcular_valores_simulacao(valor_desejado: float, prazo_meses: int, tipo_emprestimo: str):
+def validar_produto(produto: Produto, valor_desejado: float, prazo_meses: int):
+    """Confere valor e prazo contra os limites do produto no catálogo."""
+    erro = produto.validar_limites(valor_desejado, prazo_meses)
+    if erro:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=erro)
+
+
+def calcular_valores_simulacao(
+    valor_desejado: float,
+    prazo_meses: int,
+    tipo_emprestimo: str,
+    sistema_amortizacao: str = "price",
+    incluir_cronograma: bool = False,
+):
     """
-    Função de exemplo para calcular os totais.
-    SUBSTITUA PELA SUA REGRA DE NEGÓCIO REAL.
+    Calcula parcela, total e juros da simulação pelo sistema de amortização
+    escolhido (Price ou SAC), com a taxa do produto no catálogo.
+    Veja amortizacao.py e catalogo.py.
     """
-    
-    
-    taxa_juros_mensal = 0.02 
-    
-    if tipo_emprestimo == 'imovel-garantia':
-        taxa_juros_mensal = 0.01
-    elif tipo_emprestimo == 'veiculo-garantia':
-        taxa_juros_mensal = 0.015
-
-    # Cálculo de juros simples (apenas para exemplo)
-    juros_total = (valor_desejado * taxa_juros_mensal) * prazo_meses
-    valor_total = valor_desejado + juros_total
-    valor_parcela = valor_total / prazo_meses
-    
-    return {
-        "valor_parcela": round(valor_parcela, 2),
-        "valor_total": round(valor_total, 2),
-        "juros_total": round(juros_total, 2)
-    }
+    return calcular_amortizacao(
+        valor=valor_desejado,
+        taxa_juros_mensal=obter_produto(tipo_emprestimo).taxa_juros_mensal,
+        prazo_meses=prazo_meses,
+        sistema=sistema_amortizacao,
+        incluir_cronograma=incluir_cronograma,
+    )
 
 # --- FIM DA MUDANÇA ---
 
@@ -56,8 +67,18 @@ def criar_simulacao(
     Cria um novo registro de simulação.
     """
     
-    # 1. Converte o payload Pydantic para um dict
+    # 1. Valida o pedido contra o catálogo de produtos
+    produto = obter_produto(payload.tipo_emprestimo)
+    validar_produto(produto, payload.valor_desejado, payload.prazo_meses)
+    # Tipos, campos obrigatórios e tamanho de dados_especificos (dados_especificos.py)
+    try:
+        dados_especificos = validar_dados_especificos(payload.tipo_emprestimo, payload.dados_especificos)
+    except DadosInvalidos as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    # Converte o payload Pydantic para um dict
     simulacao_data = payload.model_dump() 
+    simulacao_data['dados_especificos'] = dados_especificos
     
     # --- INÍCIO DA MUDANÇA ---
     
@@ -65,7 +86,8 @@ def criar_simulacao(
     calculos = calcular_valores_simulacao(
         valor_desejado=payload.valor_desejado,
         prazo_meses=payload.prazo_meses,
-        tipo_emprestimo=payload.tipo_emprestimo
+        tipo_emprestimo=payload.tipo_emprestimo,
+        sistema_amortizacao=payload.sistema_amortizacao,
     )
     
     # 3. Adiciona os valores calculados ao dicionário
@@ -91,10 +113,152 @@ def criar_simulacao(
     return nova_simulacao
 
 
+@router.post("/cronograma", response_model=schemas.CronogramaOut, summary="Calcular o cronograma completo de parcelas (sem salvar)")
+def calcular_cronograma(payload: schemas.CronogramaRequest):
+    """
+    Retorna a tabela mês a mês (parcela, juros, amortização e saldo devedor)
+    para os parâmetros informados. Nada é salvo no banco.
+    """
+    validar_produto(obter_produto(payload.tipo_emprestimo), payload.valor_desejado, payload.prazo_meses)
+    return calcular_valores_simulacao(
+        valor_desejado=payload.valor_desejado,
+        prazo_meses=payload.prazo_meses,
+        tipo_emprestimo=payload.tipo_emprestimo,
+        sistema_amortizacao=payload.sistema_amortizacao,
+        incluir_cronograma=True,
+    )
+
+
+@router.post("/lote", response_model=schemas.CotacaoLoteOut, summary="Cotar vários valores × prazos de uma vez (sem salvar)")
+def cotar_lote(payload: schemas.CotacaoLoteRequest):
+    """
+    Calcula todas as cotações pedidas em uma única operação vetorizada.
+    Pensado para os sliders de valor/prazo do front: nada é salvo; quando o
+    cliente escolher uma opção, ela é gravada via POST /api/simulacoes/.
+    """
+    g = payload.grade
+    total = len(payload.itens) + (len(g.valores) * len(g.prazos) if g else 0)
+    if total == 0:
+        raise HTTPException(status_code=422, detail="Informe 'itens' e/ou 'grade'.")
+    if total > schemas.MAX_COTACOES_POR_LOTE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"No máximo {schemas.MAX_COTACOES_POR_LOTE} cotações por chamada."
+        )
+
+    itens = [(i.valor_desejado, i.prazo_meses, i.tipo_emprestimo) for i in payload.itens]
+    if g:
+        itens += [(v, p, g.tipo_emprestimo) for v in g.valores for p in g.prazos]
+    # Um único catálogo para o lote inteiro (mesma versão para todas as cotações)
+    catalogo = obter_catalogo()
+    for valor, prazo, tipo in itens:
+        validar_produto(catalogo.produto(tipo), valor, prazo)
+
+    valores, prazos, tipos = zip(*itens)
+    taxas = [catalogo.produto(t).taxa_juros_mensal for t in tipos]
+    resultado = calcular_lote(valores, taxas, prazos, payload.sistema_amortizacao)
+
+    colunas = {k: v.tolist() for k, v in resultado.items()}
+    cotacoes = [
+        {
+            "valor_desejado": valores[i],
+            "prazo_meses": prazos[i],
+            "tipo_emprestimo": tipos[i],
+            **{k: colunas[k][i] for k in colunas},
+        }
+        for i in range(len(itens))
+    ]
+    return {"sistema_amortizacao": payload.sistema_amortizacao, "cotacoes": cotacoes}
+
+
+def _codificar_cursor(criado_em: datetime, simulacao_id: int) -> str:
+    bruto = f"{criado_em.isoformat()}|{simulacao_id}".encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def _decodificar_cursor(cursor: str):
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        criado_em, simulacao_id = bruto.rsplit("|", 1)
+        return datetime.fromisoformat(criado_em), int(simulacao_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido.")
+
+
+def _valor_criado_em(db: AsyncSession, criado_em: datetime):
+    # No SQLite o server_default grava 'YYYY-MM-DD HH:MM:SS' (texto, em UTC,
+    # sem microssegundos); o parâmetro precisa estar no mesmo formato para a
+    # comparação (texto) dar o resultado certo.
+    if db.bind.dialect.name == "sqlite":
+        if criado_em.tzinfo:
+            criado_em = criado_em.astimezone(timezone.utc)
+        return literal(criado_em.strftime("%Y-%m-%d %H:%M:%S"), String)
+    return literal(criado_em, Simulacao.criado_em.type)
+
+
+# Colunas devolvidas pela listagem (as mesmas do SimulacaoOut)
+CAMPOS_LISTAGEM = tuple(schemas.SimulacaoOut.model_fields)
+
+
 @router.get("/", response_model=List[schemas.SimulacaoOut], summary="Listar simulações do usuário logado")
-def listar_simulacoes(db: Session = Depends(get_db), current_user: User = Depends(security.get_current_active_user)):
+async def listar_simulacoes(
+    limite: int = Query(50, ge=1, le=200, description="Quantidade máxima de itens por página."),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior."),
+    tipo_emprestimo: Optional[str] = None,
+    desde: Optional[datetime] = Query(None, description="Criadas a partir desta data/hora (inclusive)."),
+    ate: Optional[datetime] = Query(None, description="Criadas antes desta data/hora."),
+    incluir_total: bool = Query(False, description="Calcula X-Total-Count (uma consulta extra)."),
+    filtro: List[str] = Query([], description="Filtro em dados_especificos, 'campo:operador:valor' (ex: valor_imovel:gt:500000). Pode repetir."),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(security.get_current_active_user),
+):
     """
-    Retorna uma lista de todas as simulações feitas pelo usuário logado.
+    Lista as simulações do usuário logado, das mais recentes para as mais antigas.
+
+    Paginação por cursor (keyset) sobre (criado_em, id), apoiada no índice
+    ix_simulacoes_user_criado_id: cada página custa o mesmo, não importa a
+    profundidade. O cursor da próxima página vem no header X-Next-Cursor
+    (ausente na última página). Com incluir_total=true, o total de itens
+    que atendem aos filtros vem em X-Total-Count.
+
+    Os filtros em dados_especificos usam os operadores eq, ne, gt, gte, lt e lte;
+    no Postgres, igualdade usa o índice GIN da coluna JSONB e faixas nas chaves
+    numéricas usam os btree de expressão (filtros_json.py).
+
+    Busca só as colunas do SimulacaoOut e serializa com orjson (respostas.py).
     """
-    simulacoes = db.query(Simulacao).filter(Simulacao.user_id == current_user.id).all()
-    return simulacoes
\ No newline at end of file
+    filtros = [Simulacao.user_id == current_user.id]
+    if tipo_emprestimo:
+        filtros.append(Simulacao.tipo_emprestimo == tipo_emprestimo)
+    if desde:
+        filtros.append(Simulacao.criado_em >= _valor_criado_em(db, desde))
+    if ate:
+        filtros.append(Simulacao.criado_em < _valor_criado_em(db, ate))
+    try:
+        filtros += compilar_filtros(Simulacao.dados_especificos, parse_filtros(filtro), db.bind.dialect.name)
+    except FiltroInvalido as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    query = select(*colunas_schema(Simulacao, schemas.SimulacaoOut)).where(*filtros)
+    if cursor:
+        cursor_criado_em, cursor_id = _decodificar_cursor(cursor)
+        query = query.where(
+            tuple_(Simulacao.criado_em, Simulacao.id) < tuple_(_valor_criado_em(db, cursor_criado_em), literal(cursor_id))
+        )
+    query = query.order_by(Simulacao.criado_em.desc(), Simulacao.id.desc()).limit(limite + 1)
+
+    result = await db.execute(query)
+    simulacoes = [dict(zip(CAMPOS_LISTAGEM, linha)) for linha in result.all()]
+    headers = {}
+
+    # Buscamos um item a mais só para saber se existe próxima página
+    if len(simulacoes) > limite:
+        simulacoes = simulacoes[:limite]
+        ultima = simulacoes[-1]
+        headers["X-Next-Cursor"] = _codificar_cursor(ultima["criado_em"], ultima["id"])
+
+    if incluir_total:
+        total = await db.scalar(select(func.count()).select_from(Simulacao).where(*filtros))
+        headers["X-Total-Count"] = str(total)
+
+    return resposta_json(simulacoes, headers=headers)
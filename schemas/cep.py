@@ -0,0 +1,10 @@
+# schemas/cep.py
+
+from pydantic import BaseModel
+
+class EnderecoCepOut(BaseModel):
+    cep: str
+    logradouro: str
+    bairro: str
+    cidade: str
+    estado: str
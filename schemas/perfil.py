@@ -1,6 +1,6 @@
 # schemas/perfil.py
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import date
 
@@ -34,5 +34,4 @@ class PerfilUsuarioCreate(PerfilUsuarioBase):
 
 class PerfilUsuarioOut(PerfilUsuarioBase):
     user_id: int
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -0,0 +1,23 @@
+# schemas/produto.py
+
+from pydantic import BaseModel
+from typing import Dict, List
+
+class CampoEspecificoOut(BaseModel):
+    tipo: str
+    obrigatorio: bool
+
+class ProdutoOut(BaseModel):
+    codigo: str
+    nome: str
+    taxa_juros_mensal: float
+    prazo_min: int
+    prazo_max: int
+    valor_min: float
+    valor_max: float
+    campos_especificos: Dict[str, CampoEspecificoOut]
+
+class CatalogoOut(BaseModel):
+    versao: str
+    padrao: str
+    produtos: List[ProdutoOut]
@@ -4,7 +4,7 @@ from validators import validar_cpf_formatado, senha_forte
 from datetime import datetime, date
 
 from datetime import datetime, date
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional, List
 from validators import validar_cpf, _only_digits
 # --- Schemas de Usuário ---
@@ -30,8 +30,7 @@ class UserCreate(UserBase):
 class UserOut(UserBase):
     id: int
     created_at: datetime
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # --- Schemas dze Perfil ---
 class PerfilUsuarioBase(BaseModel):
@@ -67,8 +66,7 @@ class PerfilUsuarioCreate(PerfilUsuarioBase):
 
 class PerfilUsuarioOut(PerfilUsuarioBase):
     user_id: int
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # --- SCHEMAS DE SIMULAÇÃO (ATUALIZADOS) ---
 class SimulacaoBase(BaseModel):
@@ -92,8 +90,7 @@ class SimulacaoOut(SimulacaoBase):
     id: int
     user_id: int
     criado_em: datetime
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # --- Schemas para Análise de Crédito ---
 class CreditAnalysisRequest(BaseModel):
@@ -113,8 +110,8 @@ class CreditAnalysisResponse(BaseModel):
 
 class CreditAnalysisRequest(BaseModel):
     cpf: str = Field(..., description="CPF do cliente para busca no banco de dados.", example="111.222.333-44")
-    requested_amount: float = Field(..., description="Valor do empréstimo solicitado.", example=10000.0)
-    installments: int = Field(..., description="Número de parcelas.", example=24)
+    requested_amount: float = Field(..., gt=0, description="Valor do empréstimo solicitado.", example=10000.0)
+    installments: int = Field(..., gt=0, description="Número de parcelas.", example=24)
 
 class CreditAnalysisResponse(BaseModel):
     cpf: str
@@ -123,6 +120,17 @@ class CreditAnalysisResponse(BaseModel):
     message: str
     approved_amount: Optional[float] = None
     approved_installments: Optional[int] = None
+    # Bureaus que não responderam a tempo (a decisão vira "Análise Manual")
+    fontes_indisponiveis: List[str] = []
+
+class AnaliseJobOut(BaseModel):
+    job_id: str
+    status: Literal["na_fila", "processando", "concluida", "erro"]
+    criado_em: datetime
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
+    resultado: Optional[CreditAnalysisResponse] = None
+    erro: Optional[str] = None
 
 class SerasaData(BaseModel):
     cpf: str
@@ -1,7 +1,7 @@
 # schemas/simulacao.py
 
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 
 class SimulacaoBase(BaseModel):
@@ -23,6 +23,9 @@ class SimulacaoBase(BaseModel):
     # Aqui entram as perguntas de Home Equity, Car Equity, MedPlan...
     dados_especificos: Dict[str, Any] 
 
+    # "price" = parcelas fixas | "sac" = amortização constante (parcelas decrescentes)
+    sistema_amortizacao: Literal["price", "sac"] = "price"
+
 class SimulacaoCreate(SimulacaoBase):
     pass
 
@@ -32,5 +35,64 @@ class SimulacaoOut(SimulacaoBase):
     criado_em: datetime
     status: Optional[str] = None
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    # Valores calculados pelo backend (no SAC, valor_parcela é a 1ª parcela)
+    valor_parcela: Optional[float] = None
+    valor_total: Optional[float] = None
+    juros_total: Optional[float] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+# === CRONOGRAMA (tabela mês a mês, não é salvo) ===
+
+class CronogramaRequest(BaseModel):
+    valor_desejado: float = Field(..., gt=0)
+    prazo_meses: int = Field(..., gt=0, le=420)
+    tipo_emprestimo: str
+    sistema_amortizacao: Literal["price", "sac"] = "price"
+
+class ParcelaOut(BaseModel):
+    mes: int
+    parcela: float
+    juros: float
+    amortizacao: float
+    saldo_devedor: float
+
+class CronogramaOut(BaseModel):
+    valor_parcela: float
+    valor_ultima_parcela: float
+    valor_total: float
+    juros_total: float
+    cronograma: List[ParcelaOut]
+
+# === COTAÇÃO EM LOTE (sliders do front, não é salva) ===
+
+MAX_COTACOES_POR_LOTE = 2000
+
+class ItemCotacao(BaseModel):
+    valor_desejado: float = Field(..., gt=0)
+    prazo_meses: int = Field(..., gt=0, le=420)
+    tipo_emprestimo: str
+
+class GradeCotacao(BaseModel):
+    # Produto cartesiano valores × prazos para um mesmo tipo de empréstimo
+    valores: List[float] = Field(..., min_length=1)
+    prazos: List[int] = Field(..., min_length=1)
+    tipo_emprestimo: str
+
+class CotacaoLoteRequest(BaseModel):
+    itens: List[ItemCotacao] = []
+    grade: Optional[GradeCotacao] = None
+    sistema_amortizacao: Literal["price", "sac"] = "price"
+
+class CotacaoOut(BaseModel):
+    valor_desejado: float
+    prazo_meses: int
+    tipo_emprestimo: str
+    valor_parcela: float
+    valor_ultima_parcela: float
+    valor_total: float
+    juros_total: float
+
+class CotacaoLoteOut(BaseModel):
+    sistema_amortizacao: str
+    cotacoes: List[CotacaoOut]
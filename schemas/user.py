@@ -1,6 +1,6 @@
 # schemas/user.py
 
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, EmailStr, Field, validator, ConfigDict
 from datetime import datetime
 from validators import validar_cpf, _only_digits # Ajuste o caminho se necessário
 
@@ -24,5 +24,4 @@ class UserOut(UserBase):
     id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -1,34 +1,59 @@
 import os
+import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
 
 # Importe seus módulos locais
-from db import get_db
+from cache import TTLCache
+from db import get_async_db
 from models.models import User
+from passwords import password_pool, PasswordPoolSaturated
 
 # --- Configuração de Segurança ---
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 SECRET_KEY = os.getenv("SECRET_KEY", "a_secret_key_super_strong_for_dev_purpose")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
+# Chave das rotas de back office (/api/admin/...). Sem ela, essas rotas ficam desligadas.
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
-def hash_password(password: str):
-    """Gera o hash de uma senha."""
-    return pwd_context.hash(password)
+# Cache de "principals" (usuário já autenticado), indexado pelo 'sub' do token.
+# Evita uma consulta na tabela users a cada requisição autenticada.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", 10000))
+
+principal_cache = TTLCache(max_size=PRINCIPAL_CACHE_MAX_SIZE, ttl_seconds=PRINCIPAL_CACHE_TTL_SECONDS)
 
-def verify_password(plain_password: str, hashed_password: str):
-    """Verifica se a senha fornecida corresponde ao hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+def _password_pool_busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Serviço temporariamente sobrecarregado. Tente novamente em instantes.",
+        headers={"Retry-After": "1"},
+    )
+
+async def hash_password(password: str):
+    """Gera o hash de uma senha (no pool de processos de senha)."""
+    try:
+        return await password_pool.hash(password)
+    except PasswordPoolSaturated:
+        raise _password_pool_busy()
+
+async def verify_password(plain_password: str, hashed_password: str):
+    """Verifica se a senha fornecida corresponde ao hash (no pool de processos de senha)."""
+    try:
+        return await password_pool.verify(plain_password, hashed_password)
+    except PasswordPoolSaturated:
+        raise _password_pool_busy()
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Cria um novo token de acesso JWT."""
@@ -47,7 +72,66 @@ def get_user_by_email(db: Session, email: str):
     """Busca um usuário pelo e-mail."""
     return db.query(User).filter(User.email == email).first()
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    """Busca um usuário pelo e-mail (sessão assíncrona)."""
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+def _snapshot_user(user: User) -> dict:
+    """Copia as colunas do usuário para um dict imutável na prática (sem estado de sessão)."""
+    return {c.key: getattr(user, c.key) for c in User.__table__.columns}
+
+def _user_from_snapshot(snapshot: dict) -> User:
+    """
+    Reconstrói o User a partir do cache, sem ir ao banco.
+    O objeto fica "detached": as colunas estão carregadas, mas relacionamentos
+    (ex: perfil) devem ser consultados explicitamente pela rota.
+    """
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+def invalidate_principal(email: str):
+    """Remove o usuário do cache (troca de senha, exclusão, etc.)."""
+    if email:
+        principal_cache.invalidate(email)
+
+# Qualquer UPDATE/DELETE de usuário feito por este processo invalida o cache
+# (ex: /api/auth/reset-password, exclusão de conta). Em outros workers, e em
+# scripts que rodam em outro processo (delete_user.py), a entrada expira
+# sozinha após PRINCIPAL_CACHE_TTL_SECONDS.
+_PRINCIPALS_ALTERADOS = "principals_alterados"
+
+def _emails_afetados(target: User) -> set:
+    # Na troca de e-mail a entrada antiga também precisa sair
+    emails = {target.email, *inspect(target).attrs.email.history.deleted}
+    return {email for email in emails if email}
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user_on_change(mapper, connection, target: User):
+    emails = _emails_afetados(target)
+    for email in emails:
+        invalidate_principal(email)
+    # Estes eventos rodam no flush, antes do commit: nesse meio tempo outra
+    # requisição ainda lê a linha antiga e pode recolocá-la no cache. Guarda
+    # os e-mails na sessão para invalidar de novo depois do commit.
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PRINCIPALS_ALTERADOS, set()).update(emails)
+
+# Vale para Session e para AsyncSession (que usa uma Session por baixo)
+@event.listens_for(Session, "after_commit")
+def _invalidate_users_after_commit(session):
+    for email in session.info.pop(_PRINCIPALS_ALTERADOS, ()):
+        invalidate_principal(email)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changed_users(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PRINCIPALS_ALTERADOS, None)
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     """Decodifica o token, valida o usuário e retorna o objeto User."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -61,12 +145,22 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    user = get_user_by_email(db, email=email)
+
+    snapshot = principal_cache.get(email)
+    if snapshot is not None:
+        return _user_from_snapshot(snapshot)
+
+    user = await get_user_by_email_async(db, email=email)
     if user is None:
         raise credentials_exception
+    principal_cache.set(email, _snapshot_user(user))
     return user
 
+def require_admin_api_key(x_admin_key: Optional[str] = Header(None)):
+    """Protege as rotas de back office com o header X-Admin-Key."""
+    if not ADMIN_API_KEY or not x_admin_key or not secrets.compare_digest(x_admin_key, ADMIN_API_KEY):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso restrito ao back office.")
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
     """Verifica se o usuário obtido pelo token está ativo."""
     # Você pode adicionar lógicas de verificação aqui (ex: usuário banido)
@@ -0,0 +1,31 @@
+# tests/conftest.py
+#
+# Os testes rodam num SQLite temporário (nunca no DATABASE_URL do .env):
+# db.py lê a variável na importação, então ela é definida antes de tudo.
+
+import os
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'testes.db')}"
+
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """Sessão síncrona num banco com as tabelas criadas do zero."""
+    from db import SessionLocal, engine
+    from models.models import Base
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    sessao = SessionLocal()
+    try:
+        yield sessao
+    finally:
+        sessao.close()
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from amortizacao import calcular_amortizacao, calcular_lote
+
+
+def test_price_valores_de_referencia():
+    r = calcular_amortizacao(100000, 0.01, 360, "price")
+    assert r["valor_parcela"] == 1028.61
+    assert r["valor_ultima_parcela"] == 1028.61
+    assert r["valor_total"] == 370299.60
+    assert r["juros_total"] == 270299.60
+
+
+def test_sac_valores_de_referencia():
+    r = calcular_amortizacao(120000, 0.01, 120, "sac")
+    assert r["valor_parcela"] == 2200.00
+    assert r["valor_ultima_parcela"] == 1010.00
+    assert r["juros_total"] == 72600.00
+    assert r["valor_total"] == 192600.00
+
+
+def test_sac_cronograma_de_referencia():
+    r = calcular_amortizacao(120000, 0.01, 120, "sac", incluir_cronograma=True)
+    cronograma = r["cronograma"]
+    assert len(cronograma) == 120
+    assert cronograma[0] == {"mes": 1, "parcela": 2200.00, "juros": 1200.00, "amortizacao": 1000.00, "saldo_devedor": 119000.00}
+    assert cronograma[-1] == {"mes": 120, "parcela": 1010.00, "juros": 10.00, "amortizacao": 1000.00, "saldo_devedor": 0.00}
+    assert sum(linha["parcela"] for linha in cronograma) == pytest.approx(r["valor_total"], abs=0.005)
+
+
+@pytest.mark.parametrize("valor, taxa, prazo", [(10736.50, 0.015, 12), (100000, 0.01, 360), (5000, 0.0299, 24), (1200, 0, 12)])
+def test_price_total_bate_com_o_cronograma(valor, taxa, prazo):
+    r = calcular_amortizacao(valor, taxa, prazo, "price", incluir_cronograma=True)
+    parcelas = [linha["parcela"] for linha in r["cronograma"]]
+    assert set(parcelas) == {r["valor_parcela"]}
+    assert r["valor_total"] == round(r["valor_parcela"] * prazo, 2)
+    assert r["valor_total"] == pytest.approx(sum(parcelas), abs=0.005)
+    assert r["cronograma"][-1]["saldo_devedor"] == 0.0
+
+
+@pytest.mark.parametrize("sistema", ["price", "sac"])
+def test_lote_igual_ao_calculo_individual(sistema):
+    valores, taxas, prazos = [100000, 120000, 10736.50, 1200], [0.01, 0.01, 0.015, 0], [360, 120, 12, 12]
+    lote = calcular_lote(valores, taxas, prazos, sistema)
+    for k in range(len(valores)):
+        individual = calcular_amortizacao(valores[k], taxas[k], prazos[k], sistema)
+        for chave, valor in individual.items():
+            assert lote[chave][k] == pytest.approx(valor, abs=0.005)
+
+
+def test_prazo_e_sistema_invalidos():
+    with pytest.raises(ValueError):
+        calcular_amortizacao(1000, 0.01, 0)
+    with pytest.raises(ValueError):
+        calcular_amortizacao(1000, 0.01, 12, "alemao")
+    with pytest.raises(ValueError):
+        calcular_lote([1000], [0.01], [0])
+    assert isinstance(calcular_lote([1000], [0.01], [12])["valor_parcela"], np.ndarray)
@@ -0,0 +1,19 @@
+import pytest
+
+from analysis.bureaus import ClienteBureau, ClienteHttp, SimuladorBureau
+from analysis.resiliencia import ClienteResiliente
+from schemas.schemas import SerasaData
+
+
+def test_cliente_sem_consultar_falha_ao_criar():
+    class Incompleto(ClienteBureau):
+        nome, modelo = "incompleto", SerasaData
+
+    with pytest.raises(TypeError):
+        Incompleto()
+
+
+def test_clientes_da_casa_sao_concretos():
+    cliente = ClienteHttp("serasa", SerasaData, "http://bureau.teste")
+    ClienteResiliente(cliente, timeout=1)
+    assert not SimuladorBureau.__abstractmethods__
@@ -0,0 +1,82 @@
+import copy
+import json
+import os
+
+import pytest
+
+import catalogo
+
+with open(catalogo.CATALOGO_PRODUTOS_PATH, encoding="utf-8") as f:
+    DADOS = json.load(f)
+
+
+def _dados(**alteracoes_imovel):
+    dados = copy.deepcopy(DADOS)
+    dados["produtos"]["imovel-garantia"].update(alteracoes_imovel)
+    return dados
+
+
+def test_monta_o_catalogo_do_repositorio():
+    cat = catalogo._montar_catalogo(DADOS, versao="1")
+    assert cat.produto("imovel-garantia").campos_obrigatorios == {"valor_imovel"}
+    assert cat.produto("nao-existe").codigo == cat.padrao
+
+
+@pytest.mark.parametrize("alteracoes", [
+    {"campos_especificos": {"valor_imovel": {"tipo": "decimal"}}},
+    {"prazo_min": 400},
+    {"valor_min": 10_000_000},
+])
+def test_rejeita_produto_invalido(alteracoes):
+    with pytest.raises(ValueError):
+        catalogo._montar_catalogo(_dados(**alteracoes), versao="1")
+
+
+@pytest.fixture
+def arquivo(tmp_path, monkeypatch):
+    """Catálogo num arquivo temporário, com o estado do módulo restaurado no fim."""
+    path = tmp_path / "produtos.json"
+    path.write_text(json.dumps(DADOS), encoding="utf-8")
+    monkeypatch.setattr(catalogo, "CATALOGO_PRODUTOS_PATH", str(path))
+    monkeypatch.setattr(catalogo, "_catalogo", catalogo.carregar_catalogo(str(path)))
+    monkeypatch.setattr(catalogo, "_mtime_ns", os.stat(path).st_mtime_ns)
+    monkeypatch.setattr(catalogo, "_proxima_checagem", 0.0)
+    return path
+
+
+def _escrever(path, dados, mtime_ns):
+    path.write_text(json.dumps(dados), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.mark.parametrize("dados", [
+    {"padrao": "default", "produtos": []},                                      # AttributeError
+    {"padrao": "default", "produtos": {"default": {"campos_especificos": []}}},  # AttributeError
+    _dados(campos_especificos={"valor_imovel": {"tipo": "decimal"}}),           # tipo inválido
+])
+def test_recarga_com_erro_mantem_a_versao_anterior(arquivo, dados, monkeypatch):
+    anterior = catalogo._catalogo
+    mtime_quebrado = catalogo._mtime_ns + 10**9
+    _escrever(arquivo, dados, mtime_quebrado)
+
+    leituras = []
+    carregar = catalogo.carregar_catalogo
+    monkeypatch.setattr(catalogo, "carregar_catalogo", lambda path: leituras.append(path) or carregar(path))
+
+    assert catalogo.obter_catalogo() is anterior
+    # O mtime da versão quebrada fica guardado: a próxima checagem não relê o arquivo
+    assert catalogo._mtime_ns == mtime_quebrado
+    catalogo._proxima_checagem = 0.0
+    assert catalogo.obter_catalogo() is anterior
+    assert len(leituras) == 1
+
+
+def test_recarga_depois_de_corrigir_o_arquivo(arquivo):
+    mtime = catalogo._mtime_ns
+    _escrever(arquivo, {"padrao": "default", "produtos": []}, mtime + 10**9)
+    catalogo.obter_catalogo()
+
+    _escrever(arquivo, _dados(taxa_juros_mensal=0.02), mtime + 2 * 10**9)
+    catalogo._proxima_checagem = 0.0
+    assert catalogo.obter_produto("imovel-garantia").taxa_juros_mensal == 0.02
+    assert catalogo._mtime_ns == mtime + 2 * 10**9
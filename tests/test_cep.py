@@ -0,0 +1,18 @@
+from cep import BaseCep, construir_indice
+
+
+def test_texto_longo_e_cortado_sem_partir_caractere(tmp_path):
+    # "ã" ocupa 2 bytes: o corte em 0xFFFF (ímpar) cai no meio de um
+    logradouro = "ã" * 40000
+    csv_path = tmp_path / "ceps.csv"
+    csv_path.write_text(f"cep,logradouro,bairro,cidade,uf\n01001-000,{logradouro},Sé,São Paulo,SP\n", encoding="utf-8")
+    destino = str(tmp_path / "ceps.bin")
+
+    assert construir_indice(str(csv_path), destino) == 1
+    endereco = BaseCep(destino).buscar("01001000")
+
+    assert logradouro.startswith(endereco["logradouro"])
+    assert len(endereco["logradouro"].encode("utf-8")) == 0xFFFF - 1
+    assert endereco["bairro"] == "Sé"
+    assert endereco["cidade"] == "São Paulo"
+    assert endereco["estado"] == "SP"
@@ -0,0 +1,32 @@
+from types import MappingProxyType
+
+import pytest
+
+from catalogo import Catalogo, CampoEspecifico, Produto
+from dados_especificos import DadosInvalidos, _montar_validadores, validar_dados_especificos
+
+
+def test_valida_e_normaliza():
+    dados = validar_dados_especificos("imovel-garantia", {"valor_imovel": 300000.0, "extra": "ok"})
+    assert dados == {"valor_imovel": 300000.0, "extra": "ok"}
+
+
+@pytest.mark.parametrize("dados", [
+    {},                                       # obrigatório ausente
+    {"valor_imovel": "300000"},               # strict: texto não vira número
+    {"valor_imovel": 1.0, "imovel_quitado": "true"},
+    {"valor_imovel": 1.0, "extra": [1, 2]},   # campo fora do catálogo só aceita valor simples
+])
+def test_rejeita_dados_invalidos(dados):
+    with pytest.raises(DadosInvalidos):
+        validar_dados_especificos("imovel-garantia", dados)
+
+
+def test_tipo_sem_validador_da_erro_claro_ao_montar():
+    produto = Produto(
+        codigo="x", nome="X", taxa_juros_mensal=0.01, prazo_min=1, prazo_max=12, valor_min=1, valor_max=10,
+        campos_especificos=MappingProxyType({"campo": CampoEspecifico(tipo="decimal")}),
+    )
+    catalogo = Catalogo(produtos=MappingProxyType({"x": produto}), padrao="x", versao="1")
+    with pytest.raises(ValueError, match="Produto 'x', campo 'campo': tipo 'decimal'"):
+        _montar_validadores(catalogo)
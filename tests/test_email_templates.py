@@ -0,0 +1,68 @@
+import pytest
+
+from email_templates import TEMPLATES, EmailTemplate, render_email
+
+CONTEXTOS = {
+    "verificacao": {"nome": "Ana Souza", "codigo": "123456"},
+    "redefinicao_senha": {"nome": "Ana Souza", "link": "http://localhost:8080/redefinir-senha?token=abc.def"},
+    "contato": {
+        "nome": "Ana Souza",
+        "email": "ana@exemplo.com",
+        "telefone": "(11) 99999-0000",
+        "assunto": "Dúvida",
+        "mensagem": "Primeira linha\nSegunda linha",
+    },
+}
+
+
+def test_todos_os_templates_tem_html_e_texto():
+    assert set(TEMPLATES) == set(CONTEXTOS)
+    for nome, template in TEMPLATES.items():
+        assert template.fields == set(CONTEXTOS[nome]), nome
+
+
+@pytest.mark.parametrize("nome", sorted(CONTEXTOS))
+def test_renderiza_html_e_texto(nome):
+    html, texto = render_email(nome, **CONTEXTOS[nome])
+    for valor in CONTEXTOS[nome].values():
+        assert valor in texto
+    assert "{{" not in html and "{{" not in texto
+    assert "Ana Souza" in html
+
+
+def test_verificacao_e_redefinicao():
+    html, texto = render_email("verificacao", **CONTEXTOS["verificacao"])
+    assert ">123456</p>" in html
+    html, texto = render_email("redefinicao_senha", **CONTEXTOS["redefinicao_senha"])
+    assert 'href="http://localhost:8080/redefinir-senha?token=abc.def"' in html
+
+
+def test_contato_quebra_linha_da_mensagem_no_html():
+    html, texto = render_email("contato", **CONTEXTOS["contato"])
+    assert "Primeira linha<br>Segunda linha" in html
+    assert "Primeira linha\nSegunda linha" in texto
+
+
+@pytest.mark.parametrize("nome", sorted(CONTEXTOS))
+def test_escapa_valores_do_usuario_no_html(nome):
+    malicioso = '<script>alert("x")</script>&\'"'
+    contexto = {campo: malicioso for campo in CONTEXTOS[nome]}
+    html, texto = render_email(nome, **contexto)
+    assert "<script>" not in html
+    assert "&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;&amp;&#x27;&quot;" in html
+    assert malicioso in texto  # texto puro não é HTML: vai como veio
+
+
+def test_atributo_nao_escapa_das_aspas():
+    html, _ = render_email("redefinicao_senha", nome="Ana", link='x" onclick="alert(1)')
+    assert 'href="x&quot; onclick=&quot;alert(1)"' in html
+
+
+def test_campo_faltando():
+    with pytest.raises(KeyError, match="codigo"):
+        render_email("verificacao", nome="Ana")
+
+
+def test_filtro_desconhecido():
+    with pytest.raises(ValueError):
+        EmailTemplate("x", "{{ nome|maiusculas }}", "")
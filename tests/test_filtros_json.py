@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from filtros_json import FiltroInvalido, FiltroJson, compilar_filtros, jsonpath_filtros, parse_filtro
+from models.models import Simulacao
+
+
+def test_parse_converte_o_valor():
+    assert parse_filtro("valor_imovel:gt:500000") == FiltroJson("valor_imovel", "gt", 500000)
+    assert parse_filtro("taxa:lte:1.5") == FiltroJson("taxa", "lte", 1.5)
+    assert parse_filtro("imovel_quitado:eq:true") == FiltroJson("imovel_quitado", "eq", True)
+    assert parse_filtro("tipo_imovel:eq:casa:geminada") == FiltroJson("tipo_imovel", "eq", "casa:geminada")
+
+
+@pytest.mark.parametrize("texto", [
+    "valor_imovel",
+    "valor-imovel:eq:1",
+    "valor_imovel:like:1",
+    "tipo_imovel:gt:casa",
+    "valor_imovel:gt:nan",
+    "valor_imovel:eq:NaN",
+    "valor_imovel:lt:inf",
+    "valor_imovel:gte:-Infinity",
+    "valor_imovel:gt:1e400",
+])
+def test_parse_rejeita_filtro_invalido(texto):
+    with pytest.raises(FiltroInvalido):
+        parse_filtro(texto)
+
+
+def test_jsonpath():
+    filtros = [parse_filtro("valor_imovel:gt:500000"), parse_filtro('tipo_imovel:eq:ca"sa')]
+    assert jsonpath_filtros(filtros) == '$ ? (@.valor_imovel > 500000 && @.tipo_imovel == "ca\\"sa")'
+
+
+def test_faixa_em_chave_indexada_usa_a_expressao_do_indice_no_postgres():
+    filtros = [parse_filtro("valor_imovel:gte:300000"), parse_filtro("tipo_imovel:eq:casa")]
+    condicoes = compilar_filtros(Simulacao.dados_especificos, filtros, "postgresql")
+    sql = [str(c.compile(dialect=postgresql.dialect())) for c in condicoes]
+    assert len(sql) == 2
+    assert "jsonb_typeof" in sql[0] and ">=" in sql[0]
+    assert "@?" in sql[1]
@@ -0,0 +1,135 @@
+import asyncio
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from mailer import MailQueueFull, MailWorker
+
+
+class Caixa:
+    """Handler do aiosmtpd: guarda as mensagens; as primeiras `falhas` recebem 451."""
+
+    def __init__(self, falhas: int = 0):
+        self.falhas = falhas
+        self.mensagens = []
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.falhas:
+            self.falhas -= 1
+            return "451 Tente novamente mais tarde"
+        self.mensagens.append(envelope.content.decode())
+        return "250 OK"
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def servidor():
+    controladores = []
+
+    def iniciar(caixa: Caixa) -> int:
+        porta = _porta_livre()
+        controlador = Controller(caixa, hostname="127.0.0.1", port=porta)
+        controlador.start()
+        controladores.append(controlador)
+        return porta
+
+    yield iniciar
+    for controlador in controladores:
+        controlador.stop()
+
+
+def _worker(porta: int, **kwargs) -> MailWorker:
+    return MailWorker(
+        hostname="127.0.0.1", port=porta, username=None, password=None, sender="noreply@exemplo.com",
+        use_tls=False, start_tls=False, backoff_base=0.01, **kwargs,
+    )
+
+
+async def _enviar_e_esperar(worker: MailWorker, assuntos):
+    await worker.start()
+    try:
+        for assunto in assuntos:
+            worker.enqueue(assunto, ["cliente@exemplo.com"], f"<p>{assunto}</p>", assunto)
+        await asyncio.wait_for(worker._queue.join(), timeout=10)
+    finally:
+        await worker.stop()
+
+
+def test_entrega(servidor):
+    caixa = Caixa()
+    worker = _worker(servidor(caixa))
+
+    asyncio.run(_enviar_e_esperar(worker, ["Primeira", "Segunda"]))
+
+    assert len(caixa.mensagens) == 2
+    assert "Subject: Primeira" in caixa.mensagens[0]
+    assert "<p>Segunda</p>" in caixa.mensagens[1]
+    stats = worker.stats()
+    assert (stats["sent"], stats["failed"], stats["retries"], stats["queue_depth"]) == (2, 0, 0, 0)
+    assert stats["connections_opened"] == 1  # as duas na mesma sessão SMTP
+
+
+def test_falha_temporaria_e_retry(servidor):
+    caixa = Caixa(falhas=2)
+    worker = _worker(servidor(caixa))
+
+    asyncio.run(_enviar_e_esperar(worker, ["Com retry"]))
+
+    assert len(caixa.mensagens) == 1
+    stats = worker.stats()
+    assert (stats["sent"], stats["failed"], stats["retries"]) == (1, 0, 2)
+
+
+def test_desiste_depois_de_max_retries(servidor):
+    caixa = Caixa(falhas=10)
+    worker = _worker(servidor(caixa), max_retries=2)
+
+    asyncio.run(_enviar_e_esperar(worker, ["Sem sorte"]))
+
+    assert caixa.mensagens == []
+    stats = worker.stats()
+    assert (stats["sent"], stats["failed"], stats["retries"], stats["queue_depth"]) == (0, 1, 2, 0)
+
+
+def test_erro_inesperado_nao_derruba_o_worker(servidor, monkeypatch):
+    caixa = Caixa()
+    worker = _worker(servidor(caixa))
+    enviar = MailWorker._send
+
+    async def send_com_bug(self, item):
+        if item[1]["Subject"] == "Quebrada":
+            raise RuntimeError("bug")
+        await enviar(self, item)
+
+    monkeypatch.setattr(MailWorker, "_send", send_com_bug)
+    asyncio.run(_enviar_e_esperar(worker, ["Quebrada", "Depois"]))
+
+    assert len(caixa.mensagens) == 1
+    assert "Subject: Depois" in caixa.mensagens[0]
+    stats = worker.stats()
+    assert (stats["sent"], stats["failed"], stats["queue_depth"]) == (1, 1, 0)
+
+
+def test_fila_cheia():
+    worker = _worker(1, max_queue=2)  # sem start: nada sai da fila
+
+    worker.enqueue("1", ["a@exemplo.com"], "<p>1</p>")
+    worker.enqueue("2", ["a@exemplo.com"], "<p>2</p>")
+    with pytest.raises(MailQueueFull):
+        worker.enqueue("3", ["a@exemplo.com"], "<p>3</p>")
+    assert worker.stats()["queue_depth"] == 2
+
+
+def test_cabecalho_invalido_nao_ocupa_a_fila():
+    worker = _worker(1, max_queue=1)
+
+    with pytest.raises(ValueError):
+        worker.enqueue("assunto\r\nBcc: x@exemplo.com", ["a@exemplo.com"], "<p>x</p>")
+    worker.enqueue("ok", ["a@exemplo.com"], "<p>ok</p>")
+    assert worker.stats()["queue_depth"] == 1
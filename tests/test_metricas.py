@@ -0,0 +1,16 @@
+from metricas import percentil
+
+
+def test_percentil_sem_amostras():
+    assert percentil([], 95) == 0.0
+
+
+def test_percentil_por_posicao():
+    valores = list(range(100, 0, -1))  # 1..100 fora de ordem
+    assert percentil(valores, 50) == 51
+    assert percentil(valores, 95) == 96
+    assert percentil(valores, 100) == 100
+
+
+def test_percentil_arredonda():
+    assert percentil([1.23456], 50) == 1.23
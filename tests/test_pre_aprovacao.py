@@ -0,0 +1,64 @@
+from datetime import date, datetime, timezone
+
+from analysis.features import calcular_features
+from analysis.pre_aprovacao import decisao_pre_aprovada
+from models.models import FeaturesPerfil, PreAprovacao
+from schemas.schemas import BacenSCRData, CreditAnalysisRequest, SerasaData
+
+CPF = "52998224725"
+
+
+def _perfil():
+    features = FeaturesPerfil(user_id=1, **calcular_features(10000, True, False, date(2015, 3, 1), date(1990, 1, 1)))
+    pre = PreAprovacao(
+        user_id=1,
+        score=670,  # só do perfil
+        limite_aprovado=100000,
+        assinatura_perfil=features.assinatura,
+        calculado_em=datetime.now(timezone.utc),
+    )
+    return features, pre
+
+
+def _pedido():
+    return CreditAnalysisRequest(cpf=CPF, requested_amount=10000, installments=24)
+
+
+def _bacen(risk_level):
+    return BacenSCRData(cpf=CPF, total_loan_value=0, total_overdue_value=0, risk_level=risk_level)
+
+
+def test_aprova_com_bureaus_bons_usando_o_score_atual():
+    features, pre = _perfil()
+    serasa = SerasaData(cpf=CPF, score=800, has_negative_records=False, protests=0, debts_value=0)
+
+    decisao = decisao_pre_aprovada(pre, features, _pedido(), serasa, _bacen(1))
+
+    assert decisao is not None
+    assert decisao.decision == "Aprovado"
+    assert decisao.message == "Crédito pré-aprovado!"
+    assert decisao.score == 830  # 800 do Serasa + 30 do imóvel, não o 670 do perfil
+
+
+def test_score_de_bureau_baixo_nao_usa_o_atalho():
+    # Sem negativação nem atraso, mas score 380 e risco 5: a política nega
+    features, pre = _perfil()
+    serasa = SerasaData(cpf=CPF, score=380, has_negative_records=False, protests=0, debts_value=0)
+
+    assert decisao_pre_aprovada(pre, features, _pedido(), serasa, _bacen(5)) is None
+
+
+def test_sem_bureau_em_cache_nao_usa_o_atalho():
+    features, pre = _perfil()
+    serasa = SerasaData(cpf=CPF, score=800, has_negative_records=False, protests=0, debts_value=0)
+
+    assert decisao_pre_aprovada(pre, features, _pedido(), serasa, None) is None
+    assert decisao_pre_aprovada(pre, features, _pedido(), None, _bacen(1)) is None
+
+
+def test_pedido_acima_do_limite_nao_usa_o_atalho():
+    features, pre = _perfil()
+    serasa = SerasaData(cpf=CPF, score=800, has_negative_records=False, protests=0, debts_value=0)
+    pedido = CreditAnalysisRequest(cpf=CPF, requested_amount=150000, installments=24)
+
+    assert decisao_pre_aprovada(pre, features, pedido, serasa, _bacen(1)) is None
@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from analysis import bureaus
+from analysis.bureaus import ClienteHttp
+from analysis.resiliencia import ABERTO, FECHADO, MEIO_ABERTO, CircuitBreaker, CircuitoAberto, ClienteResiliente
+from schemas.schemas import SerasaData
+
+CPF = "52998224725"
+RESPOSTA = {"cpf": CPF, "score": 750, "has_negative_records": False, "protests": 0, "debts_value": 0.0}
+
+
+class Stub:
+    """Servidor de bureau falso (httpx.MockTransport): cada chamada segue o roteiro."""
+
+    def __init__(self, roteiro):
+        self.roteiro = list(roteiro)  # (atraso em s, status) por chamada; a última se repete
+        self.chamadas = 0
+        self.canceladas = 0
+
+    async def __call__(self, request):
+        atraso, status = self.roteiro[min(self.chamadas, len(self.roteiro) - 1)]
+        self.chamadas += 1
+        try:
+            await asyncio.sleep(atraso)
+        except asyncio.CancelledError:
+            self.canceladas += 1
+            raise
+        return httpx.Response(status, json=RESPOSTA if status == 200 else {})
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    def iniciar(roteiro) -> Stub:
+        stub = Stub(roteiro)
+        monkeypatch.setattr(bureaus, "_http", httpx.AsyncClient(transport=httpx.MockTransport(stub)))
+        return stub
+    return iniciar
+
+
+def _cliente(timeout=1.0, hedge=False, limite_falhas=3, tempo_aberto=0.05) -> ClienteResiliente:
+    cliente = ClienteResiliente(ClienteHttp("serasa", SerasaData, "http://bureau.teste"), timeout=timeout, hedge=hedge)
+    cliente.breaker = CircuitBreaker(limite_falhas=limite_falhas, tempo_aberto=tempo_aberto)
+    return cliente
+
+
+async def _consultar(cliente):
+    try:
+        return await cliente.consultar(CPF, None)
+    except Exception as e:
+        return e
+
+
+# --- Circuit breaker ---
+
+def test_breaker_abre_depois_de_n_falhas_e_fecha_no_sucesso_do_teste(stub_server):
+    stub = stub_server([(0, 500), (0, 500), (0, 500), (0, 200)])
+    cliente = _cliente(limite_falhas=3, tempo_aberto=0.05)
+
+    async def cenario():
+        for _ in range(2):
+            assert isinstance(await _consultar(cliente), httpx.HTTPStatusError)
+        assert cliente.breaker.estado == FECHADO
+        assert isinstance(await _consultar(cliente), httpx.HTTPStatusError)
+        assert cliente.breaker.estado == ABERTO
+
+        # Aberto: falha na hora, sem chamar o bureau
+        assert isinstance(await _consultar(cliente), CircuitoAberto)
+        assert stub.chamadas == 3
+
+        await asyncio.sleep(0.06)
+        assert cliente.breaker.permitir() and cliente.breaker.estado == MEIO_ABERTO
+        assert not cliente.breaker.permitir()  # só uma consulta de teste por vez
+        cliente.breaker.desistencia()
+
+        resultado = await _consultar(cliente)
+        assert isinstance(resultado, SerasaData)
+        assert cliente.breaker.estado == FECHADO and cliente.breaker.falhas_seguidas == 0
+
+    asyncio.run(cenario())
+    assert cliente.breaker.stats()["aberturas"] == 1
+    assert cliente.breaker.stats()["rejeitadas"] == 2
+
+
+def test_breaker_reabre_se_o_teste_falha(stub_server):
+    stub_server([(0, 500)])
+    cliente = _cliente(limite_falhas=1, tempo_aberto=0.05)
+
+    async def cenario():
+        await _consultar(cliente)
+        assert cliente.breaker.estado == ABERTO
+        await asyncio.sleep(0.06)
+        assert isinstance(await _consultar(cliente), httpx.HTTPStatusError)
+        assert cliente.breaker.estado == ABERTO
+        assert isinstance(await _consultar(cliente), CircuitoAberto)
+
+    asyncio.run(cenario())
+    assert cliente.breaker.aberturas == 2
+
+
+def test_timeout_conta_como_falha(stub_server):
+    stub_server([(1, 200)])
+    cliente = _cliente(timeout=0.02, limite_falhas=1)
+
+    assert isinstance(asyncio.run(_consultar(cliente)), asyncio.TimeoutError)
+    assert cliente.breaker.estado == ABERTO
+
+
+# --- Hedge ---
+
+def _com_historico(cliente, latencia=0.01, amostras=50):
+    # p95 das latências recentes = 10 ms -> hedge depois de 20 ms (BUREAU_HEDGE_ATRASO_MIN_MS)
+    cliente._latencias.extend([latencia] * amostras)
+    return cliente
+
+
+def test_hedge_fica_com_a_resposta_mais_rapida_e_cancela_a_lenta(stub_server):
+    stub = stub_server([(1.0, 200), (0, 200)])
+    cliente = _com_historico(_cliente(timeout=2, hedge=True))
+
+    inicio = time.monotonic()
+    resultado = asyncio.run(_consultar(cliente))
+
+    assert isinstance(resultado, SerasaData)
+    assert time.monotonic() - inicio < 0.5
+    assert (stub.chamadas, stub.canceladas) == (2, 1)
+    assert (cliente.hedges_disparados, cliente.hedges_vencedores) == (1, 1)
+
+
+def test_hedge_nao_dispara_se_a_original_responde_a_tempo(stub_server):
+    stub = stub_server([(0, 200)])
+    cliente = _com_historico(_cliente(timeout=2, hedge=True))
+
+    assert isinstance(asyncio.run(_consultar(cliente)), SerasaData)
+    assert stub.chamadas == 1 and cliente.hedges_disparados == 0
+
+
+def test_hedge_usa_a_original_se_a_segunda_falha(stub_server):
+    stub = stub_server([(0.1, 200), (0, 500)])
+    cliente = _com_historico(_cliente(timeout=2, hedge=True))
+
+    assert isinstance(asyncio.run(_consultar(cliente)), SerasaData)
+    assert (cliente.hedges_disparados, cliente.hedges_vencedores) == (1, 0)
+    assert cliente.breaker.estado == FECHADO
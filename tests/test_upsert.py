@@ -0,0 +1,60 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from analysis.features import calcular_features, upsert_features_stmt
+from analysis.pre_aprovacao import executar_pre_aprovacao
+from db import upsert_stmt
+from models.models import FeaturesPerfil, PerfilUsuario, PreAprovacao, User
+from routes.profile import upsert_perfil_stmt
+
+
+@pytest.mark.parametrize("montar", [
+    lambda dialeto: upsert_perfil_stmt(dialeto, 1, {"cidade": "x"}),
+    upsert_features_stmt,
+    lambda dialeto: upsert_stmt(dialeto, PreAprovacao, ["user_id"], ["score"]),
+])
+def test_banco_nao_suportado_sempre_levanta(montar):
+    with pytest.raises(NotImplementedError):
+        montar("mysql")
+
+
+def test_features_so_atualiza_se_algo_mudou():
+    sql = " ".join(str(upsert_features_stmt("postgresql").compile(dialect=postgresql.dialect())).split())
+    assert "ON CONFLICT (user_id) DO UPDATE SET versao = excluded.versao" in sql
+    assert "WHERE features_perfil.assinatura != excluded.assinatura OR" in sql
+
+
+def _usuario(db, user_id=1, **perfil):
+    db.add(User(id=user_id, full_name="Ana", email=f"u{user_id}@exemplo.com", phone="1", cpf=f"{user_id:011d}", password_hash="x"))
+    db.add(PerfilUsuario(user_id=user_id, **perfil))
+    db.commit()
+
+
+def test_features_no_sqlite(db):
+    _usuario(db)
+    hoje = date(2026, 10, 18)
+    linha = {"user_id": 1, **calcular_features(5000, True, False, date(2015, 3, 1), date(1990, 1, 1), hoje=hoje)}
+    db.execute(upsert_features_stmt("sqlite"), [linha])
+    db.execute(upsert_features_stmt("sqlite"), [{**linha, "renda_mensal": 7000, "faixa_renda": 2, "assinatura": "outra"}])
+    db.commit()
+    features = db.scalars(select(FeaturesPerfil)).one()
+    assert (float(features.renda_mensal), features.faixa_renda, features.assinatura) == (7000.0, 2, "outra")
+
+
+def test_pre_aprovacao_no_sqlite(db):
+    _usuario(db, 1, renda_mensal=10000, possui_imovel=True, data_admissao=date(2015, 3, 1))
+    _usuario(db, 2, renda_mensal=1000)
+
+    assert executar_pre_aprovacao(tamanho_lote=1) == 2
+    primeiro = {p.user_id: (p.score, float(p.limite_aprovado)) for p in db.scalars(select(PreAprovacao))}
+    db.expire_all()
+
+    # Segunda execução sobrescreve as mesmas linhas
+    assert executar_pre_aprovacao() == 2
+    linhas = db.scalars(select(PreAprovacao)).all()
+    assert {p.user_id: (p.score, float(p.limite_aprovado)) for p in linhas} == primeiro
+    assert primeiro[1][1] > 0 and primeiro[2][1] == 0
+    assert all(p.calculado_em.replace(tzinfo=timezone.utc) <= datetime.now(timezone.utc) for p in linhas)
@@ -0,0 +1,53 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models.models import PerfilUsuario, User
+from routes.profile import upsert_perfil_stmt
+
+
+def _sql(dialeto, stmt) -> str:
+    return " ".join(str(stmt.compile(dialect=dialeto)).split())
+
+
+@pytest.mark.parametrize("nome, dialeto", [("postgresql", postgresql.dialect()), ("sqlite", sqlite.dialect())])
+def test_compila_insert_on_conflict_returning(nome, dialeto):
+    sql = _sql(dialeto, upsert_perfil_stmt(nome, 1, {"renda_mensal": 5000, "cidade": "São Paulo"}))
+    assert sql.startswith("INSERT INTO perfis_usuarios (user_id, cidade, ")
+    assert "ON CONFLICT (user_id) DO UPDATE SET cidade = excluded.cidade, renda_mensal = excluded.renda_mensal" in sql
+    assert "renda_mensal" in sql.split(" RETURNING ")[1]
+
+
+def test_sem_campos_ainda_devolve_a_linha():
+    sql = _sql(sqlite.dialect(), upsert_perfil_stmt("sqlite", 1, {}))
+    assert "DO UPDATE SET user_id = excluded.user_id" in sql
+
+
+def test_banco_nao_suportado():
+    with pytest.raises(NotImplementedError):
+        upsert_perfil_stmt("mysql", 1, {"cidade": "x"})
+
+
+def test_insert_e_update_no_sqlite(db):
+    db.add(User(id=1, full_name="Ana", email="ana@exemplo.com", phone="1", cpf="52998224725", password_hash="x"))
+    db.commit()
+
+    criado = db.execute(upsert_perfil_stmt("sqlite", 1, {
+        "renda_mensal": 5000, "cidade": "São Paulo", "data_nascimento": date(1990, 1, 1), "possui_imovel": True,
+    })).mappings().one()
+    db.commit()
+    assert (criado["renda_mensal"], criado["cidade"], criado["data_nascimento"]) == (Decimal("5000.00"), "São Paulo", date(1990, 1, 1))
+    assert (criado["possui_imovel"], criado["possui_veiculo"]) == (True, False)
+
+    # Só os campos enviados mudam (nem os defaults das colunas voltam)
+    atualizado = db.execute(upsert_perfil_stmt("sqlite", 1, {"renda_mensal": 7000})).mappings().one()
+    db.commit()
+    assert (atualizado["renda_mensal"], atualizado["cidade"], atualizado["possui_imovel"]) == (Decimal("7000.00"), "São Paulo", True)
+
+    sem_campos = db.execute(upsert_perfil_stmt("sqlite", 1, {})).mappings().one()
+    db.commit()
+    assert sem_campos["renda_mensal"] == Decimal("7000.00")
+    assert db.scalar(select(func.count()).select_from(PerfilUsuario)) == 1